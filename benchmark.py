@@ -0,0 +1,245 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+import criminal
+
+# --- CONFIGURATION DU BENCHMARK ---
+BENCH_SIZES = [10000, 100000]  # Lignes des exports générés (1 000 000 : --sizes, plusieurs minutes et Go)
+BENCH_SEED = 42              # Graine du générateur (exports identiques d'une exécution à l'autre)
+BENCH_OUTPUT = "benchmark_results.json"
+ROWS_PER_INMATE = 4          # Lignes par détenu (export réel : ~4)
+ROWS_PER_FACILITY = 500      # Un établissement de plus toutes les N lignes (export réel : ~500, au moins 3)
+FACILITY_SKEW = 0.5          # Exposant de Zipf de la taille des établissements (0 : uniforme)
+SPAN_DAYS = 365              # Période couverte par les entrées
+STAY_MEDIAN_HOURS = 550      # Durée médiane d'un séjour (loi log-normale, export réel : ~550h)
+STAY_SIGMA = 1.8             # Dispersion de la loi log-normale
+CHARGES_MEAN = 2.7           # Charges (lignes) par réservation en moyenne, au moins une
+# ----------------------------------
+
+CSV_COLUMNS = ['Book of Arrest Number', 'Last Name', 'First Name', 'Middle Name', 'JrSr',
+               'Booking Date Time', 'Release Date Time', 'Current Facility', 'Charge',
+               'Court Case / Cause Number', 'Court', 'RCW / Ordinance Number', 'Release Reason']
+SYLLABLES = ["BA", "DO", "KAR", "LEN", "MI", "NOR", "PA", "RI", "SAN", "TO", "VEL", "WIL", "ZE", "GAR", "HUN", "JO"]
+FACILITY_NAMES = ["King County Correctional Facility", "Maleng Regional Justice Center", "Electronic Home Detention"]
+CHARGE_NAMES = ["Assault", "Theft", "Burglary", "Resisting Arrest", "Obstructing a public officer", "Robbery",
+                "Trespass", "DUI", "Harassment", "Drug Possession", "Warrant", "Malicious Mischief"]
+COURTS = ["Seattle Municipal Court", "KING COUNTY DISTRICT COURT - SEATTLE", "KING COUNTY SUPERIOR COURT - NMRJC"]
+RELEASE_REASONS = ["Court Release - Court Action", "Bail Posted", "Time Served", "Transferred"]
+
+def _names(count, rng, parts=2):
+    """`count` noms distincts faits de syllabes (tirés sans remise)"""
+    pool = len(SYLLABLES) ** parts
+    while pool < count:
+        parts += 1
+        pool = len(SYLLABLES) ** parts
+    codes = rng.choice(pool, size=count, replace=False)
+    names = np.full(count, "", dtype=object)
+    for _ in range(parts):
+        names = names + np.array(SYLLABLES, dtype=object)[codes % len(SYLLABLES)]
+        codes //= len(SYLLABLES)
+    return names
+
+def generate_bookings(path, rows, inmates=None, facilities=None, span_days=SPAN_DAYS,
+                      stay_median_hours=STAY_MEDIAN_HOURS, stay_sigma=STAY_SIGMA,
+                      charges_mean=CHARGES_MEAN, facility_skew=FACILITY_SKEW, seed=BENCH_SEED,
+                      start="2024-12-01"):
+    """Écrit un export synthétique de `rows` lignes au format de DATA_FILE (séparateur ';', DATE_FORMAT)
+
+    Chaque réservation (détenu, établissement, entrée, sortie) compte 1 + Poisson(charges_mean - 1)
+    lignes, une par charge, chacune avec son numéro d'écrou comme dans l'export réel.
+    Les durées suivent une loi log-normale, coupées à la réservation suivante du même
+    détenu, et les établissements une loi de Zipf.
+    """
+    rng = np.random.default_rng(seed)
+    inmates = inmates or max(1, rows // ROWS_PER_INMATE)
+    facilities = facilities or max(len(FACILITY_NAMES), rows // ROWS_PER_FACILITY)
+
+    # Réservations jusqu'à couvrir `rows` lignes (au plus une par ligne)
+    charges = 1 + rng.poisson(max(charges_mean - 1, 0), size=rows)
+    bookings = int(np.searchsorted(np.cumsum(charges), rows)) + 1
+    charges = charges[:bookings]
+    charges[-1] -= charges.sum() - rows
+
+    person = rng.integers(0, inmates, size=bookings)
+    weights = np.arange(1, facilities + 1) ** -float(facility_skew)
+    facility = rng.choice(facilities, size=bookings, p=weights / weights.sum())
+    entry = (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, span_days * 86400, size=bookings), unit="s")).floor("min")
+    hours = rng.lognormal(np.log(stay_median_hours), stay_sigma, size=bookings)
+    release = entry + pd.to_timedelta(np.minimum(hours, span_days * 24) * 3600, unit="s").floor("min")
+    # Un détenu n'est jamais à deux endroits à la fois : sortie au plus tard à sa réservation suivante
+    order = np.lexsort((entry.to_numpy(), person))
+    follows = person[order][1:] == person[order][:-1]
+    release = release.to_numpy().copy()
+    release[order[:-1][follows]] = np.minimum(release[order[:-1][follows]], entry.to_numpy()[order[1:][follows]])
+    release = pd.DatetimeIndex(release)
+
+    # Une ligne par charge
+    booking = np.repeat(np.arange(bookings), charges)
+    last_names = _names(inmates, rng)
+    first_names = _names(inmates, rng)
+    middle = np.where(rng.random(inmates) < 0.5, _names(inmates, rng), "")
+    jr_sr = np.where(rng.random(inmates) < 0.02, "JR", "")
+    facility_names = np.array(FACILITY_NAMES + [f"Facility {i}" for i in range(len(FACILITY_NAMES), facilities)],
+                              dtype=object)[:facilities]
+    who = person[booking]
+
+    df = pd.DataFrame({
+        'Book of Arrest Number': [f"{2024 + i // 1000000}-{i % 1000000:06d}" for i in range(rows)],
+        'Last Name': last_names[who],
+        'First Name': first_names[who],
+        'Middle Name': middle[who],
+        'JrSr': jr_sr[who],
+        'Booking Date Time': entry.strftime(criminal.DATE_FORMAT)[booking],
+        'Release Date Time': release.strftime(criminal.DATE_FORMAT)[booking],
+        'Current Facility': facility_names[facility[booking]],
+        'Charge': np.array(CHARGE_NAMES, dtype=object)[rng.integers(0, len(CHARGE_NAMES), size=rows)],
+        'Court Case / Cause Number': (booking + 4240000000).astype(str),
+        'Court': np.array(COURTS, dtype=object)[booking % len(COURTS)],
+        'RCW / Ordinance Number': "12A.16.050",
+        'Release Reason': np.array(RELEASE_REASONS, dtype=object)[booking % len(RELEASE_REASONS)],
+    }, columns=CSV_COLUMNS)
+    df.to_csv(path, sep=';', index=False, encoding='utf-8')
+    return {"rows": rows, "bookings": bookings, "inmates": inmates, "facilities": facilities}
+
+# --- MESURE DES ÉTAPES ---
+
+def run_pipeline(csv_path, edge_backend=criminal.EDGE_BACKEND, centrality_mode="sampled",
+                 centrality_options=None, layout_mode=criminal.LAYOUT_MODE, layout_iterations=criminal.LAYOUT_ITERATIONS,
+                 community_min_nodes=criminal.COMMUNITY_MIN_NODES, output_mode=criminal.OUTPUT_MODE, workdir="."):
+    """Étapes de generate_dashboard mesurées par PipelineReport, sans cache ni état incrémental"""
+    report = criminal.PipelineReport()
+    state = criminal.build_network_state(csv_path, criminal.MIN_DURATION_FILTER, edge_backend,
+                                         cache_dir=None, report=report)
+    _, network_data = criminal.build_network_data(
+        state, centrality_mode, centrality_options, layout_mode,
+        {"iterations": layout_iterations, "seed": criminal.LAYOUT_SEED, "layout_file": None},
+        community_min_nodes, None, report=report)
+    with report.stage("export", mode=output_mode) as counts:
+        if output_mode == "asset":
+            written = criminal.write_network_asset(os.path.join(workdir, "network_data.bin"), network_data)
+            data_loader = "loadNetworkAsset('network_data.bin').then(initDashboard);"
+            counts["asset_bytes"] = sum(os.path.getsize(os.path.join(workdir, name)) for name in written)
+        else:
+            data_loader = f"initDashboard({json.dumps(network_data)});"
+        counts["html_bytes"] = len(criminal.render_dashboard(data_loader).encode('utf-8'))
+    return report
+
+def benchmark_size(rows, generator_options, pipeline_options, verbose=False):
+    """Génère un export de `rows` lignes puis le passe dans le pipeline (appelé dans un processus neuf)"""
+    with tempfile.TemporaryDirectory(prefix="prisonlink_bench_") as workdir:
+        csv_path = os.path.join(workdir, "bookings.csv")
+        start = time.perf_counter()
+        dataset = generate_bookings(csv_path, rows, **generator_options)
+        dataset["generate_s"] = round(time.perf_counter() - start, 4)
+        dataset["csv_bytes"] = os.path.getsize(csv_path)
+
+        log = sys.stdout if verbose else io.StringIO()
+        with contextlib.redirect_stdout(log):
+            report = run_pipeline(csv_path, workdir=workdir, **pipeline_options)
+    return {"rows": rows, "dataset": dataset, **report.to_dict()}
+
+# --- RAPPORT ---
+
+def print_run(run):
+    """Tableau console d'une taille"""
+    if "error" in run:
+        print(f"{run['rows']:>9} lignes : ÉCHEC ({run['error']})")
+        return
+    print(f"\n{run['rows']} lignes ({run['dataset']['inmates']} détenus, {run['dataset']['facilities']} établissements)")
+    report = criminal.PipelineReport()
+    report.stages = run["stages"]
+    report.print_table()
+
+def compare_results(results, baseline, tolerance):
+    """Compare le temps mur et le pic RSS de chaque étape à une exécution de référence ; renvoie les régressions"""
+    reference = {(run["rows"], s["stage"]): s for run in baseline["runs"] if "stages" in run for s in run["stages"]}
+    regressions = []
+    for run in results["runs"]:
+        for s in run.get("stages", []):
+            old = reference.get((run["rows"], s["stage"]))
+            if old is None:
+                continue
+            for metric in ("wall_s", "peak_rss_mb"):
+                if not old.get(metric) or s.get(metric) is None:
+                    continue
+                ratio = s[metric] / old[metric]
+                if ratio > 1 + tolerance:
+                    regressions.append(f"{run['rows']} lignes, {s['stage']} : {metric} {old[metric]} -> {s[metric]} (x{ratio:.2f})")
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PrisonLink : mesure du pipeline sur des exports synthétiques")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCH_SIZES, help="Lignes des exports générés (ex: --sizes 10000 100000 1000000)")
+    parser.add_argument("--output", default=BENCH_OUTPUT, help="Résultats JSON")
+    parser.add_argument("--baseline", help="Résultats JSON de référence : signale les étapes plus lentes ou plus gourmandes")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Écart toléré par rapport à la référence (0.25 : +25%%)")
+    parser.add_argument("--verbose", action="store_true", help="Affiche les messages du pipeline")
+
+    generator = parser.add_argument_group("générateur")
+    generator.add_argument("--seed", type=int, default=BENCH_SEED)
+    generator.add_argument("--inmates", type=int, help=f"Détenus distincts (défaut : lignes / {ROWS_PER_INMATE})")
+    generator.add_argument("--facilities", type=int, help=f"Établissements (défaut : lignes / {ROWS_PER_FACILITY}, au moins 3)")
+    generator.add_argument("--facility-skew", type=float, default=FACILITY_SKEW, help="Exposant de Zipf de la taille des établissements")
+    generator.add_argument("--span-days", type=int, default=SPAN_DAYS, help="Période couverte par les entrées")
+    generator.add_argument("--stay-median-hours", type=float, default=STAY_MEDIAN_HOURS, help="Durée médiane d'un séjour")
+    generator.add_argument("--stay-sigma", type=float, default=STAY_SIGMA, help="Dispersion (log-normale) des durées")
+    generator.add_argument("--charges-mean", type=float, default=CHARGES_MEAN, help="Charges par réservation en moyenne")
+
+    pipeline = parser.add_argument_group("pipeline")
+    pipeline.add_argument("--edge-backend", default=criminal.EDGE_BACKEND, choices=criminal.EDGE_MODES)
+    pipeline.add_argument("--centrality", default="sampled", choices=sorted(criminal.CENTRALITY_MODES),
+                          help="Mode de centralité ('exact' est quadratique : réservé aux petites tailles)")
+    pipeline.add_argument("--centrality-samples", type=int, default=criminal.CENTRALITY_SAMPLES)
+    pipeline.add_argument("--layout", default=criminal.LAYOUT_MODE, choices=["server", "browser"])
+    pipeline.add_argument("--layout-iterations", type=int, default=criminal.LAYOUT_ITERATIONS)
+    pipeline.add_argument("--no-communities", action="store_true")
+    pipeline.add_argument("--output-mode", default=criminal.OUTPUT_MODE, choices=["inline", "asset"])
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    generator_options = {"inmates": args.inmates, "facilities": args.facilities, "facility_skew": args.facility_skew,
+                         "span_days": args.span_days, "stay_median_hours": args.stay_median_hours,
+                         "stay_sigma": args.stay_sigma, "charges_mean": args.charges_mean, "seed": args.seed}
+    centrality_options = {"sampled": {"k": args.centrality_samples, "seed": criminal.CENTRALITY_SEED},
+                          "adaptive": {"seed": criminal.CENTRALITY_SEED}}.get(args.centrality, {})
+    pipeline_options = {"edge_backend": args.edge_backend, "centrality_mode": args.centrality,
+                        "centrality_options": centrality_options, "layout_mode": args.layout,
+                        "layout_iterations": args.layout_iterations,
+                        "community_min_nodes": None if args.no_communities else criminal.COMMUNITY_MIN_NODES,
+                        "output_mode": args.output_mode}
+    results = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+               "platform": platform.platform(), "cpus": os.cpu_count(),
+               "generator": generator_options, "pipeline": pipeline_options, "runs": []}
+
+    # Un processus neuf par taille : le pic RSS d'une taille n'hérite pas de la précédente
+    for rows in args.sizes:
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                run = pool.submit(benchmark_size, rows, generator_options, pipeline_options, args.verbose).result()
+        except Exception as e:  # Mémoire épuisée, processus tué... : la taille suivante est quand même mesurée
+            run = {"rows": rows, "error": f"{type(e).__name__}: {e}"}
+        results["runs"].append(run)
+        print_run(run)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    print(f"\nRésultats : '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        raise SystemExit(1 if regressions else 0)
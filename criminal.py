@@ -1,13 +1,104 @@
 import pandas as pd
-import networkx as nx
+import numpy as np
 import json
-from networkx.algorithms import community
+import heapq
+import bisect
+import argparse
+import hashlib
+import io
+import os
+import sys
+import pickle
+import gzip
+import struct
+import math
+import random
+import time
+import asyncio
+import contextlib
+import cProfile
+import traceback
+import tracemalloc
+import unicodedata
+import functools
+import urllib.parse
+from http import HTTPStatus
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import networkx as nx
+    from networkx.algorithms import community
+except ImportError:  # Adaptateur optionnel : seule la vue communautés (Louvain) en dépend
+    nx = None
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Repli sur des colonnes .npy projetées en mémoire
+    feather = None
+try:
+    import scipy.sparse as sparse
+except ImportError:  # Moteur d'arêtes "sparse" indisponible
+    sparse = None
+try:
+    import resource
+except ImportError:  # Windows : pas de getrusage, le pic mémoire du processus n'est pas relevé
+    resource = None
 
 # --- CONFIGURATION DU LOGO ---
 # Utilisation du fichier local nommé Logo.png
 LOGO_URL = "Logo.png"
 # -----------------------------
 
+# --- CONFIGURATION DU PIPELINE ---
+DATA_FILE = "données nettoyés.csv"
+DATE_FORMAT = "%Y %b %d %I:%M:%S %p"
+MIN_DURATION_FILTER = 24  # Heures minimum passées ensemble
+EDGE_BACKEND = "sweep"    # Moteur de co-incarcération (voir EDGE_BACKENDS)
+OVERLAP_BLOCK_SIZE = 1024 # Taille des tuiles NumPy (mémoire ~ bloc² x 8 octets par tableau)
+SPARSE_BUCKET_HOURS = 24  # Granularité des cases de temps du moteur "sparse" (heures)
+STATE_FILE = "prisonlink_state.pkl"  # État conservé entre deux exécutions --incremental
+CACHE_DIR = ".prisonlink_cache"      # Séjours consolidés et charges en format colonnaire
+STREAM_CHUNK_ROWS = None             # Lecture par blocs de N lignes (None : fichier entier)
+RESOLUTION_THRESHOLD = 3             # Score minimal pour rattacher une variante de nom à une personne connue
+RESOLUTION_BLOCK_SCAN = 64           # Blocs plus grands : seules les personnes de même nom ou de même réservation sont comparées
+RESOLUTION_CONFLICT_HOURS = 24       # Séjours simultanés dans deux établissements au-delà de N heures : deux personnes distinctes
+OUTPUT_MODE = "inline"               # inline : données dans le HTML | asset : fichier binaire chargé par fetch()
+ASSET_FILE = "network_data.bin"      # Graphe compact du mode "asset"
+DASHBOARD_STYLE_FILE = "prison_dashboard.css"  # Styles du mode "asset", mis en cache par le navigateur
+DASHBOARD_SCRIPT_FILE = "prison_dashboard.js"   # Script du mode "asset", idem
+CENTRALITY_MODE = "exact"    # exact | sampled | adaptive (voir CENTRALITY_MODES)
+CENTRALITY_SAMPLES = 500     # Pivots du mode "sampled"
+CENTRALITY_SEED = 42         # Graine des modes estimés (résultats reproductibles)
+CENTRALITY_EPSILON = 0.01    # Erreur absolue maximale du mode "adaptive"
+CENTRALITY_DELTA = 0.1       # Probabilité de dépasser cette erreur
+PAGERANK_DAMPING = 0.85      # Facteur d'amortissement du PageRank pondéré
+POWER_TOLERANCE = 1e-10      # Écart L1 entre deux itérations (par nœud) marquant la convergence
+POWER_MAX_ITER = 500         # Itérations maximales de PageRank et du vecteur propre
+PARALLEL_WORKERS = os.cpu_count() or 1  # Processus des modes "parallel" (arêtes et centralité)
+EDGE_WINDOW_STAYS = 20000    # Séjours par tâche du moteur "parallel" (grands établissements découpés)
+LAYOUT_MODE = "server"       # server : positions calculées en Python | browser : stabilisation vis-network
+LAYOUT_ITERATIONS = 500      # Itérations maximales de ForceAtlas2 (arrêt anticipé à convergence)
+LAYOUT_SEED = 42             # Graine du placement initial (disposition reproductible)
+LAYOUT_FILE = "prisonlink_layout.json"  # Positions de l'exécution précédente (démarrage à chaud)
+COMMUNITY_MIN_NODES = 300    # Vue communautés (niveaux de détail) à partir de N personnes (None : jamais)
+COMMUNITY_SEED = 42          # Graine de Louvain (hiérarchie reproductible)
+COMMUNITY_RESOLUTION = 1.0   # > 1 : communautés plus petites et plus nombreuses
+COMMUNITY_MAX_SIZE = 40      # Communautés redécoupées tant qu'elles dépassent N personnes
+TEMPORAL_PERIOD = None       # None | week | month : instantanés temporels et fenêtre de temps du dashboard
+TEMPORAL_REUSE_CELLS = 10_000_000  # Sources x personnes au-delà : instantanés recalculés par composante
+MIN_COMPONENT_SIZE = None    # Personnes des composantes plus petites écartées avant la centralité (None : toutes)
+SPARSIFY_MODE = None         # None | disparity | topk | budget : squelette du graphe avant la centralité
+SPARSIFY_ALPHA = 0.05        # Seuil de significativité du filtre de disparité
+SPARSIFY_TOP_K = 10          # Relations les plus longues gardées par personne (mode "topk")
+SPARSIFY_BUDGET = 50000      # Relations gardées au total (mode "budget")
+SERVE_HOST = "127.0.0.1"     # Adresse d'écoute de 'criminal.py serve'
+SERVE_PORT = 8765            # Port HTTP de 'criminal.py serve'
+SERVE_CACHE_SIZE = 1024      # Réponses JSON conservées en mémoire (LRU)
+SERVE_EGO_HOPS = 2           # Profondeur par défaut d'un réseau personnel
+SERVE_MAX_NODES = 2000       # Personnes au plus dans un sous-graphe envoyé au navigateur
+REPORT_FILE = "prisonlink_report.json"  # Mesures par étape de la dernière génération ('' : non écrites)
+PROFILE_TOP = 25             # Lignes des résumés cProfile / tracemalloc de --profile
+# ---------------------------------
+
 def generate_landing_page():
     """Génère la page d'accueil index.html avec le logo et favicon"""
     html = f"""
@@ -154,645 +245,4173 @@ def generate_landing_page():
         f.write(html)
     print("Page d'accueil 'index.html' générée.")
 
-def generate_dashboard():
-    # --- CONFIGURATION ---
-    MIN_DURATION_FILTER = 24 
-    # ---------------------
+# --- INSTRUMENTATION DU PIPELINE ---
 
-    print(f"Chargement des données... (Base: > {MIN_DURATION_FILTER}h ensemble)")
-    try:
-        # 1. Chargement et nettoyage
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son démarrage (Mo), None si indisponible"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+class PipelineReport:
+    """Mesures de chaque étape : temps mur, temps CPU, pic mémoire et volumes traités
+
+    Une étape est un bloc `with report.stage("pairs") as counts:` où `counts` reçoit
+    les volumes (lignes, paires, arêtes...). Le pic RSS est celui du processus à la fin
+    de l'étape (rss_growth_mb : hausse due à l'étape). Avec `profile_dir`, chaque étape
+    est aussi profilée (cProfile, fichier .prof) et ses allocations suivies par
+    tracemalloc (pic propre à l'étape et plus grosses lignes) ; le pipeline est alors
+    nettement plus lent.
+    """
+
+    def __init__(self, profile_dir=None):
+        self.stages = []
+        self.failed = None
+        self.profile_dir = profile_dir
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    @contextlib.contextmanager
+    def stage(self, name, **counts):
+        record = {"stage": name, "counts": counts}
+        rss_before = peak_rss_mb()
+        profiler = self._start_profile()
+        wall, cpu = time.perf_counter(), time.process_time()
         try:
-            df = pd.read_csv('données nettoyés.csv', sep=';', encoding='utf-8')
-        except UnicodeDecodeError:
-            print("Encodage UTF-8 échoué, passage en Latin-1...")
-            df = pd.read_csv('données nettoyés.csv', sep=';', encoding='latin-1')
-        
-        df['Full Name'] = df['First Name'].str.strip() + ' ' + df['Last Name'].str.strip()
-        
-        date_format = "%Y %b %d %I:%M:%S %p"
-        df['Booking Date Time'] = pd.to_datetime(df['Booking Date Time'], format=date_format, errors='coerce')
-        df['Release Date Time'] = pd.to_datetime(df['Release Date Time'], format=date_format, errors='coerce')
-        
-        df = df.dropna(subset=['Booking Date Time', 'Release Date Time', 'Full Name'])
+            yield counts
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            if self.failed is None:
+                self.failed = record
+            raise
+        finally:
+            record["wall_s"] = round(time.perf_counter() - wall, 4)
+            record["cpu_s"] = round(time.process_time() - cpu, 4)
+            record["peak_rss_mb"] = peak_rss_mb()
+            if rss_before is not None:
+                record["rss_growth_mb"] = round(record["peak_rss_mb"] - rss_before, 1)
+            if profiler is not None:
+                self._stop_profile(profiler, record)
+            self.stages.append(record)
 
-        # 2. Extraction des charges
-        person_charges = {}
-        for index, row in df.iterrows():
-            name = row['Full Name']
-            charge = str(row['Charge']).strip()
-            if name not in person_charges:
-                person_charges[name] = set()
-            if charge and charge.lower() != 'nan':
-                person_charges[name].add(charge)
+    def _start_profile(self):
+        if not self.profile_dir:
+            return None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
 
-        # 3. Consolidation des séjours
-        stays = df.groupby(['Book of Arrest Number', 'Full Name', 'Current Facility']).agg({
-            'Booking Date Time': 'min',
-            'Release Date Time': 'max'
-        }).reset_index()
+    def _stop_profile(self, profiler, record):
+        profiler.disable()
+        base = os.path.join(self.profile_dir, f"{len(self.stages) + 1:02d}_{record['stage']}")
+        profiler.dump_stats(base + ".prof")
+        record["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1)
+        top = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP]
+        with open(base + ".tracemalloc.txt", 'w', encoding='utf-8') as f:
+            f.write("\n".join(str(line) for line in top) + "\n")
+        record["profile"] = base + ".prof"
 
-        print(f"{len(stays)} séjours identifiés. Calcul des interactions...")
+    def fail(self, error):
+        """Erreur levée hors de toute étape (l'étape en cours l'a déjà enregistrée sinon)"""
+        if self.failed is None:
+            self.failed = {"stage": None, "error": f"{type(error).__name__}: {error}"}
 
-        # 4. Calcul des paires et suivi des établissements
-        potential_edges = []
-        facilities = stays['Current Facility'].unique()
-        person_facilities = {} 
-        
-        for facility in facilities:
-            facility_stays = stays[stays['Current Facility'] == facility].to_dict('records')
-            n = len(facility_stays)
-            
-            for p in facility_stays:
-                name = p['Full Name']
-                if name not in person_facilities:
-                    person_facilities[name] = set()
-                person_facilities[name].add(facility)
-
-            for i in range(n):
-                for j in range(i + 1, n):
-                    p1 = facility_stays[i]
-                    p2 = facility_stays[j]
-                    
-                    if p1['Full Name'] == p2['Full Name']:
-                        continue
-                    
-                    start_overlap = max(p1['Booking Date Time'], p2['Booking Date Time'])
-                    end_overlap = min(p1['Release Date Time'], p2['Release Date Time'])
-                    
-                    if end_overlap > start_overlap:
-                        duration_hours = (end_overlap - start_overlap).total_seconds() / 3600
-                        
-                        if duration_hours >= MIN_DURATION_FILTER:
-                            potential_edges.append({
-                                'source': p1['Full Name'],
-                                'target': p2['Full Name'],
-                                'weight': duration_hours
-                            })
-
-        # 5. Agrégation
-        edges_map = {}
-        for edge in potential_edges:
-            key = tuple(sorted((edge['source'], edge['target'])))
-            if key in edges_map:
-                edges_map[key] += edge['weight']
-            else:
-                edges_map[key] = edge['weight']
-        
-        final_edges = [(k, v) for k, v in edges_map.items()]
-        final_edges.sort(key=lambda x: x[1], reverse=True)
-        
-        print(f"Relations conservées: {len(final_edges)}.")
+    def to_dict(self):
+        peaks = [s["peak_rss_mb"] for s in self.stages if s["peak_rss_mb"] is not None]
+        return {
+            "stages": self.stages,
+            "total_wall_s": round(sum(s["wall_s"] for s in self.stages), 4),
+            "total_cpu_s": round(sum(s["cpu_s"] for s in self.stages), 4),
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "failed": self.failed,
+        }
 
-        # 6. Construction du Graphe
-        G = nx.Graph()
-        for (source, target), duration in final_edges:
-            G.add_edge(source, target, weight=duration)
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
 
-        # 6bis. CALCUL CENTRALITÉ (Influence)
-        print("Calcul de la centralité (Influence)...")
-        centrality = nx.betweenness_centrality(G, weight='weight')
+    def print_table(self):
+        print(f"\n{'Étape':<14}{'Mur (s)':>10}{'CPU (s)':>10}{'Pic RSS (Mo)':>14}  Volumes")
+        for s in self.stages:
+            counts = ", ".join(f"{k}={v}" for k, v in s["counts"].items())
+            status = f"  ÉCHEC {s['error']}" if "error" in s else ""
+            print(f"{s['stage']:<14}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}{s['peak_rss_mb'] or 0:>14.1f}  {counts}{status}")
+        total = self.to_dict()
+        print(f"{'total':<14}{total['total_wall_s']:>10.3f}{total['total_cpu_s']:>10.3f}{total['peak_rss_mb'] or 0:>14.1f}")
 
-        # 7. Données Visuelles avec GROUPES par Etablissement
-        print("Génération du design...")
-        node_data = []
-        for person in G.nodes():
-            degree = G.degree[person]
-            score = centrality.get(person, 0)
-            
-            p_facilities = list(person_facilities.get(person, []))
-            p_charges = list(person_charges.get(person, []))
-            
-            charges_display = ", ".join(p_charges[:3])
-            if len(p_charges) > 3: charges_display += ", ..."
+# --- CHARGEMENT DES DONNÉES ---
 
-            main_facility = p_facilities[0] if p_facilities else "Inconnu"
+BOOKING_COLUMNS = ['Book of Arrest Number', 'Last Name', 'First Name', 'Middle Name', 'JrSr',
+                   'Booking Date Time', 'Release Date Time', 'Current Facility', 'Charge']
+BOOKING_DTYPES = {'Current Facility': 'category', 'Charge': 'category'}
 
-            node_data.append({
-                "id": person, 
-                "label": person, 
-                "group": main_facility, 
-                "value": degree, 
-                "influence": score,
-                "facilities": p_facilities, 
-                "charges": p_charges,
-                "title": f"{person}\nConnexions: {degree}\nInfluence: {score:.4f}\nCharges: {charges_display}"
-            })
+def _read_bookings_csv(source):
+    """pd.read_csv avec repli en Latin-1 (source : chemin ou flux binaire)"""
+    try:
+        return pd.read_csv(source, sep=';', encoding='utf-8')
+    except UnicodeDecodeError:
+        print("Encodage UTF-8 échoué, passage en Latin-1...")
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_csv(source, sep=';', encoding='latin-1')
 
-        edge_data = []
-        max_duration = final_edges[0][1] if final_edges else 1
-        
-        for u, v, data in G.edges(data=True):
-            duration = data['weight']
-            days = duration / 24
-            width = 1 + (duration / max_duration) * 6
-            
-            edge_data.append({
-                "from": u, 
-                "to": v,
-                "width": width,
-                "title": f"{days:.1f} jours ensemble", 
-                "days_count": f"{days:.1f}",
-                "raw_days": float(f"{days:.2f}"),
-                "color": { "color": "rgba(100, 100, 100, 0.2)", "highlight": "#000000" } 
-            })
-        
-        all_facilities_list = sorted(list(facilities))
-        
-        network_data = {
-            "nodes": node_data,
-            "edges": edge_data,
-            "facilities": all_facilities_list
-        }
-        
-        # --- EXPORT JSON ---
-        with open('network_data.json', 'w', encoding='utf-8') as f:
-            json.dump(network_data, f, ensure_ascii=False, indent=4)
-        
-        json_str = json.dumps(network_data)
+def clean_bookings(df):
+    """Construit le nom complet, parse les dates et écarte les lignes incomplètes
 
-        # 8. HTML & CSS
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="fr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Analyse Réseau - Dashboard</title>
-    
-    <!-- Favicon -->
-    <link rel="icon" type="image/png" href="{LOGO_URL}">
-    
-    <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
-    <link href="https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-    
-    <style>
-        :root {{
-            --text: #212529;
-            --background: #f8f9fa;
-            --primary: #0d6efd; 
-            --secondary: #fd7e14;
-            --accent: #198754; 
-            
-            --panel-bg: rgba(255, 255, 255, 0.95);
-            --shadow: 0 4px 12px rgba(0,0,0,0.15);
-            --border: 1px solid #dee2e6;
-        }}
+    Le nom complet (prénom, deuxième prénom, nom, suffixe) est une variante de nom :
+    la résolution des identités le remplace ensuite par l'identifiant de la personne.
+    """
+    parts = [df[column].fillna('').astype(str).str.strip() for column in ('First Name', 'Middle Name', 'Last Name', 'JrSr')]
+    full_name = parts[0].str.cat(parts[1:], sep=' ').str.replace(r'\s+', ' ', regex=True).str.strip()
+    df['Full Name'] = full_name.where(df['First Name'].notna() & df['Last Name'].notna())
 
-        body {{ 
-            margin: 0; padding: 0; background-color: var(--background); color: var(--text); 
-            font-family: 'Outfit', sans-serif; overflow: hidden; 
-            background-image: radial-gradient(#adb5bd 1px, transparent 1px);
-            background-size: 30px 30px;
-        }}
-        
-        #mynetwork {{ width: 100vw; height: 100vh; position: absolute; top:0; left:0; z-index: 1; outline: none; }}
+    df['Booking Date Time'] = pd.to_datetime(df['Booking Date Time'], format=DATE_FORMAT, errors='coerce')
+    df['Release Date Time'] = pd.to_datetime(df['Release Date Time'], format=DATE_FORMAT, errors='coerce')
 
-        .sidebar {{ 
-            position: absolute; top: 20px; left: 20px; width: 340px; z-index: 10;
-            background: var(--panel-bg); backdrop-filter: blur(10px); -webkit-backdrop-filter: blur(10px);
-            border-radius: 12px; box-shadow: var(--shadow); padding: 25px;
-            max-height: 90vh; overflow-y: auto; border: var(--border);
-        }}
-        
-        .sidebar-header {{
-            display: flex; align-items: center; gap: 12px; margin-bottom: 25px;
-        }}
-        
-        .logo-sidebar {{
-            width: 45px; height: 45px; object-fit: contain; border-radius: 8px;
-        }}
+    return df.dropna(subset=['Booking Date Time', 'Release Date Time', 'Full Name'])
 
-        h1 {{ font-weight: 700; font-size: 22px; margin: 0; color: var(--primary); display: flex; align-items: center; gap: 12px; }}
-        .section-title {{ font-size: 11px; font-weight: 700; text-transform: uppercase; color: #6c757d; margin-bottom: 12px; margin-top: 25px; letter-spacing: 1px; display: flex; justify-content: space-between; align-items: center; }}
+def load_bookings(csv_path=DATA_FILE):
+    """Lit l'export des réservations, construit le nom complet et parse les dates"""
+    return clean_bookings(_read_bookings_csv(csv_path))
 
-        .input-wrapper {{ position: relative; margin-bottom:10px; }}
-        input[type="text"], select {{
-            width: 100%; padding: 12px 15px; padding-left: 40px;
-            background: #fff; border: 1px solid #ced4da;
-            border-radius: 8px; color: var(--text); font-family: 'Outfit', sans-serif;
-            transition: all 0.2s ease; box-sizing: border-box; font-size: 14px;
-        }}
-        select {{ padding-left: 15px; cursor: pointer; }}
-        input[type="text"]:focus, select:focus {{ outline: none; border-color: var(--primary); box-shadow: 0 0 0 3px rgba(13, 110, 253, 0.25); }}
-        .search-icon {{ position: absolute; left: 14px; top: 13px; color: var(--primary); pointer-events: none; }}
+def collect_charges(df, person_charges=None):
+    """Charges distinctes par détenu, dans l'ordre d'apparition (complète `person_charges` s'il est fourni)
 
-        .slider-box {{ padding: 15px; background: #fff; border-radius: 8px; border: 1px solid #ced4da; margin-bottom: 10px; }}
-        .slider-header {{ display: flex; justify_content: space-between; font-size: 13px; color: #495057; margin-bottom: 10px; font-weight: 500; }}
-        .slider-value {{ color: #fff; font-weight: 700; background: var(--primary); padding: 2px 8px; border-radius: 6px; font-size: 11px; }}
-        
-        input[type="range"] {{ width: 100%; cursor: pointer; accent-color: var(--primary); height: 5px; background: #e9ecef; border-radius: 3px; appearance: none; }}
-        
-        .info-card {{
-            display: none; margin-top: 25px; background: #fff; border-radius: 12px;
-            box-shadow: var(--shadow); padding: 20px; position: relative; overflow: hidden;
-            animation: slideUp 0.4s cubic-bezier(0.16, 1, 0.3, 1); border: 1px solid #dee2e6;
-        }}
-        .info-card::before {{ content: ''; position: absolute; top:0; left:0; width: 6px; height: 100%; background: var(--secondary); }}
-        .info-card.active {{ display: block; }}
-        
-        .info-title {{ font-size: 18px; font-weight: 700; margin-bottom: 15px; color: var(--text); border-bottom: 1px solid #eee; padding-bottom: 10px; }}
-        .info-row {{ display: flex; justify_content: space-between; font-size: 13px; margin-bottom: 8px; }}
-        .info-label {{ color: #6c757d; font-weight: 500; }}
-        .info-val {{ color: var(--text); font-weight: 600; text-align: right; max-width: 60%; }}
-
-        .tag-container {{ display: flex; flex-wrap: wrap; gap: 5px; margin-top: 10px; }}
-        .tag {{ background: #e9ecef; color: #495057; font-size: 10px; padding: 3px 8px; border-radius: 4px; font-weight: 600; }}
-
-        .stats-grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 12px; margin-bottom: 10px; }}
-        .stat-box {{ background: #fff; padding: 15px; border-radius: 12px; text-align: center; border: 1px solid #ced4da; }}
-        .stat-num {{ font-size: 24px; font-weight: 700; color: var(--primary); display: block; line-height: 1; }}
-        .stat-desc {{ font-size: 10px; color: #6c757d; text-transform: uppercase; font-weight: 600; }}
-
-        .top-box {{ background: #fff; padding: 10px; border-radius: 12px; border: 1px solid #ced4da; margin-bottom: 20px; }}
-        .top-item {{ display: flex; justify_content: space-between; align-items: center; padding: 8px; border-bottom: 1px solid #eee; font-size: 13px; cursor: pointer; transition: 0.2s; }}
-        .top-item:last-child {{ border-bottom: none; }}
-        .top-item:hover {{ background: #f8f9fa; color: var(--primary); }}
-        .top-rank {{ font-weight: 700; color: var(--secondary); margin-right: 10px; width: 15px; }}
-        .top-name {{ flex-grow: 1; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }}
-        .top-score {{ font-size: 10px; color: #adb5bd; }}
-
-        .btn-group {{ display: flex; gap: 10px; margin-top: 20px; }}
-        .btn {{ flex: 1; padding: 12px; background: var(--primary); color: #fff; border: none; border-radius: 8px; cursor: pointer; font-weight: 600; font-size: 13px; transition: all 0.2s; display: flex; justify-content: center; align-items: center; gap: 8px; }}
-        .btn:hover {{ background: #0b5ed7; transform: translateY(-2px); }}
-        .btn-secondary {{ background: #fff; color: #495057; border: 1px solid #ced4da; }}
-        .btn-secondary:hover {{ background: #f8f9fa; color: #212529; }}
-
-        #loading-screen {{ position: fixed; inset: 0; background: var(--background); z-index: 100; display: flex; flex-direction: column; align-items: center; justify-content: center; transition: opacity 0.5s; }}
-        .logo-loading {{ width: 100px; margin-bottom: 20px; }}
-        .spinner {{ width: 50px; height: 50px; border: 4px solid #dee2e6; border-top: 4px solid var(--primary); border-radius: 50%; animation: spin 0.8s infinite; margin-bottom: 20px; }}
-        @keyframes spin {{ 0% {{ transform: rotate(0deg); }} 100% {{ transform: rotate(360deg); }} }}
-        @keyframes slideUp {{ from {{ opacity: 0; transform: translateY(20px); }} to {{ opacity: 1; transform: translateY(0); }} }}
-    </style>
-</head>
-<body>
+    Nettoyage vectorisé puis un seul groupby : chaque détenu reçoit une liste sans
+    doublon, dont la longueur sert directement de nombre de charges.
+    """
+    person_charges = {} if person_charges is None else person_charges
+    # Charges absentes écartées avant la conversion en texte (sinon None devient 'None')
+    present = df['Charge'].notna()
+    charges = df['Charge'].astype(str).str.strip()
+    valid = (present & (charges != '') & (charges.str.lower() != 'nan')).to_numpy()
 
-    <div id="loading-screen">
-        <img src="{LOGO_URL}" class="logo-loading" alt="Logo">
-        <div class="spinner"></div>
-        <div style="font-size: 14px; font-weight: 600; color: var(--primary); letter-spacing: 2px;">CHARGEMENT DU SYSTÈME</div>
-    </div>
+    for name in df['Full Name'].unique():
+        person_charges.setdefault(name, [])
 
-    <div id="mynetwork"></div>
+    cleaned = pd.DataFrame({'Full Name': df['Full Name'].to_numpy()[valid], 'Charge': charges.to_numpy()[valid]})
+    grouped = cleaned.drop_duplicates().groupby('Full Name', sort=False)['Charge'].agg(list)
+    for name, new_charges in grouped.items():
+        known = person_charges[name]
+        if known:
+            seen = set(known)
+            known.extend(c for c in new_charges if c not in seen)
+        else:
+            person_charges[name] = new_charges
+    return person_charges
 
-    <div class="sidebar">
-        <div class="sidebar-header">
-            <img src="{LOGO_URL}" alt="Logo" class="logo-sidebar">
-            <h1>Network Intel.</h1>
-        </div>
-        
-        <div class="stats-grid">
-            <div class="stat-box">
-                <span class="stat-num" id="stat-nodes">0</span>
-                <span class="stat-desc">Détenus</span>
-            </div>
-            <div class="stat-box">
-                <span class="stat-num" id="stat-edges">0</span>
-                <span class="stat-desc">Connexions</span>
-            </div>
-        </div>
+def collect_facilities(stays, person_facilities=None):
+    """Ensemble des établissements fréquentés par détenu"""
+    person_facilities = {} if person_facilities is None else person_facilities
+    for name, facility in zip(stays['Full Name'], stays['Current Facility']):
+        if name not in person_facilities:
+            person_facilities[name] = set()
+        person_facilities[name].add(facility)
+    return person_facilities
 
-        <div class="section-title"><span>Top Influenceurs</span> <i class="fas fa-crown" style="color:var(--secondary)"></i></div>
-        <div class="top-box" id="top-list">
-            <!-- Rempli par JS -->
-        </div>
-        
-        <div class="section-title"><span>Filtres Globaux</span> <i class="fas fa-sliders-h"></i></div>
-        
-        <div class="input-wrapper">
-             <select id="facility-select">
-                <option value="all">🏢 Tous les établissements</option>
-             </select>
-        </div>
+def consolidate_stays(df):
+    """Un séjour par numéro d'écrou, détenu et établissement (entrée min, sortie max)"""
+    return df.groupby(['Book of Arrest Number', 'Full Name', 'Current Facility'], observed=True).agg({
+        'Booking Date Time': 'min',
+        'Release Date Time': 'max'
+    }).reset_index()
 
-        <div class="slider-box">
-            <div class="slider-header"><span><i class="fas fa-clock"></i> Durée min.</span><span class="slider-value" id="days-display">1j</span></div>
-            <input type="range" id="daysFilter" min="1" max="100" value="1" step="1">
-        </div>
+def _stream_bookings(csv_path, encoding, chunk_rows):
+    """Séjours et charges repliés bloc par bloc ; la mémoire reste bornée par un bloc plus la table des séjours
 
-        <div class="slider-box">
-            <div class="slider-header"><span><i class="fas fa-users"></i> Importance</span><span class="slider-value" id="degree-display">0+</span></div>
-            <input type="range" id="degreeFilter" min="0" max="20" value="0" step="1">
-        </div>
-        
-        <div class="section-title"><span>Recherche</span> <i class="fas fa-search"></i></div>
-        <div class="input-wrapper">
-            <i class="fas fa-search search-icon"></i>
-            <input type="text" id="search-input" list="names" placeholder="Nom ou Charge...">
-            <datalist id="names"></datalist>
-        </div>
+    Chaque bloc ne lit que les colonnes utiles (établissement et charge en catégories)
+    et ses dates sont ramenées en int64. Les séjours partiels s'accumulent puis sont
+    reconsolidés dès qu'ils dépassent la table déjà consolidée (coût amorti linéaire).
+    """
+    person_charges, person_names = {}, {}
+    stays = None
+    partials, pending = [], 0
+    reader = pd.read_csv(csv_path, sep=';', encoding=encoding, usecols=BOOKING_COLUMNS,
+                         dtype=BOOKING_DTYPES, chunksize=chunk_rows)
+    for chunk in reader:
+        chunk = clean_bookings(chunk)
+        collect_charges(chunk, person_charges)
+        collect_names(chunk, person_names)
+        for column in ('Booking Date Time', 'Release Date Time'):
+            chunk[column] = chunk[column].to_numpy(dtype='datetime64[ns]').view('int64')
+        partial = consolidate_stays(chunk)
+        partial['Current Facility'] = partial['Current Facility'].astype(object)
+        partials.append(partial)
+        pending += len(partial)
+        if stays is None or pending > len(stays):
+            stays = consolidate_stays(pd.concat(([] if stays is None else [stays]) + partials, ignore_index=True))
+            partials, pending = [], 0
 
-        <div id="info-card" class="info-card">
-            <div class="info-title" id="info-title">Nom</div>
-            <div class="info-row"><span class="info-label">Etablissement</span> <span class="info-val" id="info-fac">-</span></div>
-            <div class="info-row"><span class="info-label">Connexions</span> <span class="info-val" id="info-conns">-</span></div>
-            <div class="info-row"><span class="info-label">Influence</span> <span class="info-val" id="info-score">-</span></div>
-            <div class="info-row" id="row-duration" style="display:none"><span class="info-label">Durée</span> <span class="info-val" id="info-duration">-</span></div>
-            <div id="charges-container" style="display:none; margin-top:10px; border-top:1px solid #dee2e6; padding-top:10px;">
-                <span class="info-label" style="font-size:11px;">CHARGES</span>
-                <div class="tag-container" id="charges-tags"></div>
-            </div>
-        </div>
+    if partials or stays is None:
+        stays = consolidate_stays(pd.concat(([] if stays is None else [stays]) + partials, ignore_index=True))
+    for column in ('Booking Date Time', 'Release Date Time'):
+        stays[column] = stays[column].to_numpy().view('datetime64[ns]')
+    stays['Current Facility'] = stays['Current Facility'].astype(str)
+    return stays, person_charges, person_names
 
-        <div class="btn-group">
-            <button class="btn" onclick="exportCanvas()"><i class="fas fa-camera"></i> Photo</button>
-            <button class="btn btn-secondary" onclick="togglePhysics()" id="btn-physics"><i class="fas fa-pause"></i> Pause</button>
-        </div>
-        
-        <div style="margin-top: 15px; text-align:center;">
-             <button class="btn btn-secondary" style="width:100%" onclick="resetView()"><i class="fas fa-sync-alt"></i> Reset Vue</button>
-        </div>
-        
-        <div style="margin-top: 20px; font-size: 11px; text-align: center;">
-            <a href="index.html" style="color: var(--primary); text-decoration: none;">Retour Accueil</a>
-        </div>
-    </div>
+def stream_stays(csv_path=DATA_FILE, chunk_rows=100000):
+    """Étapes 1 à 3 en lecture par blocs, pour les exports plus grands que la mémoire"""
+    try:
+        return _stream_bookings(csv_path, 'utf-8', chunk_rows)
+    except UnicodeDecodeError:
+        print("Encodage UTF-8 échoué, passage en Latin-1...")
+        return _stream_bookings(csv_path, 'latin-1', chunk_rows)
 
-    <script>
-        const rawData = {json_str};
-        
-        const theme = {{
-            primary: '#0d6efd',   // Bleu Franc
-            secondary: '#fd7e14', // Orange Franc
-            accent: '#198754',    // Vert Franc
-            text: '#212529'
-        }};
-
-        // DataSets
-        const allEdges = rawData.edges;
-        const allNodes = rawData.nodes;
-        const nodes = new vis.DataSet(allNodes);
-        const edges = new vis.DataSet(allEdges);
-        const container = document.getElementById('mynetwork');
-        
-        // --- COULEURS PAR ETABLISSEMENT (SIMPLE & VISIBLE) ---
-        const groupsConfig = {{
-            'King County Correctional Facility': {{ 
-                color: {{ background: theme.primary, border: '#0a58ca', highlight: {{ background: '#0b5ed7', border: '#0a58ca' }} }},
-                font: {{ color: '#fff' }}
-            }},
-            'Maleng Regional Justice Center': {{ 
-                color: {{ background: theme.accent, border: '#146c43', highlight: {{ background: '#157347', border: '#146c43' }} }},
-                font: {{ color: '#fff' }}
-            }},
-            'Electronic Home Detention': {{ 
-                color: {{ background: theme.secondary, border: '#e65c00', highlight: {{ background: '#e65c00', border: '#e65c00' }} }},
-                font: {{ color: '#fff' }}
-            }},
-            'Inconnu': {{
-                color: {{ background: '#6c757d', border: '#495057' }},
-                font: {{ color: '#fff' }}
-            }},
-            'default': {{
-                color: {{ background: '#adb5bd', border: '#6c757d' }}
-            }}
-        }};
-
-        const options = {{
-            groups: groupsConfig,
-            nodes: {{
-                shape: 'dot', size: 14, borderWidth: 2,
-                font: {{ size: 14, color: theme.text, face: 'Outfit', strokeWidth: 3, strokeColor: '#ffffff' }},
-                shadow: {{ enabled: true, color: 'rgba(0,0,0,0.2)', size: 10, x: 0, y: 5 }}
-            }},
-            edges: {{
-                smooth: {{ type: 'continuous', roundness: 0.5 }},
-                color: {{ color: 'rgba(100, 100, 100, 0.2)', highlight: theme.primary, hover: theme.primary }},
-                width: 1
-            }},
-            physics: {{
-                forceAtlas2Based: {{ gravitationalConstant: -60, centralGravity: 0.008, springLength: 120, springConstant: 0.06, damping: 0.9, avoidOverlap: 0.5 }},
-                maxVelocity: 5, minVelocity: 0.1, timestep: 0.2, adaptiveTimestep: true,
-                solver: 'forceAtlas2Based', stabilization: {{ enabled: true, iterations: 1000 }}
-            }},
-            interaction: {{ hover: true, tooltipDelay: 200, hideEdgesOnDrag: true, zoomView: true }}
-        }};
-
-        const network = new vis.Network(container, {{nodes, edges}}, options);
-
-        network.on("stabilizationIterationsDone", function () {{
-            document.getElementById('loading-screen').style.opacity = '0';
-            setTimeout(() => {{ document.getElementById('loading-screen').style.display = 'none'; }}, 500);
-        }});
-
-        // --- GLOBAL STATE ---
-        let currentFocusId = null;
-
-        // DOM
-        const daysSlider = document.getElementById('daysFilter');
-        const degreeSlider = document.getElementById('degreeFilter');
-        const facSelect = document.getElementById('facility-select');
-        const statEdges = document.getElementById('stat-edges');
-        const statNodes = document.getElementById('stat-nodes');
-        const topList = document.getElementById('top-list');
-
-        // Init Stats
-        statNodes.innerText = allNodes.length;
-        statEdges.innerText = allEdges.length;
-
-        // --- POPULATE TOP 5 INFLUENCEURS ---
-        const sortedByInfluence = [...rawData.nodes].sort((a,b) => (b.influence || 0) - (a.influence || 0));
-        const top5 = sortedByInfluence.slice(0, 5);
-        
-        top5.forEach((n, index) => {{
-            const div = document.createElement('div');
-            div.className = 'top-item';
-            div.innerHTML = `<span class="top-rank">#${{index+1}}</span> <span class="top-name">${{n.label}}</span> <span class="top-score">${{(n.influence*100).toFixed(1)}}</span>`;
-            div.onclick = () => focusNode(n.id);
-            topList.appendChild(div);
-        }});
-
-        // Populate Lists
-        const dataList = document.getElementById('names');
-        rawData.nodes.sort((a,b) => a.label.localeCompare(b.label)).forEach(n => {{
-            const opt = document.createElement('option');
-            opt.value = n.label; dataList.appendChild(opt);
-        }});
-        
-        let allCharges = new Set();
-        rawData.nodes.forEach(n => n.charges.forEach(c => allCharges.add(c)));
-        Array.from(allCharges).sort().forEach(c => {{
-            const opt = document.createElement('option');
-            opt.value = c; opt.innerText = "Charge: " + c; dataList.appendChild(opt);
-        }});
-
-        if (rawData.facilities) {{
-            rawData.facilities.forEach(fac => {{
-                const opt = document.createElement('option');
-                opt.value = fac; opt.innerText = "🏢 " + fac; facSelect.appendChild(opt);
-            }});
-        }}
+# --- RÉSOLUTION DES IDENTITÉS ---
+# Chaque variante de nom ("Prénom Milieu Nom Suffixe") est rattachée à une personne.
+# Les candidats sont groupés par bloc (Soundex du nom + initiale du prénom) : une variante
+# n'est comparée qu'aux personnes de son bloc, jamais à tout l'export.
 
-        // --- CŒUR DU SYSTÈME : VISIBILITÉ CENTRALISÉE ---
-        function updateVisibility() {{
-            const minDays = parseInt(daysSlider.value);
-            const minDegree = parseInt(degreeSlider.value);
-            const selectedFac = facSelect.value;
-            
-            document.getElementById('days-display').innerText = minDays + "j";
-            document.getElementById('degree-display').innerText = minDegree + "+";
-
-            let focusSet = null;
-            if (currentFocusId !== null) {{
-                focusSet = new Set();
-                focusSet.add(currentFocusId);
-                allEdges.forEach(e => {{
-                    if (e.raw_days >= minDays) {{
-                        if (e.from === currentFocusId) focusSet.add(e.to);
-                        if (e.to === currentFocusId) focusSet.add(e.from);
-                    }}
-                }});
-            }}
-
-            const nodesUpdates = [];
-            let visibleNodeIds = new Set();
-
-            nodes.forEach(n => {{
-                const matchFac = (selectedFac === 'all') || (n.facilities && n.facilities.includes(selectedFac));
-                const matchDegree = n.value >= minDegree;
-                const matchesGlobal = matchFac && matchDegree;
-                const matchesFocus = (focusSet === null) || focusSet.has(n.id);
-                const shouldShow = matchesGlobal && matchesFocus;
-
-                if (shouldShow) {{
-                    visibleNodeIds.add(n.id);
-                    if (n.hidden === true) nodesUpdates.push({{id: n.id, hidden: false}});
-                }} else {{
-                    if (n.hidden !== true) nodesUpdates.push({{id: n.id, hidden: true}});
-                }}
-            }});
-            nodes.update(nodesUpdates);
-
-            const filteredEdges = allEdges.filter(e => {{
-                if (e.raw_days < minDays) return false;
-                if (!visibleNodeIds.has(e.from) || !visibleNodeIds.has(e.to)) return false;
-                return true;
-            }});
-
-            edges.clear();
-            edges.add(filteredEdges);
-
-            statNodes.innerText = visibleNodeIds.size;
-            statEdges.innerText = filteredEdges.length;
-        }}
+RESOLVER_VERSION = 2  # À incrémenter quand les règles de rattachement changent (invalide l'index d'occupation)
+NAME_SUFFIXES = {"JR": "JR", "JUNIOR": "JR", "SR": "SR", "SENIOR": "SR", "II": "II", "2ND": "II",
+                 "III": "III", "3RD": "III", "IV": "IV", "4TH": "IV"}
+SOUNDEX_CODES = {**dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+                 "L": "4", **dict.fromkeys("MN", "5"), "R": "6"}
 
-        daysSlider.addEventListener('input', updateVisibility);
-        degreeSlider.addEventListener('input', updateVisibility);
-        facSelect.addEventListener('change', updateVisibility);
+def normalize_name(text):
+    """Majuscules sans accents ni ponctuation ('' pour une valeur manquante)"""
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").upper()
+    return " ".join("".join(c if c.isalpha() else " " for c in text).split())
 
-        // --- ACTIONS ---
-        function focusNode(id) {{
-            currentFocusId = id; 
-            updateVisibility();
-            network.focus(id, {{ scale: 1.0, animation: {{ duration: 800, easingFunction: 'easeInOutQuad' }} }});
-            network.selectNodes([id]);
-            const node = nodes.get(id);
-            const connectedCount = network.getConnectedNodes(id).length;
-            let facDisplay = node.facilities && node.facilities.length ? node.facilities[0] : "-";
-            if (node.facilities && node.facilities.length > 1) facDisplay += " (+)";
-            showInfo(node, facDisplay, connectedCount, null);
-        }}
+def soundex(name):
+    """Code Soundex américain (lettre initiale + 3 chiffres) d'un nom normalisé"""
+    letters = name.replace(" ", "")
+    if not letters:
+        return ""
+    code, last = letters[0], SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != last:
+            code += digit
+        if c not in "HW":
+            last = digit
+    return (code + "000")[:4]
 
-        function resetView() {{
-            currentFocusId = null;
-            updateVisibility();
-            network.fit({{ animation: {{ duration: 1000 }} }});
-            document.getElementById('search-input').value = '';
-            document.getElementById('info-card').classList.remove('active');
-        }}
+def collect_names(df, person_names=None):
+    """Composantes normalisées (nom, prénom, deuxième prénom, suffixe) de chaque variante de nom"""
+    person_names = {} if person_names is None else person_names
+    variants = df[['Full Name', 'Last Name', 'First Name', 'Middle Name', 'JrSr']].drop_duplicates('Full Name')
+    for name, last, first, middle, suffix in variants.itertuples(index=False):
+        if name not in person_names:
+            suffix = normalize_name(suffix).replace(" ", "")
+            person_names[name] = (normalize_name(last), normalize_name(first), normalize_name(middle),
+                                  NAME_SUFFIXES.get(suffix, suffix))
+    return person_names
 
-        // --- EXPORT PHOTO ---
-        function exportCanvas() {{
-            const canvas = document.querySelector('canvas');
-            const link = document.createElement('a');
-            link.download = 'prison_network_evidence.png';
-            link.href = canvas.toDataURL();
-            link.click();
-        }}
+def booking_events(stays):
+    """Réservations {(établissement, entrée): sortie} de chaque variante : deux variantes qui
+    partagent une même réservation désignent presque sûrement la même personne"""
+    events = {}
+    starts = stays['Booking Date Time'].to_numpy(dtype='datetime64[ns]').view('int64').tolist()
+    ends = stays['Release Date Time'].to_numpy(dtype='datetime64[ns]').view('int64').tolist()
+    for name, facility, start, end in zip(stays['Full Name'].tolist(), stays['Current Facility'].tolist(), starts, ends):
+        known = events.setdefault(name, {})
+        known[(facility, start)] = max(end, known.get((facility, start), end))
+    return events
 
-        // --- RECHERCHE ---
-        document.getElementById('search-input').addEventListener('change', function() {{
-            const val = this.value.toLowerCase();
-            let found = nodes.get({{filter: item => item.label.toLowerCase() === val}});
-            
-            if (found.length === 0) {{
-                const matchedIds = [];
-                nodes.forEach(n => {{
-                    if (n.charges && n.charges.some(c => c.toLowerCase().includes(val))) matchedIds.push(n.id);
-                }});
-                if (matchedIds.length > 0) focusNode(matchedIds[0]);
-            }} else {{
-                focusNode(found[0].id);
-            }}
-        }});
-
-        network.on("click", function(params) {{
-            if (params.nodes.length > 0) {{
-                focusNode(params.nodes[0]);
-            }} else if (params.edges.length > 0) {{
-                const edge = edges.get(params.edges[0]);
-                showInfo(null, null, null, edge.days_count + " jours");
-            }} else {{
-                document.getElementById('info-card').classList.remove('active');
-            }}
-        }});
+def simultaneous_stays(events, other, min_ns):
+    """Vrai si un séjour de `events` et un de `other` se chevauchent d'au moins `min_ns` dans deux
+    établissements différents : une même personne ne peut pas être à deux endroits à la fois
 
-        function showInfo(data, fac, conns, duration) {{
-            const card = document.getElementById('info-card');
-            const chargesContainer = document.getElementById('charges-container');
-            const chargesTags = document.getElementById('charges-tags');
-            
-            if(duration) {{
-                document.getElementById('info-title').innerText = "Relation";
-                document.getElementById('info-fac').innerText = "-";
-                document.getElementById('info-conns').innerText = "-";
-                document.getElementById('info-score').innerText = "-";
-                document.getElementById('row-duration').style.display = 'flex';
-                document.getElementById('info-duration').innerText = duration;
-                chargesContainer.style.display = 'none';
-            }} else {{
-                document.getElementById('info-title').innerText = data.label;
-                document.getElementById('info-fac').innerText = fac;
-                document.getElementById('info-conns').innerText = conns;
-                document.getElementById('info-score').innerText = (data.influence * 100).toFixed(2);
-                document.getElementById('row-duration').style.display = 'none';
-                
-                chargesTags.innerHTML = '';
-                if(data.charges && data.charges.length > 0) {{
-                    chargesContainer.style.display = 'block';
-                    data.charges.forEach(c => {{
-                        const tag = document.createElement('div');
-                        tag.className = 'tag'; tag.innerText = c; chargesTags.appendChild(tag);
-                    }});
-                }} else {{ chargesContainer.style.display = 'none'; }}
-            }}
-            card.classList.add('active');
-        }}
+    Balayage par date d'entrée : chaque séjour n'est comparé qu'aux deux séjours déjà
+    commencés de l'autre côté qui sortent le plus tard (établissements distincts), d'où
+    un coût en O(n log n) au lieu de comparer toutes les paires.
+    """
+    if len(events) <= 1 or len(other) <= 1:
+        small, large = (events, other) if len(events) <= len(other) else (other, events)
+        return any(facility != other_facility and min(end, other_end) - max(start, other_start) >= min_ns
+                   for (facility, start), end in small.items() for (other_facility, other_start), other_end in large.items())
+    stays = sorted((start, end, side, facility) for side, side_stays in enumerate((events, other))
+                   for (facility, start), end in side_stays.items())
+    latest = ([], [])  # par côté : (sortie, établissement) des deux sorties les plus tardives, établissements distincts
+    for start, end, side, facility in stays:
+        if end - start >= min_ns:
+            # Le séjour déjà commencé qui sort le plus tard ailleurs donne le plus long chevauchement
+            other_end = next((e for e, f in latest[1 - side] if f != facility), None)
+            if other_end is not None and other_end - start >= min_ns:
+                return True
+        same = max([end] + [e for e, f in latest[side] if f == facility])
+        latest[side][:] = sorted([(e, f) for e, f in latest[side] if f != facility] + [(same, facility)], reverse=True)[:2]
+    return False
 
-        let physicsOn = true;
-        function togglePhysics() {{
-            physicsOn = !physicsOn;
-            network.setOptions({{physics: physicsOn}});
-            const btn = document.getElementById('btn-physics');
-            btn.innerHTML = physicsOn ? '<i class="fas fa-pause"></i> Pause' : '<i class="fas fa-play"></i> Play';
-        }}
-        
-        updateVisibility();
-    </script>
-</body>
-</html>
+class IdentityResolver:
+    """Rattache les variantes de nom à des personnes aux identifiants stables
+
+    Une personne garde l'identifiant (le nom complet de sa première variante) qu'elle a
+    reçu : les variantes nouvelles, en mode incrémental, sont rattachées sans renuméroter
+    les personnes connues. Le score d'une variante face à une personne de son bloc :
+    prénom (+2 identique, +1 diminutif, -2 différent), nom (+1 identique), deuxième
+    prénom (+2 identique, +1 initiale compatible, -4 différent), suffixe (+1 identique,
+    -4 différent) et réservation commune (+3). Une variante est rattachée à la meilleure
+    personne si son score atteint `threshold` et qu'aucune autre ne fait jeu égal.
+
+    Des séjours simultanés (au moins `conflict_hours`) dans deux établissements différents
+    interdisent le rattachement, quel que soit le score ; split() sépare de même les
+    séjours d'une seule variante en homonymes distincts.
+
+    Un bloc de plus de `block_scan` personnes (noms très courants) n'est plus parcouru
+    en entier : seules les personnes de même nom normalisé ou partageant une réservation
+    avec la variante sont comparées, ce qui garde le coût linéaire.
+    """
+
+    def __init__(self, threshold=RESOLUTION_THRESHOLD, block_scan=RESOLUTION_BLOCK_SCAN,
+                 conflict_hours=RESOLUTION_CONFLICT_HOURS):
+        self.threshold = threshold
+        self.block_scan = block_scan
+        self.conflict_ns = int(conflict_hours * HOUR_NS)
+        self.person = {}   # variante -> identifiant de personne
+        self.splits = {}   # variante -> homonymes dérivés ("NOM #2", ...)
+        self.blocks = {}   # (soundex du nom, initiale du prénom) -> personnes du bloc
+        self.by_name = {}  # (nom, prénom) normalisés -> personnes
+        self.by_event = {} # réservation -> personnes
+        self.profiles = {} # identifiant -> {"block", "last", "first", "middle", "suffix", "events"}
+
+    def _candidates(self, block_key, parts, events):
+        block = self.blocks.get(block_key, [])
+        if len(block) <= self.block_scan:
+            return block
+        found = set(self.by_name.get(parts[:2], ()))
+        for event in events:
+            found.update(p for p in self.by_event.get(event, ()) if self.profiles[p]["block"] == block_key)
+        return sorted(found)
+
+    @staticmethod
+    def _score(parts, events, profile):
+        last, first, middle, suffix = parts
+        if first in profile["first"]:
+            score = 2
+        elif any(f.startswith(first) or first.startswith(f) for f in profile["first"]):
+            score = 1
+        else:
+            score = -2
+        score += 1 if last in profile["last"] else 0
+        known = profile["middle"]
+        if middle and known:
+            if middle == known:
+                score += 2
+            elif (len(middle) == 1 or len(known) == 1) and middle[0] == known[0]:
+                score += 1
+            else:
+                score -= 4
+        if suffix and profile["suffix"]:
+            score += 1 if suffix == profile["suffix"] else -4
+        if events.keys() & profile["events"].keys():
+            score += 3
+        return score
+
+    def _attach(self, name, parts, events, person):
+        last, first, middle, suffix = parts
+        profile = self.profiles[person]
+        if (last, first) not in self.by_name or person not in self.by_name[(last, first)]:
+            self.by_name.setdefault((last, first), []).append(person)
+        profile["last"].add(last)
+        profile["first"].add(first)
+        if len(middle) > len(profile["middle"]):
+            profile["middle"] = middle
+        profile["suffix"] = profile["suffix"] or suffix
+        known = profile["events"]
+        for event, end in events.items():
+            if event not in known:
+                self.by_event.setdefault(event, []).append(person)
+            known[event] = max(end, known.get(event, end))
+        self.person[name] = person
+
+    def split(self, stays, person_names):
+        """Sépare en homonymes les séjours simultanés d'une même variante dans deux établissements
+
+        Chaque séjour rejoint, dans l'ordre des entrées, la première des personnes portant
+        ce nom (variante d'origine puis homonymes "NOM #2", "NOM #3"..., séjours déjà connus
+        compris) avec laquelle il n'est pas en conflit. Seules les variantes déjà connues, ou
+        présentes dans plusieurs établissements avec des séjours qui se chevauchent, sont
+        examinées. En mode incrémental, l'attribution suit l'ordre d'arrivée des lignes.
+        Renvoie (séjours renommés, {homonyme: variante d'origine}) ; les homonymes reprennent
+        les composantes du nom.
         """
-        
-        output_file = "prison_dashboard.html"
-        with open(output_file, "w", encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"Interface Moderne générée : '{output_file}'")
+        names = stays['Full Name'].to_numpy(dtype=object)
+        facilities = stays['Current Facility'].astype(str).to_numpy(dtype=object)
+        starts = stays['Booking Date Time'].to_numpy(dtype='datetime64[ns]').view('int64')
+        ends = stays['Release Date Time'].to_numpy(dtype='datetime64[ns]').view('int64')
+        codes, variants = pd.factorize(names)
+        # Candidates : un séjour entre avant la fin d'un séjour antérieur de la même variante
+        # (séjours identiques, une réservation par charge, comptés une fois)
+        distinct = pd.DataFrame({"code": codes, "facility": pd.factorize(facilities)[0], "start": starts, "end": ends})
+        distinct = distinct.drop_duplicates().sort_values(["code", "start"])
+        code, start = distinct["code"].to_numpy(), distinct["start"].to_numpy()
+        reach = distinct["end"].groupby(code).cummax().to_numpy()
+        follows = code[1:] == code[:-1]
+        overlapping = np.zeros(len(variants), dtype=bool)
+        overlapping[code[1:][follows & (reach[:-1] - start[1:] >= self.conflict_ns)]] = True
+        spread = distinct["facility"].groupby(code).nunique().to_numpy() > 1
+        known = np.fromiter((name in self.person for name in variants), dtype=bool, count=len(variants))
+        order = np.lexsort((starts, codes))
+        rows = order[((overlapping & spread) | known)[codes[order]]]
+        if not len(rows):
+            return stays, {}
 
-    except Exception as e:
-        print(f"Erreur critique: {e}")
+        renamed, derived = names.copy(), {}
+        groups, current = [], None
+        for row in rows.tolist():
+            name = names[row]
+            if name != current:
+                current = name
+                groups = [[sub, self.profiles[self.person[sub]]["events"] if sub in self.person else {}, {}]
+                          for sub in [name] + self.splits.get(name, [])]
+            key = (facilities[row], int(starts[row]))
+            event = {key: int(ends[row])}
+            # Une réservation déjà rattachée (sortie mise à jour) reste chez son homonyme
+            group = next((g for g in groups if key in g[1] or key in g[2]), None)
+            if group is None:
+                group = next((g for g in groups if not (simultaneous_stays(event, g[1], self.conflict_ns)
+                                                        or simultaneous_stays(event, g[2], self.conflict_ns))), None)
+            if group is None:
+                group = [f"{name} #{len(groups) + 1}", {}, {}]
+                groups.append(group)
+                self.splits.setdefault(name, []).append(group[0])
+            group[2].update(event)
+            if group[0] != name:
+                renamed[row] = group[0]
+                derived[group[0]] = name
+        if derived:
+            stays = stays.assign(**{'Full Name': renamed})
+        return stays, derived
 
-    generate_landing_page()
+    def resolve(self, person_names, events=None):
+        """Rattache les variantes encore inconnues ; renvoie {variante: identifiant} pour `person_names`
+
+        Les variantes les plus complètes (deuxième prénom entier, suffixe) passent en
+        premier : les variantes partielles se rattachent ensuite à une personne déjà
+        décrite, quel que soit l'ordre des lignes dans l'export.
+        """
+        events = events or {}
+        # Variantes connues : leurs nouveaux séjours complètent le profil de la personne
+        for name in person_names:
+            if name in self.person and name in events:
+                self._attach(name, person_names[name], events[name], self.person[name])
+        pending = [name for name in person_names if name not in self.person]
+        pending.sort(key=lambda name: (-len(person_names[name][2]), not person_names[name][3], name))
+        for name in pending:
+            parts = person_names[name]
+            last, first = parts[0], parts[1]
+            block_key = (soundex(last) or last, first[:1])
+            found = events.get(name, {})
+            scored = sorted(((self._score(parts, found, self.profiles[p]), p)
+                             for p in self._candidates(block_key, parts, found)), reverse=True)
+            # Séjours simultanés dans deux établissements : jamais la même personne
+            scored = [(score, p) for score, p in scored if score >= self.threshold
+                      and not simultaneous_stays(found, self.profiles[p]["events"], self.conflict_ns)]
+            if scored and (len(scored) == 1 or scored[1][0] < scored[0][0]):
+                self._attach(name, parts, found, scored[0][1])
+                continue
+            self.profiles[name] = {"block": block_key, "last": set(), "first": set(), "middle": "", "suffix": "",
+                                   "events": {}}
+            self.blocks.setdefault(block_key, []).append(name)
+            self._attach(name, parts, found, name)
+        return {name: self.person[name] for name in person_names}
+
+    def __len__(self):
+        return len(self.profiles)
+
+def merge_charges(charges, person, new_charges):
+    """Ajoute à charges[person] les charges pas encore connues, dans l'ordre d'apparition"""
+    known = charges.setdefault(person, [])
+    seen = set(known)
+    known.extend(c for c in new_charges if c not in seen)
+
+def resolve_identities(stays, person_charges, person_names, resolver):
+    """Remplace chaque variante de nom par l'identifiant de sa personne dans les séjours et les charges
+
+    Les charges sont agrégées par variante, sans lien avec un séjour : un homonyme séparé
+    par resolver.split() reçoit celles de sa variante d'origine.
+    """
+    stays, derived = resolver.split(stays, person_names)
+    if derived:
+        person_names = {**person_names, **{sub: person_names[name] for sub, name in derived.items()}}
+        person_charges = {**person_charges, **{sub: person_charges.get(name, []) for sub, name in derived.items()}}
+    mapping = resolver.resolve(person_names, booking_events(stays))
+    if any(name != person for name, person in mapping.items()):
+        # Deux variantes d'une même personne peuvent partager un séjour : reconsolidation
+        stays = consolidate_stays(stays.assign(**{'Full Name': stays['Full Name'].map(mapping)}))
+
+    charges = {}
+    for name, known in person_charges.items():
+        merge_charges(charges, mapping[name], known)
+    return stays, charges
+
+# --- CACHE COLONNAIRE ---
+
+CACHE_VERSION = 2
+
+def _file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cache_key(csv_path):
+    """Chemin, taille, date de modification et empreinte du contenu de l'export"""
+    stat = os.stat(csv_path)
+    return {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _file_sha256(csv_path),
+    }
+
+def _charges_frame(person_charges):
+    """Forme longue (détenu, charge) ; une charge vide garde les détenus sans charge"""
+    rows = [(name, charge) for name, charges in person_charges.items() for charge in (charges or [None])]
+    return pd.DataFrame(rows, columns=['Full Name', 'Charge'])
+
+def _charges_from_frame(frame):
+    person_charges = {}
+    for name, charge in zip(frame['Full Name'].tolist(), frame['Charge'].tolist()):
+        charges = person_charges.setdefault(name, [])
+        if isinstance(charge, str):
+            charges.append(charge)
+    return person_charges
+
+NAME_PARTS = ['Last Name', 'First Name', 'Middle Name', 'JrSr']
+
+def _names_frame(person_names):
+    return pd.DataFrame([(name, *parts) for name, parts in person_names.items()], columns=['Full Name'] + NAME_PARTS)
+
+def _names_from_frame(frame):
+    return {name: tuple(parts) for name, *parts in frame[['Full Name'] + NAME_PARTS].itertuples(index=False)}
+
+def _write_npy_columns(frame, directory):
+    """Une colonne par fichier .npy : codes int32 + dictionnaire pour le texte, int64 pour les dates"""
+    schema = []
+    for i, column in enumerate(frame.columns):
+        values = frame[column]
+        path = os.path.join(directory, f"{i}.npy")
+        if pd.api.types.is_datetime64_any_dtype(values):
+            array = values.to_numpy()
+            np.save(path, array.view('int64'))
+            schema.append({"name": column, "kind": "datetime", "dtype": str(array.dtype)})
+        else:
+            codes, uniques = pd.factorize(values)
+            np.save(path, codes.astype('int32'))
+            schema.append({"name": column, "kind": "category", "uniques": [str(u) for u in uniques]})
+    return schema
+
+def _read_npy_columns(schema, directory):
+    columns = {}
+    for i, spec in enumerate(schema):
+        array = np.load(os.path.join(directory, f"{i}.npy"), mmap_mode='r')
+        if spec["kind"] == "datetime":
+            columns[spec["name"]] = array.view(spec["dtype"])
+        else:
+            uniques = np.array(spec["uniques"] + [None], dtype=object)
+            columns[spec["name"]] = uniques[array]  # le code -1 désigne une valeur manquante
+    return pd.DataFrame(columns)
+
+def save_stays_cache(cache_dir, key, stays, person_charges, person_names):
+    os.makedirs(cache_dir, exist_ok=True)
+    meta = {"key": key, "format": "feather" if feather is not None else "npy"}
+    frames = {"stays": stays, "charges": _charges_frame(person_charges), "names": _names_frame(person_names)}
+    for name, frame in frames.items():
+        if feather is not None:
+            feather.write_feather(frame.reset_index(drop=True), os.path.join(cache_dir, f"{name}.feather"))
+        else:
+            directory = os.path.join(cache_dir, name)
+            os.makedirs(directory, exist_ok=True)
+            meta[name] = _write_npy_columns(frame, directory)
+    # meta.json en dernier : un cache interrompu en cours d'écriture reste invalide
+    with open(os.path.join(cache_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+def load_stays_cache(cache_dir, key):
+    """(séjours, charges, variantes de nom) si le cache correspond à l'export courant, sinon None"""
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get("key") != key:
+        return None
+
+    frames = {}
+    for name in ("stays", "charges", "names"):
+        if meta["format"] == "feather":
+            if feather is None:
+                return None
+            frames[name] = feather.read_feather(os.path.join(cache_dir, f"{name}.feather"), memory_map=True)
+        else:
+            frames[name] = _read_npy_columns(meta[name], os.path.join(cache_dir, name))
+    return frames["stays"], _charges_from_frame(frames["charges"]), _names_from_frame(frames["names"])
+
+def load_stays(csv_path=DATA_FILE, cache_dir=CACHE_DIR, chunk_rows=STREAM_CHUNK_ROWS, resolver=None, report=None):
+    """Étapes 1 à 3 : séjours consolidés et charges par personne, relus du cache si l'export n'a pas changé
+
+    Le cache conserve les variantes de nom : la résolution des identités (complétant
+    `resolver` s'il est fourni) est refaite à chaque chargement.
+    """
+    report = report or PipelineReport()
+    key = _cache_key(csv_path) if cache_dir else None
+    cached = None
+    if key is not None:
+        # Étape distincte de "load" : un cache absent ou périmé ne compte pas deux chargements
+        with report.stage("cache") as counts:
+            cached = load_stays_cache(cache_dir, key)
+            counts["hit"] = cached is not None
+            if cached is not None:
+                counts.update(stays=len(cached[0]), variants=len(cached[2]))
+        if cached is not None:
+            print(f"Séjours relus depuis le cache '{cache_dir}'.")
+
+    if cached is not None:
+        stays, person_charges, person_names = cached
+    elif chunk_rows:
+        # 1 à 3 en un seul passage par blocs
+        with report.stage("load", source="stream", chunk_rows=chunk_rows) as counts:
+            stays, person_charges, person_names = stream_stays(csv_path, chunk_rows)
+            counts.update(stays=len(stays), variants=len(person_names))
+    else:
+        # 1. Chargement et nettoyage
+        with report.stage("load", source="csv") as counts:
+            df = load_bookings(csv_path)
+            counts["rows"] = len(df)
+
+        # 2. Extraction des charges
+        with report.stage("charges") as counts:
+            person_charges = collect_charges(df)
+            person_names = collect_names(df)
+            counts.update(variants=len(person_names), charges=sum(map(len, person_charges.values())))
+
+        # 3. Consolidation des séjours
+        with report.stage("consolidation") as counts:
+            stays = consolidate_stays(df)
+            counts["stays"] = len(stays)
+
+    if key is not None and cached is None:
+        save_stays_cache(cache_dir, key, stays, person_charges, person_names)
+
+    # 3bis. Résolution des identités : variantes de nom -> personnes
+    resolver = IdentityResolver() if resolver is None else resolver
+    with report.stage("identities") as counts:
+        stays, person_charges = resolve_identities(stays, person_charges, person_names, resolver)
+        counts.update(variants=len(person_names), persons=len(person_charges))
+    print(f"{len(person_names)} variantes de nom rattachées à {len(person_charges)} personnes.")
+    return stays, person_charges
+
+# --- MOTEUR DE CO-INCARCÉRATION ---
+
+def _overlap_hours(delta):
+    """Convertit une durée de chevauchement (ns) en heures, comme Timedelta.total_seconds() / 3600"""
+    return (delta / 1e9) / 3600
+
+def _facility_arrays(facility_stays):
+    """Extrait noms, entrées et sorties (int64 ns epoch) des séjours d'un établissement"""
+    names = facility_stays['Full Name'].tolist()
+    starts = facility_stays['Booking Date Time'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    ends = facility_stays['Release Date Time'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    return names, starts, ends
+
+def _add_edge(edges_ns, name_a, name_b, delta):
+    key = (name_a, name_b) if name_a < name_b else (name_b, name_a)
+    edges_ns[key] = edges_ns.get(key, 0) + delta
+    return key
+
+def _facility_edges_loop(names, starts, ends, min_hours, edges_ns):
+    """Référence historique : comparaison de toutes les paires, O(n²)"""
+    starts, ends = starts.tolist(), ends.tolist()
+    n = len(names)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if names[i] == names[j]:
+                continue
+
+            start_overlap = max(starts[i], starts[j])
+            end_overlap = min(ends[i], ends[j])
+
+            if end_overlap > start_overlap:
+                delta = end_overlap - start_overlap
+                if _overlap_hours(delta) >= min_hours:
+                    _add_edge(edges_ns, names[i], names[j], delta)
+
+def _facility_edges_sweep(names, starts, ends, min_hours, edges_ns, first_anchor=0):
+    """Balayage par date d'entrée : O(n log n + paires émises)
+
+    Les séjours sont parcourus par entrée croissante. Le tas `active` ne garde que
+    les séjours dont la sortie laisse encore au moins `min_hours` après l'entrée
+    courante : tout séjour évincé ne peut plus atteindre le seuil avec les suivants.
+    Chaque séjour restant dans le tas produit donc une relation conservée.
+    Les séjours d'indice < `first_anchor` servent seulement de contexte : ils entrent
+    dans le tas mais n'émettent pas de paires entre eux.
+    """
+    def long_enough(delta):
+        return delta > 0 and _overlap_hours(delta) >= min_hours
+
+    starts, ends = starts.tolist(), ends.tolist()
+    order = sorted(range(len(names)), key=starts.__getitem__)
+    active = []  # tas (sortie, index)
+    for i in order:
+        start, end = starts[i], ends[i]
+        while active and not long_enough(active[0][0] - start):
+            heapq.heappop(active)
+
+        # Séjour trop court : aucun chevauchement possible au-delà du seuil
+        if not long_enough(end - start):
+            continue
+
+        if i >= first_anchor:
+            name = names[i]
+            for other_end, j in active:
+                if names[j] == name:
+                    continue
+                _add_edge(edges_ns, name, names[j], min(other_end, end) - start)
+        heapq.heappush(active, (end, i))
+
+def _facility_edges_numpy(names, starts, ends, min_hours, edges_ns, block_size=OVERLAP_BLOCK_SIZE):
+    """Chevauchements calculés par tuiles NumPy (diffusion bloc x bloc sur int64)
+
+    Après tri par entrée, les candidats d'un séjour i sont les séjours j > i entrés
+    avant sa sortie : chaque bloc de lignes n'est comparé qu'aux colonnes de cette
+    fenêtre, par tuiles de `block_size` pour borner la mémoire. Les durées retenues
+    sont ensuite réduites par paire en int64 avant de rejoindre `edges_ns`.
+    """
+    n = len(names)
+    if n < 2:
+        return
+    codes, uniques = pd.factorize(pd.Series(names))
+    order = np.argsort(starts, kind='stable')
+    starts, ends, codes = starts[order], ends[order], codes[order]
+    window_end = np.searchsorted(starts, ends, side='left')
+
+    found_lo, found_hi, found_delta = [], [], []
+    for row in range(0, n, block_size):
+        row_end = min(n, row + block_size)
+        col_stop = int(window_end[row:row_end].max())
+        rows = np.arange(row, row_end)[:, None]
+        row_starts, row_ends, row_codes = starts[row:row_end, None], ends[row:row_end, None], codes[row:row_end, None]
+
+        for col in range(row + 1, col_stop, block_size):
+            col_end = min(col_stop, col + block_size)
+            delta = np.minimum(row_ends, ends[None, col:col_end]) - np.maximum(row_starts, starts[None, col:col_end])
+            keep = (np.arange(col, col_end)[None, :] > rows) & (row_codes != codes[None, col:col_end]) & (delta > 0)
+            keep &= _overlap_hours(delta) >= min_hours
+            i, j = np.nonzero(keep)
+            if len(i):
+                a, b = codes[row + i], codes[col + j]
+                found_lo.append(np.minimum(a, b))
+                found_hi.append(np.maximum(a, b))
+                found_delta.append(delta[i, j])
+
+    if not found_lo:
+        return
+    lo, hi, deltas = np.concatenate(found_lo), np.concatenate(found_hi), np.concatenate(found_delta)
+    keys = lo.astype('int64') * len(uniques) + hi
+    order = np.argsort(keys, kind='stable')
+    keys, deltas = keys[order], deltas[order]
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    totals = np.add.reduceat(deltas, first)
+    for key, total in zip(keys[first].tolist(), totals.tolist()):
+        _add_edge(edges_ns, uniques[key // len(uniques)], uniques[key % len(uniques)], total)
+
+def _facility_edges_sparse(names, starts, ends, min_hours, edges_ns, bucket_hours=SPARSE_BUCKET_HOURS,
+                           block_rows=4096):
+    """Co-présence par produit creux A·Aᵀ, A = séjours x cases de temps de `bucket_hours`
+
+    A[s, b] = 1 si le séjour s couvre la case b : (A·Aᵀ)[i, j] compte les cases partagées
+    et k cases bornent le chevauchement à k·bucket_hours, ce qui écarte sans calcul les
+    paires trop courtes. Les candidates restantes reçoivent leur durée exacte en ns. Les
+    lignes sont des séjours (seuil par paire de séjours, comme les autres moteurs) ; les
+    paires sont ensuite repliées par détenu dans une matrice creuse qui somme les doublons.
+    """
+    def long_enough(delta):
+        return (delta > 0) & (_overlap_hours(delta) >= min_hours)
+
+    codes, uniques = pd.factorize(pd.Series(names))
+    rows = np.flatnonzero(long_enough(ends - starts))
+    if len(rows) < 2:
+        return
+    starts, ends, codes = starts[rows], ends[rows], codes[rows]
+
+    bucket = max(1, int(bucket_hours * 3600 * 10**9))
+    origin = starts.min()
+    first, last = (starts - origin) // bucket, (ends - 1 - origin) // bucket
+    counts = last - first + 1
+    indptr = np.r_[0, np.cumsum(counts)]
+    indices = np.repeat(first - indptr[:-1], counts) + np.arange(indptr[-1])
+    A = sparse.csr_matrix((np.ones(indptr[-1], dtype=np.int32), indices, indptr),
+                          shape=(len(rows), int(last.max()) + 1))
+    At = A.T.tocsr()
+
+    found_i, found_j, found_delta = [], [], []
+    for block in range(0, len(rows), block_rows):
+        shared = (A[block:block + block_rows] @ At).tocoo()
+        i, j = shared.row + block, shared.col
+        keep = (j > i) & (codes[i] != codes[j]) & long_enough(shared.data.astype(np.int64) * bucket)
+        i, j = i[keep], j[keep]
+        delta = np.minimum(ends[i], ends[j]) - np.maximum(starts[i], starts[j])
+        keep = long_enough(delta)
+        found_i.append(codes[i[keep]])
+        found_j.append(codes[j[keep]])
+        found_delta.append(delta[keep])
+
+    a, b = np.concatenate(found_i), np.concatenate(found_j)
+    persons = sparse.coo_matrix((np.concatenate(found_delta), (np.minimum(a, b), np.maximum(a, b))),
+                                shape=(len(uniques), len(uniques))).tocsr().tocoo()
+    for a, b, total in zip(persons.row.tolist(), persons.col.tolist(), persons.data.tolist()):
+        _add_edge(edges_ns, uniques[a], uniques[b], total)
+
+EDGE_BACKENDS = {
+    "loop": _facility_edges_loop,
+    "sweep": _facility_edges_sweep,
+    "numpy": _facility_edges_numpy,
+}
+if sparse is not None:
+    EDGE_BACKENDS["sparse"] = _facility_edges_sparse
+
+def _sweep_window(task):
+    """Tâche de travail : balayage d'une fenêtre (contexte + ancres) codée en tableaux compacts"""
+    codes, starts, ends, first_anchor, min_hours = task
+    partial = {}
+    _facility_edges_sweep(codes.tolist(), starts, ends, min_hours, partial, first_anchor=first_anchor)
+    return partial
+
+def _window_tasks(codes, starts, ends, min_hours, window_stays):
+    """Découpe un établissement en fenêtres d'entrée de `window_stays` séjours ancres
+
+    Une paire est émise par la fenêtre de son séjour entré le plus tard ; chaque fenêtre
+    reçoit donc aussi, en contexte, les séjours antérieurs encore présents au moins
+    `min_hours` après sa première entrée.
+    """
+    order = np.argsort(starts, kind='stable')
+    codes, starts, ends = codes[order], starts[order], ends[order]
+    longest = max(0, int((ends - starts).max()))
+    for first in range(0, len(starts), window_stays):
+        last = min(len(starts), first + window_stays)
+        lo = np.searchsorted(starts, starts[first] - longest, side='left')
+        before = np.arange(lo, first)
+        remaining = ends[before] - starts[first]
+        context = before[(remaining > 0) & (_overlap_hours(remaining) >= min_hours)]
+        idx = np.concatenate([context, np.arange(first, last)])
+        yield codes[idx], starts[idx], ends[idx], len(context), min_hours
+
+def _merge_partial_edges(edges_ns, partial, names):
+    for (a, b), total in partial.items():
+        _add_edge(edges_ns, names[a], names[b], total)
+
+def _compute_edges_ns_parallel(stays, min_hours, workers=PARALLEL_WORKERS, window_stays=EDGE_WINDOW_STAYS):
+    """Map-reduce par établissement (et par fenêtre de temps pour les plus grands) sur un pool de processus
+
+    Les processus reçoivent des tableaux int32/int64 (codes détenus, entrées, sorties)
+    et renvoient des totaux partiels par paire de codes, additionnés ici.
+    """
+    codes, names = pd.factorize(stays['Full Name'])
+    codes = codes.astype('int32')
+    facility_codes, facilities = pd.factorize(stays['Current Facility'])
+    starts = stays['Booking Date Time'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    ends = stays['Release Date Time'].to_numpy(dtype='datetime64[ns]').astype('int64')
+
+    tasks = []
+    for facility in range(len(facilities)):
+        rows = np.flatnonzero(facility_codes == facility)
+        tasks.extend(_window_tasks(codes[rows], starts[rows], ends[rows], min_hours, window_stays))
+    # Les plus grosses fenêtres d'abord : elles ne finissent pas en dernier
+    tasks.sort(key=lambda task: len(task[0]), reverse=True)
+
+    edges_ns = {}
+    if workers <= 1:
+        for partial in map(_sweep_window, tasks):
+            _merge_partial_edges(edges_ns, partial, names)
+        return edges_ns
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_sweep_window, tasks):
+            _merge_partial_edges(edges_ns, partial, names)
+    return edges_ns
+
+EDGE_MODES = sorted([*EDGE_BACKENDS, "parallel"])
+
+def compute_edges_ns(stays, min_hours, backend=EDGE_BACKEND, **options):
+    """Somme, par paire de détenus, les nanosecondes de co-incarcération >= min_hours dans chaque établissement
+
+    Les moteurs cumulent des nanosecondes entières : le total d'une paire ne dépend
+    donc pas de l'ordre d'émission et tous les moteurs rendent exactement les mêmes heures.
+    `options` est transmis au moteur (ex: block_size pour "numpy", workers pour "parallel").
+    """
+    if backend == "parallel":
+        return _compute_edges_ns_parallel(stays, min_hours, **options)
+    facility_edges = EDGE_BACKENDS[backend]
+    edges_ns = {}
+    for facility, facility_stays in stays.groupby('Current Facility', sort=False):
+        names, starts, ends = _facility_arrays(facility_stays)
+        facility_edges(names, starts, ends, min_hours, edges_ns, **options)
+    return edges_ns
+
+def compute_edges(stays, min_hours, backend=EDGE_BACKEND, **options):
+    """Comme compute_edges_ns, en heures"""
+    edges_ns = compute_edges_ns(stays, min_hours, backend=backend, **options)
+    return {pair: _overlap_hours(total) for pair, total in edges_ns.items()}
+
+def verify_edge_backends(stays, min_hours, backends=None, reference="loop", tolerance=0.0):
+    """Compare chaque moteur au moteur de référence (mêmes paires, mêmes durées)"""
+    expected = compute_edges(stays, min_hours, backend=reference)
+    ok = True
+    for backend in backends or [b for b in EDGE_MODES if b != reference]:
+        found = compute_edges(stays, min_hours, backend=backend)
+        missing = expected.keys() - found.keys()
+        extra = found.keys() - expected.keys()
+        drift = [k for k in expected.keys() & found.keys()
+                 if abs(expected[k] - found[k]) > tolerance * max(1.0, abs(expected[k]))]
+        if missing or extra or drift:
+            ok = False
+            print(f"[{backend}] ÉCART : {len(missing)} manquantes, {len(extra)} en trop, {len(drift)} durées divergentes")
+        else:
+            print(f"[{backend}] OK : {len(found)} relations identiques à '{reference}'")
+    return ok
+
+# --- INDEX D'OCCUPATION ---
+
+HOUR_NS = 3600 * 10**9
+
+class OccupancyIndex:
+    """Index des séjours par établissement pour les requêtes « qui était présent avec X »
+
+    Dans chaque établissement, les séjours sont répartis en classes de durée
+    (puissances de 2 en heures) puis triés par entrée. Pour un intervalle [a, b],
+    chaque classe n'examine que les entrées de [a - durée max de la classe, b[ :
+    les séjours très longs (détention à domicile...) n'élargissent donc pas la
+    fenêtre des séjours courts. Les lignes renvoyées sont celles de la table `stays`.
+
+    Le mode incrémental ajoute ou prolonge des séjours sans reconstruire l'index : les
+    lignes touchées forment un nouveau segment trié, fusionné avec les segments plus
+    récents de taille comparable (chaque ligne est retriée O(log n) fois au total). Une
+    ligne prolongée reste dans son ancien segment mais n'y est plus comptée.
+    """
+
+    COLUMNS = ('person', 'facility', 'starts', 'ends')
+
+    def __init__(self, names, facilities, person, facility, starts, ends, source=None):
+        self.names = list(names)
+        self.facilities = list(facilities)
+        self._size = len(starts)
+        self._buffers = {'person': np.asarray(person, dtype='int32'), 'facility': np.asarray(facility, dtype='int32'),
+                         'starts': np.asarray(starts, dtype='int64'), 'ends': np.asarray(ends, dtype='int64')}
+        self._expose()
+        self.source = source
+        self._name_ids = {name: i for i, name in enumerate(self.names)}
+        self._facility_ids = {facility: i for i, facility in enumerate(self.facilities)}
+        self._segments = []
+        self._segment_of = np.zeros(self._size, dtype='int32')
+        self._moved = 0  # lignes prolongées encore présentes dans un ancien segment
+        self._add_segment(np.arange(self._size))
+        person_order = np.argsort(self.person, kind='stable')
+        self._person_rows = person_order
+        self._person_indptr = np.searchsorted(self.person[person_order], np.arange(len(self.names) + 1))
+        self._person_extra = {}  # personne -> lignes ajoutées depuis la construction
+
+    @classmethod
+    def from_stays(cls, stays, source=None):
+        person, names = pd.factorize(stays['Full Name'])
+        facility, facilities = pd.factorize(stays['Current Facility'])
+        starts = stays['Booking Date Time'].to_numpy(dtype='datetime64[ns]').astype('int64')
+        ends = stays['Release Date Time'].to_numpy(dtype='datetime64[ns]').astype('int64')
+        return cls(names, facilities, person, facility, starts, ends, source=source)
+
+    def __len__(self):
+        return self._size
+
+    def _expose(self):
+        # Vues sur des tampons à capacité doublée : un ajout ne recopie pas tout l'historique
+        for column in self.COLUMNS:
+            setattr(self, column, self._buffers[column][:self._size])
+
+    def _segment(self, rows):
+        """Séjours `rows` triés par établissement, classe de durée puis entrée"""
+        lengths = np.maximum(self.ends[rows] - self.starts[rows], 0)
+        tier = np.floor(np.log2(np.maximum(lengths, HOUR_NS) / HOUR_NS)).astype('int32')
+        sort = np.lexsort((self.starts[rows], tier, self.facility[rows]))
+        order, lengths, tier = rows[sort], lengths[sort], tier[sort]
+        change = np.flatnonzero(np.diff(self.facility[order]) | np.diff(tier)) + 1
+        bounds = np.r_[0, change, len(order)]
+
+        buckets = {}  # établissement -> [(début, fin, durée max)]
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            if lo == hi:
+                continue
+            buckets.setdefault(int(self.facility[order[lo]]), []).append((lo, hi, int(lengths[lo:hi].max())))
+        return {"rows": order, "starts": self.starts[order], "buckets": buckets}
+
+    def _add_segment(self, rows):
+        """Indexe `rows` dans un segment neuf, absorbant les derniers segments au plus deux fois plus grands"""
+        rows = np.asarray(rows, dtype='int64')
+        while self._segments and len(self._segments[-1]["rows"]) <= 2 * len(rows):
+            k = len(self._segments) - 1
+            old = self._segments.pop()["rows"]
+            live = self._segment_of[old] == k
+            self._moved -= int((~live).sum())
+            rows = np.concatenate([old[live], rows])
+        self._segments.append(self._segment(rows))
+        self._segment_of[rows] = len(self._segments) - 1
+
+    def _append(self, columns):
+        """Ajoute des lignes (tableaux de COLUMNS) ; renvoie leurs numéros"""
+        count = len(columns['starts'])
+        if self._size + count > len(self._buffers['starts']):
+            capacity = max(2 * len(self._buffers['starts']), self._size + count)
+            for column, buffer in self._buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:self._size] = buffer[:self._size]
+                self._buffers[column] = grown
+            segment_of = np.zeros(capacity, dtype='int32')
+            segment_of[:self._size] = self._segment_of[:self._size]
+            self._segment_of = segment_of
+        rows = np.arange(self._size, self._size + count)
+        for column in self.COLUMNS:
+            self._buffers[column][rows] = columns[column]
+        self._size += count
+        self._expose()
+        return rows
+
+    def update(self, rows, starts, ends, names, facilities, new_starts, new_ends):
+        """Prolonge les séjours `rows` et ajoute les séjours (names, facilities, new_starts, new_ends)
+
+        Renvoie les lignes des séjours ajoutés ; seuls les séjours touchés sont retriés.
+        """
+        rows = np.asarray(rows, dtype='int64')
+        self._buffers['starts'][rows] = starts
+        self._buffers['ends'][rows] = ends
+        self._segment_of[rows] = -1  # anciennes positions ignorées jusqu'à la fusion de leur segment
+        self._moved += len(rows)
+
+        def intern(values, ids, known):
+            for value in values:
+                if value not in ids:
+                    ids[value] = len(known)
+                    known.append(value)
+            return np.array([ids[value] for value in values], dtype='int32')
+
+        person = intern(names, self._name_ids, self.names)
+        added = self._append({'person': person, 'facility': intern(facilities, self._facility_ids, self.facilities),
+                              'starts': new_starts, 'ends': new_ends})
+        for pid, row in zip(person.tolist(), added.tolist()):
+            self._person_extra.setdefault(pid, []).append(row)
+        self._add_segment(np.concatenate([rows, added]))
+        return added
+
+    def overlapping(self, facility, start, end):
+        """Lignes des séjours de `facility` présents sur ]start, end[ (dates en ns ou Timestamp)"""
+        start, end = _as_ns(start), _as_ns(end)
+        fid = self._facility_ids.get(facility)
+        if fid is None:
+            return np.empty(0, dtype='int64')
+        found = []
+        for k, segment in enumerate(self._segments):
+            for lo, hi, longest in segment["buckets"].get(fid, ()):
+                first = lo + np.searchsorted(segment["starts"][lo:hi], start - longest, side='left')
+                last = lo + np.searchsorted(segment["starts"][lo:hi], end, side='left')
+                rows = segment["rows"][first:last]
+                if self._moved:
+                    rows = rows[self._segment_of[rows] == k]
+                found.append(rows[self.ends[rows] > start])
+        return np.concatenate(found) if found else np.empty(0, dtype='int64')
+
+    def person_ids(self, names):
+        """Identifiants (ceux de la colonne person) des détenus `names`"""
+        return np.fromiter((self._name_ids[name] for name in names), dtype='int64', count=len(names))
+
+    def stays_of(self, name):
+        """Lignes des séjours d'un détenu"""
+        pid = self._name_ids.get(name)
+        if pid is None:
+            return np.empty(0, dtype='int64')
+        rows = self._person_rows[self._person_indptr[pid]:self._person_indptr[pid + 1]] if pid + 1 < len(self._person_indptr) \
+            else self._person_rows[:0]
+        extra = self._person_extra.get(pid)
+        return np.concatenate([rows, extra]) if extra else rows
+
+    def overlaps_of(self, row, min_hours):
+        """(lignes, chevauchements en ns) des autres détenus restés au moins `min_hours` avec le séjour `row`"""
+        start, end = int(self.starts[row]), int(self.ends[row])
+        rows = self.overlapping(self.facilities[self.facility[row]], start, end)
+        rows = rows[self.person[rows] != self.person[row]]
+        delta = np.minimum(self.ends[rows], end) - np.maximum(self.starts[rows], start)
+        keep = (delta > 0) & (_overlap_hours(delta) >= min_hours)
+        return rows[keep], delta[keep]
+
+    def pair_intervals(self, min_hours):
+        """Chevauchements (personne a, personne b, début, fin en ns) des paires de séjours >= min_hours
+
+        Mêmes paires de séjours que le graphe, chacune une seule fois (ligne a < ligne b).
+        """
+        found = []
+        for row in np.flatnonzero(_overlap_hours(self.ends - self.starts) >= min_hours).tolist():
+            rows, _ = self.overlaps_of(row, min_hours)
+            rows = rows[rows > row]
+            found.append((np.full(len(rows), self.person[row]), self.person[rows],
+                          np.maximum(self.starts[rows], self.starts[row]), np.minimum(self.ends[rows], self.ends[row])))
+        if not found:
+            return tuple(np.empty(0, dtype='int64') for _ in range(4))
+        return tuple(np.concatenate(column) for column in zip(*found))
+
+    def co_detainees(self, name, min_hours=MIN_DURATION_FILTER):
+        """Heures passées avec chaque codétenu, mêmes règles que le graphe (paires de séjours >= min_hours)"""
+        totals = {}
+        for row in self.stays_of(name).tolist():
+            rows, delta = self.overlaps_of(row, min_hours)
+            for other, d in zip(self.person[rows].tolist(), delta.tolist()):
+                totals[other] = totals.get(other, 0) + d
+        return {self.names[other]: _overlap_hours(total) for other, total in totals.items()}
+
+    def save(self, path):
+        np.savez(path, names=np.array(self.names, dtype=str), facilities=np.array(self.facilities, dtype=str),
+                 person=self.person, facility=self.facility, starts=self.starts, ends=self.ends,
+                 source=np.array(self.source or ""))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['names'].tolist(), data['facilities'].tolist(), data['person'], data['facility'],
+                       data['starts'], data['ends'], source=str(data['source']) or None)
+
+def _as_ns(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).as_unit('ns').value)
+
+def query_occupancy(csv_path=DATA_FILE, person=None, facility=None, start=None, end=None,
+                    min_hours=MIN_DURATION_FILTER, cache_dir=CACHE_DIR):
+    """Requêtes sans reconstruire le graphe : codétenus d'une personne, présents dans un établissement"""
+    stays, _ = load_stays(csv_path, cache_dir=cache_dir)
+    index = load_occupancy_index(stays, cache_dir)
+
+    if person:
+        started = time.perf_counter()
+        found = index.co_detainees(person, min_hours)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{person} : {len(found)} codétenus (>= {min_hours}h par séjour) en {elapsed:.2f} ms")
+        for other, hours in sorted(found.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {other:<40} {hours / 24:8.1f} jours")
+
+    if facility:
+        start = start if start is not None else int(index.starts.min())
+        end = end if end is not None else int(index.ends.max())
+        started = time.perf_counter()
+        rows = index.overlapping(facility, start, end)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{facility} : {len(rows)} séjours présents sur la période en {elapsed:.2f} ms")
+        for row in stays.iloc[np.sort(rows)].itertuples(index=False):
+            print(f"  {row[0]:<14} {row[1]:<40} {row[3]} -> {row[4]}")
+
+def _occupancy_key(stays, sha256):
+    """Clé de l'index d'occupation : version du cache, export, règles de résolution et séjours indexés
+
+    Les séjours sont ceux déjà résolus : une empreinte de leur contenu écarte un index
+    construit avant la résolution des identités ou avec d'autres réglages. L'empreinte
+    suit l'ordre des lignes : l'index désigne les séjours par leur position.
+    """
+    rows = pd.util.hash_pandas_object(stays[STAY_KEYS + ['Booking Date Time', 'Release Date Time']], index=False)
+    fingerprint = hashlib.sha256(rows.to_numpy(dtype='<u8').tobytes()).hexdigest()[:16]
+    return (f"v{CACHE_VERSION}-r{RESOLVER_VERSION}-t{RESOLUTION_THRESHOLD}-b{RESOLUTION_BLOCK_SCAN}"
+            f"-{sha256}-{fingerprint}")
+
+def load_occupancy_index(stays, cache_dir=CACHE_DIR):
+    """Index d'occupation des séjours, relu du cache s'il a été construit pour les mêmes séjours"""
+    if not cache_dir:
+        return OccupancyIndex.from_stays(stays)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    source = None
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding='utf-8') as f:
+            source = _occupancy_key(stays, json.load(f)["key"]["sha256"])
+
+    path = os.path.join(cache_dir, "occupancy.npz")
+    if source and os.path.exists(path):
+        index = OccupancyIndex.load(path)
+        if index.source == source and len(index) == len(stays):
+            return index
+    index = OccupancyIndex.from_stays(stays, source=source)
+    if source:
+        index.save(path)
+    return index
+
+# --- GRAPHE COMPACT (IDENTIFIANTS ENTIERS) ---
+
+class PersonGraph:
+    """Graphe pondéré non orienté sur des identifiants entiers denses (int32)
+
+    names[i] est la personne d'identifiant i (noms triés : identifiants reproductibles).
+    L'adjacence est en CSR : les voisins de i sont indices[indptr[i]:indptr[i+1]], avec
+    le poids (heures) correspondant dans weights ; chaque arête figure dans les deux sens.
+    networkx n'est plus qu'un adaptateur optionnel (to_networkx).
+    """
+
+    def __init__(self, names, indptr, indices, weights):
+        self.names = names
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._ids = None
+
+    @classmethod
+    def from_edges(cls, names, src, dst, weights):
+        """Adjacence CSR à partir d'arêtes (src, dst, poids) données une seule fois"""
+        ends = np.concatenate([src, dst]).astype(np.int64)
+        others = np.concatenate([dst, src]).astype(np.int32)
+        both = np.concatenate([weights, weights]).astype(np.float64)
+        order = np.lexsort((others, ends))
+        indptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=len(names)), out=indptr[1:])
+        return cls(names, indptr, others[order], both[order])
+
+    @classmethod
+    def from_edges_ns(cls, edges_ns):
+        """Interne les personnes des paires (nom -> int32) et convertit les durées en heures"""
+        names = sorted({name for pair in edges_ns for name in pair})
+        ids = {name: i for i, name in enumerate(names)}
+        src = np.fromiter((ids[a] for a, _ in edges_ns), dtype=np.int32, count=len(edges_ns))
+        dst = np.fromiter((ids[b] for _, b in edges_ns), dtype=np.int32, count=len(edges_ns))
+        totals = np.fromiter(edges_ns.values(), dtype=np.int64, count=len(edges_ns))
+        graph = cls.from_edges(names, src, dst, _overlap_hours(totals))
+        graph._ids = ids
+        return graph
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = {name: i for i, name in enumerate(self.names)}
+        return self._ids
+
+    def __len__(self):
+        return len(self.names)
+
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def edges(self):
+        """Chaque arête une seule fois (src < dst) : (src, dst, poids)"""
+        src = np.repeat(np.arange(len(self), dtype=np.int32), self.degree())
+        keep = src < self.indices
+        return src[keep], self.indices[keep], self.weights[keep]
+
+    def adjacency_lists(self):
+        """indptr, indices, weights en listes Python : parcours rapides en pur Python"""
+        return self.indptr.tolist(), self.indices.tolist(), self.weights.tolist()
+
+    def components(self):
+        """Numéro de composante connexe de chaque nœud (0 : la plus grande)"""
+        forest = UnionFind(len(self))
+        forest.add(*self.edges()[:2])
+        return forest.labels()
+
+    def subgraph(self, keep):
+        """Sous-graphe induit par le masque booléen `keep` (identifiants renumérotés, noms toujours triés)"""
+        new_ids = np.cumsum(keep) - 1
+        src, dst, weights = self.edges()
+        inside = keep[src] & keep[dst]
+        names = [name for name, kept in zip(self.names, keep) if kept]
+        return PersonGraph.from_edges(names, new_ids[src[inside]], new_ids[dst[inside]], weights[inside])
+
+    def to_networkx(self):
+        """Adaptateur networkx (nœuds = identifiants entiers, attribut 'weight')"""
+        if nx is None:
+            raise ImportError("networkx est requis pour cette étape")
+        G = nx.Graph()
+        G.add_nodes_from(range(len(self)))
+        G.add_weighted_edges_from(zip(*(column.tolist() for column in self.edges())))
+        return G
+
+# --- COMPOSANTES CONNEXES ET K-CŒURS ---
+
+class UnionFind:
+    """Composantes connexes par union-find sur un flux d'arêtes (identifiants entiers)
+
+    Les arêtes arrivent par lots (add), sans adjacence : chaque lot accroche la plus
+    grande des deux racines sous la plus petite (np.minimum.at, pas de cycle possible)
+    puis compresse les chemins par sauts de pointeurs, jusqu'à ce que toutes les
+    extrémités du lot partagent leur racine. Les graphes cumulés (instantanés, mode
+    incrémental) n'ont qu'à ajouter leurs nouvelles relations.
+    """
+
+    def __init__(self, n):
+        self.parent = np.arange(n, dtype=np.int64)
+
+    def grow(self, n):
+        """Ajoute des nœuds isolés jusqu'à en compter n"""
+        self.parent = np.concatenate([self.parent, np.arange(len(self.parent), n, dtype=np.int64)])
+
+    def _compress(self):
+        while True:
+            grand = self.parent[self.parent]
+            if np.array_equal(grand, self.parent):
+                return
+            self.parent = grand
+
+    def add(self, src, dst):
+        roots_a = self.parent[np.asarray(src, dtype=np.int64)]
+        roots_b = self.parent[np.asarray(dst, dtype=np.int64)]
+        while True:
+            differ = roots_a != roots_b
+            if not differ.any():
+                return
+            roots_a, roots_b = roots_a[differ], roots_b[differ]
+            np.minimum.at(self.parent, np.maximum(roots_a, roots_b), np.minimum(roots_a, roots_b))
+            self._compress()
+            roots_a, roots_b = self.parent[roots_a], self.parent[roots_b]
+
+    def labels(self, nodes=None):
+        """Composante de chaque nœud de `nodes` (tous par défaut), numérotées par taille décroissante
+
+        Tailles et numéros ne comptent que les nœuds demandés ; à taille égale, la
+        composante qui apparaît la première dans `nodes` passe devant (0 : la plus grande).
+        """
+        self._compress()
+        roots = self.parent if nodes is None else self.parent[np.asarray(nodes, dtype=np.int64)]
+        _, first, inverse, sizes = np.unique(roots, return_index=True, return_inverse=True, return_counts=True)
+        rank = np.empty(len(sizes), dtype=np.int32)
+        rank[np.lexsort((first, -sizes))] = np.arange(len(sizes), dtype=np.int32)
+        return rank[inverse]
+
+def core_numbers(graph):
+    """Nombre de cœur (k-core) de chaque personne : épluchage de Batagelj-Zaversnik en O(m)
+
+    Les nœuds sont rangés par degré restant (tri par paniers) ; retirer le plus petit
+    décrémente ses voisins de degré supérieur, déplacés d'un panier en temps constant.
+    """
+    indptr, indices, _ = graph.adjacency_lists()
+    n = len(graph)
+    degree = graph.degree().tolist()
+    order = sorted(range(n), key=degree.__getitem__)
+    position = [0] * n
+    for i, v in enumerate(order):
+        position[v] = i
+    start = [0] * ((max(degree) if n else 0) + 2)
+    for d in degree:
+        start[d + 1] += 1
+    for d in range(1, len(start)):
+        start[d] += start[d - 1]
+
+    for i in range(n):
+        v = order[i]
+        for u in indices[indptr[v]:indptr[v + 1]]:
+            du = degree[u]
+            if du > degree[v]:
+                # u passe en tête de son panier puis descend d'un degré
+                first = order[start[du]]
+                if u != first:
+                    pu, pf = position[u], start[du]
+                    order[pu], order[pf] = first, u
+                    position[u], position[first] = pf, pu
+                start[du] += 1
+                degree[u] = du - 1
+    return np.array(degree, dtype=np.int32)
+
+def drop_small_components(graph, labels, min_size):
+    """Retire les personnes des composantes de moins de `min_size` personnes ; renvoie (graphe, labels, écartées)"""
+    sizes = np.bincount(labels)
+    keep = sizes[labels] >= min_size
+    if keep.all():
+        return graph, labels, 0
+    return graph.subgraph(keep), labels[keep], int((~keep).sum())
+
+# --- ÉPARSIFICATION (SQUELETTE DU GRAPHE) ---
+
+def _pairs_kept(graph, keep):
+    """Arêtes (src < dst) dont au moins un des deux sens est retenu (keep : entrées CSR)"""
+    src = np.repeat(np.arange(len(graph), dtype=np.int32), graph.degree())
+    lo, hi = np.minimum(src, graph.indices), np.maximum(src, graph.indices)
+    order = np.lexsort((hi, lo))
+    first = order[0::2]
+    kept = keep[order].reshape(-1, 2).any(axis=1)
+    return lo[first][kept], hi[first][kept], graph.weights[first][kept]
+
+def _backbone_disparity(graph, alpha=SPARSIFY_ALPHA):
+    """Filtre de disparité (Serrano et al.) : arêtes significatives pour au moins une extrémité
+
+    Pour une personne de degré k et de force s (heures cumulées), une relation de poids w
+    a la p-valeur (1 - w/s)^(k-1) si la force était répartie au hasard ; une personne de
+    degré 1 garde sa seule relation.
+    """
+    degree = graph.degree()
+    rows = np.repeat(np.arange(len(graph)), degree)
+    strength = np.bincount(rows, weights=graph.weights, minlength=len(graph))
+    k = degree[rows]
+    pvalue = (1 - graph.weights / strength[rows]) ** (k - 1)
+    return (*_pairs_kept(graph, (pvalue < alpha) | (k == 1)), {"alpha": alpha})
+
+def _backbone_top_k(graph, k=SPARSIFY_TOP_K):
+    """Les k relations les plus longues de chaque personne (gardées si une extrémité les retient)"""
+    rows = np.repeat(np.arange(len(graph)), graph.degree())
+    order = np.lexsort((-graph.weights, rows))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - graph.indptr[rows[order]]
+    return (*_pairs_kept(graph, rank < k), {"k": k})
+
+def _backbone_budget(graph, budget=SPARSIFY_BUDGET):
+    """Les `budget` relations les plus longues du graphe"""
+    src, dst, weights = graph.edges()
+    keep = np.sort(np.argsort(-weights, kind='stable')[:budget])
+    return src[keep], dst[keep], weights[keep], {"budget": budget}
+
+SPARSIFY_MODES = {
+    "disparity": _backbone_disparity,
+    "topk": _backbone_top_k,
+    "budget": _backbone_budget,
+}
+
+def sparsify_graph(graph, mode, **options):
+    """Squelette du graphe : mêmes personnes (identifiants inchangés), relations retenues par `mode`"""
+    src, dst, weights, details = SPARSIFY_MODES[mode](graph, **options)
+    backbone = PersonGraph.from_edges(graph.names, src, dst, weights)
+    backbone._ids = graph._ids
+    info = {"mode": mode, "kept": backbone.number_of_edges(),
+            "dropped": graph.number_of_edges() - backbone.number_of_edges(),
+            "isolated": int((backbone.degree() == 0).sum())}
+    info.update(details)
+    return backbone, info
+
+# --- CENTRALITÉ (INFLUENCE) ---
+
+def _dijkstra_paths(adjacency, s):
+    """Plus courts chemins pondérés depuis s (Brandes) sur l'adjacence CSR
+
+    Même parcours que networkx (_single_source_dijkstra_path_basic) : ordre de visite S,
+    prédécesseurs P, nombres de plus courts chemins sigma et distances D.
+    """
+    indptr, indices, weights = adjacency
+    S, P, sigma, D = [], {s: []}, {s: 1.0}, {}
+    seen = {s: 0}
+    tie = 0
+    Q = [(0, tie, s, s)]
+    while Q:
+        dist, _, pred, v = heapq.heappop(Q)
+        if v in D:
+            continue
+        sigma[v] += sigma[pred]
+        S.append(v)
+        D[v] = dist
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            vw_dist = dist + weights[k]
+            if w not in D and (w not in seen or vw_dist < seen[w]):
+                seen[w] = vw_dist
+                tie += 1
+                heapq.heappush(Q, (vw_dist, tie, v, w))
+                sigma[w] = 0.0
+                P[w] = [v]
+            elif vw_dist == seen[w]:
+                sigma[w] += sigma[v]
+                P[w].append(v)
+    return S, P, sigma, D
+
+def _source_dependencies(adjacency, s):
+    """Dépendances (Brandes) des nœuds atteints depuis s, hors s ; renvoie ({nœud: dépendance}, distances D)"""
+    S, P, sigma, D = _dijkstra_paths(adjacency, s)
+    delta = dict.fromkeys(S, 0.0)
+    while S:
+        w = S.pop()
+        coeff = (1 + delta[w]) / sigma[w]
+        for v in P[w]:
+            delta[v] += sigma[v] * coeff
+    del delta[s]
+    return delta, D
+
+def _dependencies(adjacency, n, sources):
+    """Somme des dépendances (Brandes) depuis un lot de sources, non normalisée"""
+    betweenness = [0.0] * n
+    for s in sources:
+        delta, _ = _source_dependencies(adjacency, s)
+        for w, d in delta.items():
+            betweenness[w] += d
+    return betweenness
+
+def _stale_sources(dist, src, dst, before, after, block_cells=4_000_000):
+    """Sources dont les plus courts chemins changent quand les relations (src, dst) passent de `before` à `after` heures
+
+    Les durées ne font que croître (0 : relation absente). Une relation qui s'allonge ne
+    touche une source que si elle était sur l'un de ses plus courts chemins
+    (D[u] + avant == D[v]) ; une relation nouvelle, que si elle crée un raccourci ou
+    une égalité (D[u] + après <= D[v]). `dist` : distances (sources x personnes).
+    """
+    stale = np.zeros(len(dist), dtype=bool)
+    step = max(1, block_cells // max(len(dist), 1))
+    for lo in range(0, len(src), step):
+        du, dv = dist[:, src[lo:lo + step]], dist[:, dst[lo:lo + step]]
+        near, far = np.minimum(du, dv), np.maximum(du, dv)
+        w0, w1 = before[lo:lo + step], after[lo:lo + step]
+        changed = np.where(w0 > 0, near + w0 == far, near + w1 <= far) & np.isfinite(near)
+        stale |= changed.any(axis=1)
+    return stale
+
+def _normalize_betweenness(betweenness, n, k=None):
+    """Normalisation de nx.betweenness_centrality (non orienté, 1/((n-1)(n-2)), extrapolée si k pivots)"""
+    scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    if k is not None:
+        scale *= n / k
+    return np.asarray(betweenness, dtype=float) * scale
+
+def _betweenness_exact(graph):
+    n = len(graph)
+    return _normalize_betweenness(_dependencies(graph.adjacency_lists(), n, range(n)), n), {}
+
+def _sample_pivots(n, k=CENTRALITY_SAMPLES, seed=CENTRALITY_SEED):
+    """Pivots du mode 'sampled' (None : moins de k nœuds, calcul exact)"""
+    return random.Random(seed).sample(range(n), k) if k < n else None
+
+def _betweenness_sampled(graph, k=CENTRALITY_SAMPLES, seed=CENTRALITY_SEED):
+    """k pivots tirés au hasard (graine fixe), extrapolés à tout le graphe"""
+    n = len(graph)
+    sources = _sample_pivots(n, k, seed)
+    if sources is None:
+        return _betweenness_exact(graph)
+    return _normalize_betweenness(_dependencies(graph.adjacency_lists(), n, sources), n, k), {"samples": k}
+
+def _sample_shortest_path(adjacency, n, rng):
+    """Tire une paire (s, t) puis un plus court chemin pondéré uniforme entre les deux ; renvoie ses nœuds internes"""
+    s, t = rng.sample(range(n), 2)
+    S, P, sigma, D = _dijkstra_paths(adjacency, s)
+    if t not in D:
+        return []
+    inner = []
+    v = t
+    while True:
+        preds = P[v]
+        u = preds[0] if len(preds) == 1 else rng.choices(preds, weights=[sigma[w] for w in preds])[0]
+        if u == s:
+            return inner
+        inner.append(u)
+        v = u
+
+def _betweenness_adaptive(graph, epsilon=CENTRALITY_EPSILON, delta=CENTRALITY_DELTA, seed=CENTRALITY_SEED, first_batch=128):
+    """Échantillonnage de plus courts chemins à erreur bornée (Riondato-Kornaropoulos, arrêt anticipé)
+
+    Avec probabilité >= 1 - delta, tous les scores sont à moins de `epsilon` de la
+    centralité normalisée exacte. Le nombre maximal de chemins vient de la borne
+    VC de Riondato-Kornaropoulos (diamètre en sommets majoré par la plus grande
+    composante) ; l'échantillonnage s'arrête plus tôt dès que la borne de Bernstein
+    empirique, en union sur les nœuds et les contrôles, passe sous `epsilon`. Si cette
+    borne atteint n chemins, le calcul exact (n Dijkstra) est choisi d'emblée.
+    """
+    n = len(graph)
+    if n <= 2:
+        return _betweenness_exact(graph)
+
+    # Les chemins échantillonnés estiment la fraction sur n(n-1) paires ordonnées,
+    # networkx normalise sur (n-1)(n-2) : on ramène epsilon à la première échelle.
+    scale = n / (n - 2)
+    eps = epsilon / scale
+    vertex_diameter = int(np.bincount(graph.components()).max())
+    vc_dimension = math.floor(math.log2(max(vertex_diameter - 2, 1))) + 1
+    max_samples = math.ceil(0.5 / eps ** 2 * (vc_dimension + math.log(1 / delta)))
+    if max_samples >= n:
+        # Au-delà de n chemins, le calcul exact (n Dijkstra) devient moins cher : inutile
+        # d'échantillonner d'abord pour, au pire, tout recalculer ensuite
+        scores, details = _betweenness_exact(graph)
+        details.update(max_samples=max_samples)
+        return scores, details
+
+    rng = random.Random(seed)
+    adjacency = graph.adjacency_lists()
+    checks = max(1, math.ceil(math.log2(max_samples / first_batch)) + 1)
+    log_term = math.log(3 * n * checks / delta)
+    counts = {}
+    r, batch = 0, first_batch
+    while r < max_samples:
+        step = min(batch, max_samples - r)
+        for _ in range(step):
+            for v in _sample_shortest_path(adjacency, n, rng):
+                counts[v] = counts.get(v, 0) + 1
+        r += step
+        # La borne croît avec p jusqu'à 0.5 : le pire nœud est celui de plus grand score
+        p = min(max(counts.values(), default=0) / r, 0.5)
+        if math.sqrt(2 * p * (1 - p) * log_term / r) + 3 * log_term / r <= eps:
+            break
+        batch *= 2
+
+    scores = np.zeros(n)
+    scores[list(counts)] = list(counts.values())
+    scores *= scale / r
+    return scores, {"samples": r, "max_samples": max_samples, "epsilon": epsilon, "delta": delta}
+
+_worker_adjacency = None
+
+def _init_betweenness_worker(indptr, indices, weights):
+    """L'adjacence n'est transmise qu'une fois par processus (tableaux NumPy compacts)"""
+    global _worker_adjacency
+    _worker_adjacency = (indptr.tolist(), indices.tolist(), weights.tolist())
+
+def _partial_dependencies(sources):
+    return _dependencies(_worker_adjacency, len(_worker_adjacency[0]) - 1, sources)
+
+def _betweenness_parallel(graph, workers=PARALLEL_WORKERS, chunks_per_worker=4):
+    """Centralité exacte : les sources sont réparties par lots sur un pool de processus
+
+    Chaque lot renvoie ses sommes de dépendances partielles, additionnées puis
+    normalisées comme nx.betweenness_centrality (graphe non orienté, 1/((n-1)(n-2))).
+    """
+    n = len(graph)
+    if workers <= 1 or n <= 2:
+        return _betweenness_exact(graph)
+
+    n_chunks = min(n, workers * chunks_per_worker)
+    batches = [range(i, n, n_chunks) for i in range(n_chunks)]
+    betweenness = np.zeros(n)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_betweenness_worker,
+                             initargs=(graph.indptr, graph.indices, graph.weights)) as pool:
+        for partial in pool.map(_partial_dependencies, batches):
+            betweenness += partial
+    return _normalize_betweenness(betweenness, n), {"workers": workers}
+
+def _adjacency_operator(graph):
+    """Produit x -> A·x par l'adjacence pondérée en jours (symétrique)
+
+    scipy.sparse réutilise directement la CSR du graphe ; sans scipy, le même produit
+    passe par np.bincount sur les lignes répétées (toujours linéaire en arêtes).
+    """
+    n = len(graph)
+    days = graph.weights / 24
+    if sparse is not None:
+        return sparse.csr_matrix((days, graph.indices, graph.indptr), shape=(n, n)).dot
+    rows = np.repeat(np.arange(n), graph.degree())
+    return lambda x: np.bincount(rows, weights=days * x[graph.indices], minlength=n)
+
+def _pagerank(graph, damping=PAGERANK_DAMPING, tolerance=POWER_TOLERANCE, max_iter=POWER_MAX_ITER):
+    """PageRank pondéré (jours ensemble) par itération de puissance, comme nx.pagerank(weight=...)
+
+    Les personnes sans relation (squelette) redistribuent leur score uniformément.
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0), {"iterations": 0, "converged": True}
+    product = _adjacency_operator(graph)
+    strength = product(np.ones(n))
+    dangling = strength == 0
+    inverse = np.divide(1.0, strength, out=np.zeros(n), where=~dangling)
+    x = np.full(n, 1.0 / n)
+    for iteration in range(1, max_iter + 1):
+        last = x
+        x = damping * product(last * inverse) + (damping * last[dangling].sum() + 1 - damping) / n
+        if np.abs(x - last).sum() < n * tolerance:
+            return x, {"iterations": iteration, "converged": True}
+    return x, {"iterations": max_iter, "converged": False}
+
+def _eigenvector(graph, tolerance=POWER_TOLERANCE, max_iter=POWER_MAX_ITER):
+    """Centralité de vecteur propre pondérée, comme nx.eigenvector_centrality(weight=...)
+
+    Itère sur A + I (même spectre décalé : converge aussi sur les graphes bipartis),
+    vecteur de norme euclidienne 1.
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0), {"iterations": 0, "converged": True}
+    product = _adjacency_operator(graph)
+    x = np.full(n, 1.0 / n)
+    for iteration in range(1, max_iter + 1):
+        last = x
+        x = last + product(last)
+        norm = np.linalg.norm(x)
+        x = x / norm if norm else last
+        if np.abs(x - last).sum() < n * tolerance:
+            return x, {"iterations": iteration, "converged": True}
+    return x, {"iterations": max_iter, "converged": False}
+
+CENTRALITY_MODES = {
+    "exact": _betweenness_exact,
+    "parallel": _betweenness_parallel,
+    "sampled": _betweenness_sampled,
+    "adaptive": _betweenness_adaptive,
+    "pagerank": _pagerank,
+    "eigenvector": _eigenvector,
+}
+
+def compute_centrality(graph, mode=CENTRALITY_MODE, **options):
+    """Score d'influence (intermédiarité pondérée, ou PageRank / vecteur propre en temps quasi linéaire)
+
+    Renvoie (score par identifiant, description du calcul pour le JSON).
+    """
+    started = time.perf_counter()
+    scores, details = CENTRALITY_MODES[mode](graph, **options)
+    info = {"mode": mode, "estimated": bool(details.get("samples")), "runtime_s": round(time.perf_counter() - started, 3)}
+    info.update(details)
+    return scores, info
+
+INFLUENCE_METRICS = ("influence", "pagerank", "eigenvector", "strength")
+
+def compute_influence_metrics(graph, damping=PAGERANK_DAMPING):
+    """Mesures d'influence précalculées pour chaque personne, en plus de l'intermédiarité
+
+    pagerank et eigenvector par itération de puissance, strength = jours cumulés avec
+    l'ensemble des relations (degré pondéré). Renvoie (scores par mesure, description).
+    """
+    started = time.perf_counter()
+    pagerank, pagerank_info = _pagerank(graph, damping=damping)
+    eigenvector, eigenvector_info = _eigenvector(graph)
+    strength = _adjacency_operator(graph)(np.ones(len(graph)))
+    info = {"pagerank": pagerank_info, "eigenvector": eigenvector_info,
+            "runtime_s": round(time.perf_counter() - started, 3)}
+    return {"pagerank": pagerank, "eigenvector": eigenvector, "strength": strength}, info
+
+# --- DISPOSITION DU GRAPHE (LAYOUT) ---
+
+LAYOUT_THETA = 1.2          # Critère d'ouverture Barnes-Hut (taille cellule / distance)
+LAYOUT_TOLERANCE = 2e-3     # Arrêt quand le déplacement moyen devient négligeable
+LAYOUT_GROUP_STRENGTH = 0.01 # Attraction de chaque nœud vers le barycentre de son établissement
+LAYOUT_EDGE_PIXELS = 200    # Longueur médiane des arêtes à l'affichage
+
+def _barnes_hut_repulsion(pos, mass, scaling, theta=LAYOUT_THETA):
+    """Répulsion ForceAtlas2 (k·mi·mj/d) par Barnes-Hut sur une grille quadtree NumPy
+
+    Chaque niveau l découpe la boîte englobante en 2^l x 2^l cellules (masses et
+    barycentres par bincount). Les paires (nœud, cellule) descendent niveau par niveau
+    tant que la cellule est trop proche ; au dernier niveau, les cellules restantes
+    sont développées en paires exactes nœud-nœud.
+    """
+    n = len(pos)
+    force = np.zeros_like(pos)
+    lo = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - lo).max()), 1e-9)
+    depth = int(min(10, max(1, math.ceil(math.log2(max(n, 2)) / 2) + 1)))
+    grid = np.minimum(((pos - lo) / span * (1 << depth)).astype(np.int64), (1 << depth) - 1)
+
+    levels = []
+    for level in range(depth + 1):
+        shift = depth - level
+        cell = (grid[:, 0] >> shift) * (1 << level) + (grid[:, 1] >> shift)
+        size = 1 << (2 * level)
+        cell_mass = np.bincount(cell, weights=mass, minlength=size)
+        com = np.stack([np.bincount(cell, weights=mass * pos[:, k], minlength=size) for k in (0, 1)], axis=1)
+        com /= np.maximum(cell_mass, 1e-12)[:, None]
+        levels.append((cell, cell_mass, com))
+
+    def push(i, other_pos, other_mass):
+        delta = pos[i] - other_pos
+        dist2 = np.maximum((delta ** 2).sum(axis=1), 1e-6)
+        contribution = delta * (scaling * mass[i] * other_mass / dist2)[:, None]
+        for k in (0, 1):
+            force[:, k] += np.bincount(i, weights=contribution[:, k], minlength=n)
+
+    i = np.arange(n)
+    c = np.zeros(n, dtype=np.int64)
+    for level, (cell, cell_mass, com) in enumerate(levels):
+        keep = cell_mass[c] > 0
+        i, c = i[keep], c[keep]
+        dist = np.sqrt(((pos[i] - com[c]) ** 2).sum(axis=1))
+        far = (cell[i] != c) & (span / (1 << level) < theta * dist)
+        push(i[far], com[c[far]], cell_mass[c[far]])
+        i, c = i[~far], c[~far]
+        if level == depth:
+            break
+        side = 1 << level
+        cx, cy = c // side, c % side
+        children = np.stack([(2 * cx + a) * (2 * side) + (2 * cy + b) for a in (0, 1) for b in (0, 1)], axis=1)
+        i, c = np.repeat(i, 4), children.ravel()
+
+    # Feuilles voisines : paires exactes avec les nœuds de la cellule
+    cell = levels[-1][0]
+    order = np.argsort(cell, kind='stable')
+    starts = np.searchsorted(cell[order], c)
+    counts = np.bincount(cell, minlength=len(levels[-1][1]))[c]
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    j = order[np.repeat(starts, counts) + offsets]
+    i = np.repeat(i, counts)
+    other = i != j
+    push(i[other], pos[j[other]], mass[j[other]])
+    return force
+
+def forceatlas2_layout(n, src, dst, weights, groups, iterations=300, seed=42, initial=None,
+                       scaling=2.0, gravity=5.0, group_strength=LAYOUT_GROUP_STRENGTH):
+    """ForceAtlas2 vectorisé (répulsion Barnes-Hut, attraction linéaire, vitesse adaptative)
+
+    groups : entier par nœud (établissement principal), chaque groupe étant attiré vers
+    son barycentre. initial : positions de départ (démarrage à chaud), sinon placement
+    reproductible autour d'un ancrage par groupe. Renvoie (positions n x 2, itérations).
+    """
+    rng = np.random.default_rng(seed)
+    mass = 1.0 + np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    if initial is None:
+        n_groups = int(groups.max()) + 1 if n else 1
+        angles = 2 * np.pi * groups / n_groups
+        radius = 10.0 * math.sqrt(max(n, 1))
+        pos = radius * np.stack([np.cos(angles), np.sin(angles)], axis=1) + rng.normal(scale=radius / 3, size=(n, 2))
+    else:
+        pos = np.array(initial, dtype=float)
+    if n < 2:
+        return pos, 0
+
+    if len(weights):
+        weights = weights / weights.mean()
+    previous = np.zeros_like(pos)
+    speed, speed_efficiency = 1.0, 1.0
+    step = 0
+    for step in range(1, iterations + 1):
+        force = _barnes_hut_repulsion(pos, mass, scaling)
+        pull = (pos[src] - pos[dst]) * weights[:, None]
+        for k in (0, 1):
+            force[:, k] -= np.bincount(src, weights=pull[:, k], minlength=n)
+            force[:, k] += np.bincount(dst, weights=pull[:, k], minlength=n)
+        distance = np.maximum(np.sqrt((pos ** 2).sum(axis=1)), 1e-9)
+        force -= pos * (gravity * mass / distance)[:, None]
+        group_size = np.bincount(groups)
+        centroid = np.stack([np.bincount(groups, weights=pos[:, k]) for k in (0, 1)], axis=1) / group_size[:, None]
+        force -= (pos - centroid[groups]) * (group_strength * mass)[:, None]
+
+        # Vitesse adaptative (balancement / traction, comme l'implémentation de Gephi)
+        swinging = mass * np.sqrt(((force - previous) ** 2).sum(axis=1))
+        traction = mass * np.sqrt(((force + previous) ** 2).sum(axis=1)) / 2
+        global_swing, global_traction = swinging.sum(), traction.sum()
+        estimated_jitter = 0.05 * math.sqrt(n)
+        jitter = max(math.sqrt(estimated_jitter), min(10.0, estimated_jitter * global_traction / n ** 2))
+        if global_traction > 0 and global_swing / global_traction > 2.0:
+            speed_efficiency = max(0.05, speed_efficiency * 0.5)
+            jitter = max(jitter, 1.0)
+        target_speed = jitter * speed_efficiency * global_traction / max(global_swing, 1e-12)
+        if global_swing > jitter * global_traction:
+            speed_efficiency = max(0.05, speed_efficiency * 0.7)
+        elif speed < 1000:
+            speed_efficiency *= 1.3
+        speed += min(target_speed - speed, 0.5 * speed)
+
+        factor = speed / (1.0 + np.sqrt(speed * swinging))
+        magnitude = np.maximum(np.sqrt((force ** 2).sum(axis=1)), 1e-12)
+        factor = np.minimum(factor * magnitude, 10.0) / magnitude
+        displacement = force * factor[:, None]
+        pos += displacement
+        previous = force
+
+        extent = math.sqrt(float((pos ** 2).sum(axis=1).mean())) or 1.0
+        if step >= 10 and float(np.sqrt((displacement ** 2).sum(axis=1)).mean()) < LAYOUT_TOLERANCE * extent:
+            break
+    return pos, step
+
+def load_layout(path):
+    """Positions brutes de l'exécution précédente ({nom: [x, y]}), vide si absentes"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_layout(path, positions):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(positions, f, ensure_ascii=False)
+
+def compute_layout(graph, node_groups, iterations=LAYOUT_ITERATIONS, seed=LAYOUT_SEED, layout_file=LAYOUT_FILE):
+    """Position de chaque identifiant, démarrée à chaud depuis layout_file s'il existe
+
+    node_groups donne le groupe (établissement) de chaque identifiant. Les positions sont
+    conservées par nom ; les nouveaux nœuds partent du barycentre de leurs voisins déjà
+    placés (ou de leur groupe) : une reconstruction incrémentale garde la même carte et
+    converge vite. Renvoie (positions n x 2 à l'échelle de vis-network, description du calcul).
+    """
+    started = time.perf_counter()
+    names = graph.names
+    group_ids = {group: i for i, group in enumerate(sorted(set(map(str, node_groups))))}
+    groups = np.array([group_ids[str(group)] for group in node_groups], dtype=np.int64)
+    src, dst, weights = graph.edges()
+
+    previous = load_layout(layout_file)
+    known = [name in previous for name in names]
+    initial = None
+    if any(known):
+        rng = np.random.default_rng(seed)
+        initial = np.array([previous.get(name, (np.nan, np.nan)) for name in names], dtype=float)
+        placed = ~np.isnan(initial[:, 0])
+        fallback = np.nanmean(initial, axis=0)
+        for i in np.flatnonzero(~placed):
+            neighbors = graph.neighbors(i)
+            anchors = initial[neighbors[placed[neighbors]]]
+            if not len(anchors):
+                anchors = initial[placed & (groups == groups[i])] if (placed & (groups == groups[i])).any() else [fallback]
+            initial[i] = np.mean(anchors, axis=0) + rng.normal(scale=1.0, size=2)
+
+    pos, steps = forceatlas2_layout(len(names), src.astype(np.int64), dst.astype(np.int64), weights, groups,
+                                    iterations=iterations, seed=seed, initial=initial)
+    if layout_file:
+        save_layout(layout_file, {name: [round(float(x), 4), round(float(y), 4)] for name, (x, y) in zip(names, pos)})
+
+    # Mise à l'échelle de l'affichage : longueur médiane des arêtes fixée en pixels
+    center = pos.mean(axis=0) if len(pos) else np.zeros(2)
+    median_edge = float(np.median(np.sqrt(((pos[src] - pos[dst]) ** 2).sum(axis=1)))) if len(src) else 0.0
+    scale = LAYOUT_EDGE_PIXELS / median_edge if median_edge > 0 else 1.0
+    info = {"mode": "server", "iterations": steps, "warm_start": int(sum(known)),
+            "runtime_s": round(time.perf_counter() - started, 3)}
+    return np.round((pos - center) * scale, 1), info
+
+# --- COMMUNAUTÉS (VUE AGRÉGÉE) ---
+
+def _split_by_traversal(subgraph, max_size):
+    """Blocs d'au plus max_size nœuds consécutifs dans un parcours en largeur (voisins liés restent ensemble)"""
+    order = []
+    for component in sorted(nx.connected_components(subgraph), key=min):
+        order.extend(nx.bfs_tree(subgraph, min(component), sort_neighbors=sorted))
+    return [set(order[lo:lo + max_size]) for lo in range(0, len(order), max_size)]
+
+def detect_communities(graph, seed=COMMUNITY_SEED, resolution=COMMUNITY_RESOLUTION, max_size=COMMUNITY_MAX_SIZE):
+    """Hiérarchie de communautés : communauté de chaque identifiant par niveau, du plus fin au plus grossier
+
+    Louvain passe par l'adaptateur networkx. Ses niveaux sont complétés par le bas :
+    tant qu'une communauté du niveau le plus fin dépasse max_size personnes, Louvain est
+    relancé sur son sous-graphe ; une communauté qu'il ne sait pas diviser est découpée
+    en blocs de max_size personnes dans l'ordre d'un parcours en largeur. Le niveau le
+    plus fin ne dépasse donc jamais max_size. Les communautés sont numérotées par taille
+    décroissante, de façon reproductible pour une graine donnée.
+    """
+    G = graph.to_networkx()
+    partitions = list(community.louvain_partitions(G, weight='weight', resolution=resolution, seed=seed))[::-1]
+    while partitions:
+        refined, split = [], False
+        for members in partitions[-1]:
+            parts = [members]
+            if len(members) > max_size:
+                # Sous-graphe construit dans un ordre fixe : Louvain dépend de l'ordre des nœuds
+                subgraph = nx.Graph()
+                subgraph.add_nodes_from(sorted(members))
+                subgraph.add_weighted_edges_from(sorted((min(u, v), max(u, v), w)
+                                                        for u, v, w in G.subgraph(members).edges(data='weight')))
+                sub = community.louvain_communities(subgraph, weight='weight', resolution=resolution, seed=seed)
+                parts, split = (sub if len(sub) > 1 else _split_by_traversal(subgraph, max_size)), True
+            refined.extend(parts)
+        if not split:
+            break
+        partitions.append(refined)
+
+    levels = []
+    for partition in reversed(partitions):
+        membership = np.empty(len(graph), dtype=np.int32)
+        for cid, members in enumerate(sorted(partition, key=lambda members: (-len(members), min(members)))):
+            membership[list(members)] = cid
+        levels.append(membership)
+    return levels
+
+def build_community_hierarchy(graph, levels, node_data):
+    """Supernœuds et arêtes agrégées de chaque niveau pour la vue communautés du dashboard
+
+    node_data[i] est le nœud d'identifiant i. Ajoute 'community' (niveau le plus fin) aux
+    nœuds ; chaque niveau porte parent, taille, établissement dominant, étiquette (membre
+    le plus influent), position moyenne des membres, et les arêtes [a, b, jours cumulés,
+    relations] entre communautés.
+    """
+    src, dst, hours = graph.edges()
+    hierarchy = []
+    for k, membership in enumerate(levels):
+        count = int(membership.max()) + 1
+        members = [[] for _ in range(count)]
+        for node, cid in zip(node_data, membership.tolist()):
+            members[cid].append(node)
+        parent = np.full(count, -1, dtype=np.int64)
+        if k + 1 < len(levels):
+            parent[membership] = levels[k + 1]
+
+        a, b = membership[src], membership[dst]
+        between = a != b
+        keys = np.minimum(a, b)[between].astype(np.int64) * count + np.maximum(a, b)[between]
+        pairs, inverse = np.unique(keys, return_inverse=True)
+        days = np.bincount(inverse, weights=hours[between] / 24, minlength=len(pairs))
+        relations = np.bincount(inverse, minlength=len(pairs))
+
+        level = {
+            "parent": parent.tolist(),
+            "size": [len(group) for group in members],
+            "group": [max(set(n["group"] for n in group), key=[n["group"] for n in group].count) for group in members],
+            "label": [max(group, key=lambda n: (n["influence"], n["value"]))["label"] for group in members],
+            "edges": [[pair // count, pair % count, round(total, 2), relation]
+                      for pair, total, relation in zip(pairs.tolist(), days.tolist(), relations.tolist())],
+        }
+        if node_data and "x" in node_data[0]:
+            level["x"] = [round(sum(n["x"] for n in group) / len(group), 1) for group in members]
+            level["y"] = [round(sum(n["y"] for n in group) / len(group), 1) for group in members]
+        hierarchy.append(level)
+
+    for node, cid in zip(node_data, levels[0].tolist() if levels else [-1] * len(node_data)):
+        node["community"] = cid
+    return {"algorithm": "louvain", "levels": hierarchy}
+
+# --- INSTANTANÉS TEMPORELS ---
+
+WEEK_NS = 7 * 24 * HOUR_NS
+WEEK_ORIGIN_NS = 4 * 24 * HOUR_NS  # lundi 5 janvier 1970 : les semaines commencent le lundi
+
+def _period_of(t, period):
+    """Numéro de période (semaine ou mois depuis 1970) d'instants en ns"""
+    if period == "week":
+        return (t - WEEK_ORIGIN_NS) // WEEK_NS
+    return t.astype('datetime64[ns]').astype('datetime64[M]').astype('int64')
+
+def _period_start(p, period):
+    """Début (ns) des périodes numérotées p"""
+    if period == "week":
+        return p * WEEK_NS + WEEK_ORIGIN_NS
+    return p.astype('datetime64[M]').astype('datetime64[ns]').astype('int64')
+
+def _period_labels(first, count, period):
+    """Libellés : lundi de la semaine (AAAA-MM-JJ) ou mois (AAAA-MM)"""
+    p = np.arange(first, first + count, dtype='int64')
+    if period == "week":
+        return [str(day) for day in _period_start(p, period).astype('datetime64[ns]').astype('datetime64[D]')]
+    return [str(month) for month in p.astype('datetime64[M]')]
+
+def build_temporal_index(graph, index, edge_src, edge_dst, min_hours, period="month", pivots=None):
+    """Série temporelle creuse des relations et instantanés cumulés (degré, influence)
+
+    Chaque chevauchement de séjours est découpé en périodes ; les heures sont sommées par
+    (période, arête), arêtes numérotées dans l'ordre du dashboard (CSR par période).
+    L'instantané k est le graphe cumulé jusqu'à la période k. Il est mis à jour depuis
+    le précédent : les dépendances (Brandes) de chaque source (tous les nœuds, ou les
+    `pivots` du mode 'sampled') sont gardées avec ses distances, et seules les sources
+    dont un plus court chemin passe par une relation de la période, ou qu'une relation
+    nouvelle raccourcit, sont recalculées. Au-delà de TEMPORAL_REUSE_CELLS (sources x
+    personnes), seules les composantes touchées sont recalculées. Seuls les nœuds dont
+    le degré ou l'influence change sont stockés (CSR par instantané).
+    """
+    started = time.perf_counter()
+    n, edge_count = len(graph), len(edge_src)
+    person_a, person_b, lo, hi = index.pair_intervals(min_hours)
+    to_graph = np.array([graph.ids.get(name, -1) for name in index.names], dtype=np.int64)
+    a, b = to_graph[person_a], to_graph[person_b]
+
+    # Relation de chaque chevauchement (écartée si la paire n'est pas dans le graphe)
+    edge_keys = np.minimum(edge_src, edge_dst).astype(np.int64) * n + np.maximum(edge_src, edge_dst)
+    key_order = np.argsort(edge_keys)
+    sorted_keys = edge_keys[key_order]
+    keys = np.minimum(a, b) * n + np.maximum(a, b)
+    slot = np.searchsorted(sorted_keys, keys)
+    keep = (a >= 0) & (b >= 0) & (slot < edge_count)
+    keep[keep] = sorted_keys[slot[keep]] == keys[keep]
+    edge, lo, hi = key_order[slot[keep]], lo[keep], hi[keep]
+
+    # Découpage en périodes : un morceau par période couverte
+    first, last = _period_of(lo, period), _period_of(hi - 1, period)
+    counts = last - first + 1
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    p = np.repeat(first, counts) + offsets
+    pieces = (np.minimum(np.repeat(hi, counts), _period_start(p + 1, period))
+              - np.maximum(np.repeat(lo, counts), _period_start(p, period)))
+    origin = int(p.min()) if len(p) else 0
+    period_count = int(p.max()) - origin + 1 if len(p) else 0
+
+    cell = (p - origin) * edge_count + np.repeat(edge, counts)
+    order = np.argsort(cell, kind='stable')
+    cell, pieces = cell[order], pieces[order]
+    starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]]) if len(cell) else np.empty(0, dtype=np.int64)
+    cell_ns = np.add.reduceat(pieces, starts) if len(cell) else np.empty(0, dtype=np.int64)
+    cell = cell[starts]
+    period_edges = cell % max(edge_count, 1)
+    period_indptr = np.searchsorted(cell // max(edge_count, 1), np.arange(period_count + 1))
+
+    # Instantanés cumulés, mis à jour composante par composante
+    is_pivot = np.zeros(n, dtype=bool)
+    if pivots is not None:
+        is_pivot[list(pivots)] = True
+    cumulative = np.zeros(edge_count, dtype=np.int64)
+    forest = UnionFind(n)
+    dependencies = np.zeros(n)
+    degree, influence = np.zeros(n, dtype=np.int64), np.zeros(n)
+    snapshot_indptr, snapshot_nodes, snapshot_degree, snapshot_influence = [0], [], [], []
+    sources = np.arange(n) if pivots is None else np.asarray(list(pivots), dtype=np.int64)
+    reuse = len(sources) * n <= TEMPORAL_REUSE_CELLS
+    if reuse:
+        # Dépendances et distances par source, reprises d'un instantané au suivant
+        source_dependencies = np.zeros((len(sources), n))
+        dist = np.full((len(sources), n), np.inf)
+        dist[np.arange(len(sources)), sources] = 0.0
+    for k in range(period_count):
+        entries = slice(period_indptr[k], period_indptr[k + 1])
+        touched = period_edges[entries]
+        before = _overlap_hours(cumulative[touched])
+        cumulative[touched] += cell_ns[entries]
+        active = np.flatnonzero(cumulative)
+        snapshot = PersonGraph.from_edges(graph.names, edge_src[active], edge_dst[active],
+                                          _overlap_hours(cumulative[active]))
+        adjacency = snapshot.adjacency_lists()
+        if reuse:
+            stale = _stale_sources(dist, edge_src[touched], edge_dst[touched], before,
+                                   _overlap_hours(cumulative[touched]))
+            for i in np.flatnonzero(stale).tolist():
+                delta, D = _source_dependencies(adjacency, int(sources[i]))
+                source_dependencies[i] = 0.0
+                source_dependencies[i, list(delta)] = list(delta.values())
+                dist[i, list(D)] = list(D.values())
+            dependencies = source_dependencies.sum(axis=0)
+        else:
+            forest.add(edge_src[touched], edge_dst[touched])
+            labels = forest.parent
+            affected = np.isin(labels, labels[np.r_[edge_src[touched], edge_dst[touched]]])
+            dependencies[affected] = 0
+            recompute = affected if pivots is None else affected & is_pivot
+            dependencies += _dependencies(adjacency, n, np.flatnonzero(recompute).tolist())
+
+        next_degree = snapshot.degree()
+        next_influence = _normalize_betweenness(dependencies, n, None if pivots is None else len(pivots))
+        changed = np.flatnonzero((next_degree != degree) | (next_influence != influence))
+        degree, influence = next_degree, next_influence
+        snapshot_nodes.extend(changed.tolist())
+        snapshot_degree.extend(degree[changed].tolist())
+        snapshot_influence.extend(influence[changed].tolist())
+        snapshot_indptr.append(len(snapshot_nodes))
+
+    return {
+        "period": period,
+        "labels": _period_labels(origin, period_count, period),
+        "period_indptr": period_indptr.tolist(),
+        "period_edges": period_edges.tolist(),
+        "period_hours": _overlap_hours(cell_ns).tolist(),
+        "snapshot_indptr": snapshot_indptr,
+        "snapshot_nodes": snapshot_nodes,
+        "snapshot_degree": snapshot_degree,
+        "snapshot_influence": snapshot_influence,
+        "runtime_s": round(time.perf_counter() - started, 3),
+    }
+
+# --- MODE INCRÉMENTAL ---
+
+STAY_KEYS = ['Book of Arrest Number', 'Full Name', 'Current Facility']
+STATE_VERSION = 7
+STATE_DIGEST_BYTES = 65536
+
+def _source_digest(csv_path, offset):
+    """Empreinte des derniers octets déjà intégrés : détecte une réécriture de l'export"""
+    start = max(0, offset - STATE_DIGEST_BYTES)
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+def _connect_pairs(forest, index, pairs):
+    """Ajoute à l'union-find les paires (nom, nom) de l'étape 4, en identifiants de l'index"""
+    pairs = list(pairs)
+    forest.grow(len(index.names))
+    forest.add(index.person_ids([a for a, _ in pairs]), index.person_ids([b for _, b in pairs]))
+
+def build_network_state(csv_path, min_hours, edge_backend=EDGE_BACKEND, edge_options=None, cache_dir=CACHE_DIR,
+                        chunk_rows=STREAM_CHUNK_ROWS, report=None):
+    """Étapes 1 à 4 sur l'export complet ; renvoie l'état réutilisable par le mode incrémental"""
+    report = report or PipelineReport()
+    offset = os.path.getsize(csv_path)
+
+    # 1 à 3. Chargement, charges, consolidation des séjours (ou relecture du cache) et identités
+    resolver = IdentityResolver()
+    stays, person_charges = load_stays(csv_path, cache_dir=cache_dir, chunk_rows=chunk_rows, resolver=resolver,
+                                       report=report)
+
+    with report.stage("index") as counts:
+        index = load_occupancy_index(stays, cache_dir)
+        counts["stays"] = len(index)
+    print(f"{len(stays)} séjours identifiés. Calcul des interactions...")
+
+    # 4. Calcul des paires et suivi des établissements ; les paires alimentent au passage
+    # l'union-find des composantes connexes (graphe complet, avant tout squelette)
+    with report.stage("pairs", backend=edge_backend) as counts:
+        person_facilities = collect_facilities(stays)
+        edges_ns = compute_edges_ns(stays, min_hours, backend=edge_backend, **(edge_options or {}))
+        forest = UnionFind(len(index.names))
+        _connect_pairs(forest, index, edges_ns)
+        counts["pairs"] = len(edges_ns)
+
+    return {
+        "version": STATE_VERSION,
+        "csv_path": os.path.abspath(csv_path),
+        "min_hours": min_hours,
+        "offset": offset,
+        "digest": _source_digest(csv_path, offset),
+        "index": index,
+        "stay_rows": dict(zip(zip(*(stays[key].tolist() for key in STAY_KEYS)), range(len(stays)))),
+        "person_charges": person_charges,
+        "person_facilities": person_facilities,
+        "resolver": resolver,
+        "edges_ns": edges_ns,
+        "forest": forest,
+    }
+
+def _apply_stay_delta(index, marked, min_hours, sign, edges_ns):
+    """Ajoute (sign=+1) ou retire (sign=-1) les chevauchements des séjours `marked` ; renvoie les paires touchées
+
+    Les séjours concernés sont trouvés par l'index d'occupation. Une paire de deux
+    séjours marqués n'est comptée qu'une fois.
+    """
+    marked = np.sort(np.asarray(marked, dtype='int64'))
+    touched = set()
+    for row in marked.tolist():
+        rows, delta = index.overlaps_of(row, min_hours)
+        keep = ~(np.isin(rows, marked) & (rows < row))
+        name = index.names[index.person[row]]
+        for other, d in zip(index.person[rows[keep]].tolist(), delta[keep].tolist()):
+            touched.add(_add_edge(edges_ns, name, index.names[other], sign * d))
+    return touched
+
+def update_network_state(state, csv_path):
+    """Intègre les lignes ajoutées à l'export depuis la dernière exécution
+
+    Seules les clés (écrou, personne, établissement) des lignes relues sont
+    consolidées (entrée min, sortie max) avec les séjours connus, retrouvés par
+    state['stay_rows'] ; les séjours nouveaux ou prolongés voient leurs chevauchements
+    retirés puis recalculés et sont seuls réindexés. Le coût suit le nombre de lignes
+    ajoutées, pas l'historique. Relire une ligne déjà intégrée est sans effet.
+    """
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        f.seek(state['offset'])
+        tail = f.read(size - state['offset'])
+
+    df = clean_bookings(_read_bookings_csv(io.BytesIO(header + tail)))
+    print(f"Mode incrémental : {len(df)} nouvelles lignes.")
+
+    # Les variantes nouvelles sont rattachées aux personnes connues sans les renuméroter
+    delta, delta_charges = resolve_identities(consolidate_stays(df), collect_charges(df), collect_names(df),
+                                              state['resolver'])
+    index, stay_rows = state['index'], state['stay_rows']
+    keys = list(zip(*(delta[key].tolist() for key in STAY_KEYS)))
+    rows = np.array([stay_rows.get(key, -1) for key in keys], dtype='int64')
+    starts = delta['Booking Date Time'].to_numpy(dtype='datetime64[ns]').view('int64')
+    ends = delta['Release Date Time'].to_numpy(dtype='datetime64[ns]').view('int64')
+
+    known = rows >= 0
+    old = rows[known]
+    new_starts = np.minimum(index.starts[old], starts[known])
+    new_ends = np.maximum(index.ends[old], ends[known])
+    changed = (new_starts != index.starts[old]) | (new_ends != index.ends[old])
+    extended, new_starts, new_ends = old[changed], new_starts[changed], new_ends[changed]
+    fresh = ~known
+    print(f"{len(extended) + int(fresh.sum())} séjours nouveaux ou modifiés sur {len(index) + int(fresh.sum())}.")
+
+    edges_ns = state['edges_ns']
+    min_hours = state['min_hours']
+    touched = _apply_stay_delta(index, extended, min_hours, -1, edges_ns)
+    added = index.update(extended, new_starts, new_ends, delta['Full Name'][fresh].tolist(),
+                         delta['Current Facility'][fresh].tolist(), starts[fresh], ends[fresh])
+    stay_rows.update(zip([key for key, new in zip(keys, fresh.tolist()) if new], added.tolist()))
+    touched |= _apply_stay_delta(index, np.concatenate([extended, added]), min_hours, +1, edges_ns)
+    for pair in touched:
+        if edges_ns.get(pair) == 0:
+            del edges_ns[pair]
+    # Les séjours ne font que s'allonger : aucune relation ne disparaît, l'union-find n'a qu'à
+    # ajouter les paires touchées
+    _connect_pairs(state['forest'], index, (pair for pair in touched if pair in edges_ns))
+
+    for person, charges in delta_charges.items():
+        merge_charges(state['person_charges'], person, charges)
+    collect_facilities(delta, state['person_facilities'])
+    state['offset'] = size
+    state['digest'] = _source_digest(csv_path, size)
+    return state
+
+def load_state(state_file, csv_path, min_hours):
+    """Relit l'état précédent s'il correspond toujours à l'export, sinon None"""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file, 'rb') as f:
+        state = pickle.load(f)
+
+    if state.get("version") != STATE_VERSION or state["csv_path"] != os.path.abspath(csv_path):
+        print("État incrémental obsolète, reconstruction complète...")
+        return None
+    if state["min_hours"] != min_hours:
+        print("Seuil de durée modifié, reconstruction complète...")
+        return None
+    if os.path.getsize(csv_path) < state["offset"] or _source_digest(csv_path, state["offset"]) != state["digest"]:
+        print("Export réécrit depuis la dernière exécution, reconstruction complète...")
+        return None
+    return state
+
+def save_state(state, state_file):
+    with open(state_file, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+# --- EXPORT COMPACT ---
+
+ASSET_MAGIC = b"PLK1"
+
+def build_filter_index(nodes, edges):
+    """Index du filtrage incrémental côté navigateur (positions dans nodes/edges)
+
+    Les arêtes sont supposées triées par raw_days croissant : un seuil devient une
+    position dans le tableau. L'adjacence est au format CSR (indptr, rangs d'arêtes).
+    """
+    node_ids = {node["id"]: i for i, node in enumerate(nodes)}
+    ends = np.array([node_ids[e["from"]] for e in edges] + [node_ids[e["to"]] for e in edges], dtype=np.int64)
+    edge_ids = np.tile(np.arange(len(edges), dtype=np.int64), 2)
+    order = np.argsort(ends, kind='stable')
+    indptr = np.searchsorted(ends[order], np.arange(len(nodes) + 1))
+
+    facility_nodes = {}
+    for i, node in enumerate(nodes):
+        for facility in node["facilities"]:
+            facility_nodes.setdefault(facility, []).append(i)
+    return {
+        "adjacency_indptr": indptr.tolist(),
+        "adjacency": edge_ids[order].tolist(),
+        "facility_nodes": facility_nodes,
+    }
+
+def _trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+def search_key(text):
+    """Forme recherchée d'un terme : minuscules sans accents (mêmes règles que fold() du dashboard)"""
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if unicodedata.category(c) != "Mn").lower()
+
+def build_search_index(nodes):
+    """Index de recherche du dashboard : termes triés (préfixes) et trigrammes (sous-chaînes)
+
+    Un terme est un nom (kind 0) ou une charge (kind 1) sous sa forme search_key ; ses
+    postings sont les identifiants des nœuds concernés. Postings et termes par trigramme
+    sont en CSR.
+    """
+    entries = {}
+    for node in nodes:
+        entries.setdefault((search_key(node["label"]), 0, node["label"]), []).append(node["id"])
+        for charge in node["charges"]:
+            entries.setdefault((search_key(charge), 1, charge), []).append(node["id"])
+    keys = sorted(entries)
+
+    grams = {}
+    for t, (term, _, _) in enumerate(keys):
+        for gram in _trigrams(term):
+            grams.setdefault(gram, []).append(t)
+    trigrams = sorted(grams)
+    return {
+        "terms": [term for term, _, _ in keys],
+        "display": [display for _, _, display in keys],
+        "kinds": [kind for _, kind, _ in keys],
+        "postings_indptr": np.cumsum([0] + [len(entries[key]) for key in keys]).tolist(),
+        "postings": [i for key in keys for i in entries[key]],
+        "trigrams": trigrams,
+        "trigram_indptr": np.cumsum([0] + [len(grams[gram]) for gram in trigrams]).tolist(),
+        "trigram_terms": [t for gram in trigrams for t in grams[gram]],
+    }
+
+def search_index_lookup(index, query, limit=None, kind=None):
+    """Termes commençant par query puis le contenant (au moins 3 lettres), sans accents ni casse
+
+    Le préfixe est une dichotomie sur les termes triés ; la sous-chaîne part de la
+    liste de trigramme la plus courte et vérifie chaque candidat.
+    """
+    query = search_key(query)
+    terms, kinds = index["terms"], index["kinds"]
+    found = []
+    full = lambda: limit is not None and len(found) >= limit
+    t = bisect.bisect_left(terms, query)
+    while t < len(terms) and not full() and terms[t].startswith(query):
+        if kind is None or kinds[t] == kind:
+            found.append(t)
+        t += 1
+    if len(query) < 3 or full():
+        return found
+
+    trigrams, indptr = index["trigrams"], index["trigram_indptr"]
+    candidates = None
+    for gram in _trigrams(query):
+        g = bisect.bisect_left(trigrams, gram)
+        if g == len(trigrams) or trigrams[g] != gram:
+            return found
+        listed = index["trigram_terms"][indptr[g]:indptr[g + 1]]
+        if candidates is None or len(listed) < len(candidates):
+            candidates = listed
+    seen = set(found)
+    for t in candidates:
+        if full():
+            break
+        if t not in seen and (kind is None or kinds[t] == kind) and query in terms[t]:
+            found.append(t)
+    return found
+
+def write_network_asset(path, network_data, precompress=()):
+    """Écrit le graphe une seule fois en binaire compact ; renvoie les fichiers écrits
+
+    Les nœuds deviennent des entiers (leur rang), leurs attributs texte passent par
+    des dictionnaires (établissements, charges) dans un en-tête JSON, et les arêtes
+    sont quatre colonnes typées little-endian lues directement par le navigateur,
+    suivies de l'adjacence CSR de l'index de filtrage, des listes de l'index de recherche
+    et, en mode temporel, de la série par période et des instantanés.
+    """
+    nodes, edges, facilities = network_data["nodes"], network_data["edges"], network_data["facilities"]
+    index = network_data.get("index") or build_filter_index(nodes, edges)
+    search = network_data.get("search") or build_search_index(nodes)
+    node_ids = {node["id"]: i for i, node in enumerate(nodes)}
+    facility_ids = {facility: i for i, facility in enumerate(facilities)}
+    charge_ids = {}
+    node_charges = [[charge_ids.setdefault(c, len(charge_ids)) for c in node["charges"]] for node in nodes]
+
+    header = {
+        "version": 1,
+        "facilities": facilities,
+        "centrality": network_data.get("centrality"),
+        "layout": network_data.get("layout"),
+        "components": network_data.get("components"),
+        "communities": network_data.get("communities"),
+        "charges": list(charge_ids),
+        "nodes": {
+            "label": [node["label"] for node in nodes],
+            "group": [facility_ids.get(node["group"], -1) for node in nodes],
+            "value": [node["value"] for node in nodes],
+            "influence": [node["influence"] for node in nodes],
+            **{metric: [node[metric] for node in nodes] for metric in INFLUENCE_METRICS[1:]},
+            **{key: [node[key] for node in nodes] for key in ("component", "component_size", "core")},
+            "facilities": [[facility_ids[f] for f in node["facilities"]] for node in nodes],
+            "charges": node_charges,
+        },
+        "edge_count": len(edges),
+        "facility_nodes": index["facility_nodes"],
+        "search": {key: search[key] for key in ("terms", "display", "kinds", "trigrams")},
+        "search_counts": [len(search["postings"]), len(search["trigram_terms"])],
+    }
+    temporal = network_data.get("temporal")
+    if temporal:
+        header["temporal"] = {"period": temporal["period"], "labels": temporal["labels"],
+                              "runtime_s": temporal["runtime_s"],
+                              "counts": [len(temporal["period_edges"]), len(temporal["snapshot_nodes"])]}
+    if nodes and "x" in nodes[0]:
+        header["nodes"]["x"] = [node["x"] for node in nodes]
+        header["nodes"]["y"] = [node["y"] for node in nodes]
+    if nodes and "community" in nodes[0]:
+        header["nodes"]["community"] = [node["community"] for node in nodes]
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    padding = -(8 + len(header_bytes)) % 4
+    columns = [
+        np.array([node_ids[e["from"]] for e in edges], dtype='<u4'),
+        np.array([node_ids[e["to"]] for e in edges], dtype='<u4'),
+        np.array([e["raw_days"] for e in edges], dtype='<f4'),
+        np.array([e["width"] for e in edges], dtype='<f4'),
+        np.array(index["adjacency_indptr"], dtype='<u4'),
+        np.array(index["adjacency"], dtype='<u4'),
+        np.array(search["postings_indptr"], dtype='<u4'),
+        np.array(search["postings"], dtype='<u4'),
+        np.array(search["trigram_indptr"], dtype='<u4'),
+        np.array(search["trigram_terms"], dtype='<u4'),
+    ]
+    if temporal:
+        columns += [
+            np.array(temporal["period_indptr"], dtype='<u4'),
+            np.array(temporal["period_edges"], dtype='<u4'),
+            np.array(temporal["period_hours"], dtype='<f4'),
+            np.array(temporal["snapshot_indptr"], dtype='<u4'),
+            np.array(temporal["snapshot_nodes"], dtype='<u4'),
+            np.array(temporal["snapshot_degree"], dtype='<u4'),
+            np.array(temporal["snapshot_influence"], dtype='<f4'),
+        ]
+    payload = b"".join([ASSET_MAGIC, struct.pack('<I', len(header_bytes)), header_bytes, b"\0" * padding]
+                       + [column.tobytes() for column in columns])
+
+    written = [path]
+    with open(path, 'wb') as f:
+        f.write(payload)
+    if "gzip" in precompress:
+        with open(path + ".gz", 'wb') as f:
+            f.write(gzip.compress(payload, compresslevel=9))
+        written.append(path + ".gz")
+    if "br" in precompress:
+        try:
+            import brotli
+        except ImportError:
+            print("Module 'brotli' absent : pas de version .br")
+        else:
+            with open(path + ".br", 'wb') as f:
+                f.write(brotli.compress(payload, quality=11))
+            written.append(path + ".br")
+    return written
+
+def edge_record(u, v, duration, max_duration):
+    """Arête du dashboard (durée en heures, épaisseur relative à la plus longue relation)"""
+    days = duration / 24
+    width = 1 + (duration / max_duration) * 6
+    
+    return {
+        "from": u, 
+        "to": v,
+        "width": width,
+        "title": f"{days:.1f} jours ensemble", 
+        "days_count": f"{days:.1f}",
+        "raw_days": float(f"{days:.2f}"),
+        "color": { "color": "rgba(100, 100, 100, 0.2)", "highlight": "#000000" } 
+    }
+
+def build_network_data(state, centrality_mode=CENTRALITY_MODE, centrality_options=None,
+                       layout_mode=LAYOUT_MODE, layout_options=None,
+                       community_min_nodes=COMMUNITY_MIN_NODES, community_options=None,
+                       sparsify_mode=SPARSIFY_MODE, sparsify_options=None, temporal_period=TEMPORAL_PERIOD,
+                       min_component_size=MIN_COMPONENT_SIZE, report=None):
+    """Étapes 5 à 7ter : graphe compact, influence, disposition et données du dashboard
+
+    Renvoie le graphe (PersonGraph) et network_data, dont nodes[i] décrit la personne i.
+    """
+    report = report or PipelineReport()
+    person_charges = state['person_charges']
+    person_facilities = state['person_facilities']
+    facilities = state['index'].facilities
+
+    # 5. Agrégation : personnes internées en identifiants int32, durées en heures
+    with report.stage("aggregation") as counts:
+        graph = PersonGraph.from_edges_ns(state['edges_ns'])
+        counts.update(persons=len(graph), edges=graph.number_of_edges())
+    print(f"Relations conservées: {graph.number_of_edges()}.")
+
+    # 5bis. Composantes (union-find alimenté par les paires de l'étape 4) et k-cœurs, sur le
+    # graphe complet ; les personnes des petites composantes peuvent être écartées avant la
+    # centralité et la disposition
+    with report.stage("components") as counts:
+        component = state['forest'].labels(state['index'].person_ids(graph.names))
+        dropped = 0
+        if min_component_size:
+            graph, component, dropped = drop_small_components(graph, component, min_component_size)
+        component_sizes = np.bincount(component)
+        core = core_numbers(graph)
+        counts.update(components=len(component_sizes), dropped=dropped)
+    components_info = {"count": len(component_sizes), "largest": int(component_sizes.max()) if len(component_sizes) else 0,
+                       "max_core": int(core.max()) if len(core) else 0, "dropped": dropped,
+                       "min_size": min_component_size}
+    print(f"{components_info['count']} composantes (la plus grande : {components_info['largest']} personnes), "
+          f"cœur maximal {components_info['max_core']}"
+          + (f", {dropped} personnes de petites composantes écartées." if dropped else "."))
+
+    # 5ter. Squelette optionnel : centralité, disposition et navigateur sur un graphe borné
+    # (mêmes personnes ; composantes et cœurs restent ceux du graphe complet)
+    if sparsify_mode:
+        with report.stage("sparsify", mode=sparsify_mode) as counts:
+            graph, sparsify_info = sparsify_graph(graph, sparsify_mode, **(sparsify_options or {}))
+            counts.update(kept=sparsify_info['kept'], dropped=sparsify_info['dropped'])
+        print(f"Squelette '{sparsify_mode}' : {sparsify_info['dropped']} relations écartées, "
+              f"{sparsify_info['kept']} conservées ({sparsify_info['isolated']} personnes isolées).")
+    names = graph.names
+
+    # 6. Graphe compact (adjacence CSR) : degré, centralité, disposition et export
+    with report.stage("graph") as counts:
+        degree = graph.degree()
+        counts.update(nodes=len(graph), edges=graph.number_of_edges())
+
+    # 6bis. CALCUL CENTRALITÉ (Influence)
+    print("Calcul de la centralité (Influence)...")
+    with report.stage("centrality", mode=centrality_mode) as counts:
+        centrality, centrality_info = compute_centrality(graph, mode=centrality_mode, **(centrality_options or {}))
+        counts["nodes"] = len(graph)
+    print(f"Centralité '{centrality_info['mode']}' en {centrality_info['runtime_s']:.2f}s"
+          + (" (estimée)" if centrality_info['estimated'] else ""))
+
+    # 6bis'. PageRank, vecteur propre et jours cumulés : itérations de puissance quasi linéaires
+    with report.stage("metrics") as counts:
+        metrics, metrics_info = compute_influence_metrics(graph)
+        counts.update(pagerank_iterations=metrics_info['pagerank']['iterations'],
+                      eigenvector_iterations=metrics_info['eigenvector']['iterations'])
+    centrality_info["metrics"] = metrics_info
+
+    # 6ter. DISPOSITION (positions calculées ici : le navigateur saute la stabilisation)
+    node_groups = [(sorted(person_facilities.get(person, [])) or ["Inconnu"])[0] for person in names]
+    positions, layout_info = None, {"mode": layout_mode}
+    if layout_mode == "server":
+        print("Calcul de la disposition (ForceAtlas2)...")
+        with report.stage("layout") as counts:
+            positions, layout_info = compute_layout(graph, node_groups, **(layout_options or {}))
+            counts["iterations"] = layout_info['iterations']
+        print(f"Disposition en {layout_info['iterations']} itérations ({layout_info['runtime_s']:.2f}s, "
+              f"{layout_info['warm_start']} positions reprises)")
+
+    # 7. Données Visuelles avec GROUPES par Etablissement (identifiants entiers)
+    print("Génération du design...")
+    with report.stage("design") as counts:
+        influence_suffix = " (estimée)" if centrality_info['estimated'] else ""
+        node_data = []
+        for i, person in enumerate(names):
+            score = float(centrality[i])
+        
+            p_facilities = sorted(person_facilities.get(person, []))
+            p_charges = person_charges.get(person, [])
+        
+            charges_display = ", ".join(p_charges[:3])
+            if len(p_charges) > 3: charges_display += ", ..."
+
+            main_facility = node_groups[i]
+
+            node_data.append({
+                "id": i, 
+                "label": person, 
+                "group": main_facility, 
+                "value": int(degree[i]), 
+                "influence": score,
+                "pagerank": float(metrics["pagerank"][i]),
+                "eigenvector": float(metrics["eigenvector"][i]),
+                "strength": round(float(metrics["strength"][i]), 2),
+                "component": int(component[i]),
+                "component_size": int(component_sizes[component[i]]),
+                "core": int(core[i]),
+                "facilities": p_facilities, 
+                "charges": p_charges,
+                "title": f"{person}\nConnexions: {degree[i]}\nInfluence: {score:.4f}{influence_suffix}\nCharges: {charges_display}"
+            })
+            if positions is not None:
+                node_data[-1]["x"], node_data[-1]["y"] = positions[i].tolist()
+
+        src, dst, hours = graph.edges()
+        max_duration = hours.max() if len(hours) else 1
+        edge_data = [edge_record(u, v, duration, max_duration)
+                     for u, v, duration in zip(src.tolist(), dst.tolist(), hours.tolist())]
+        # Tri par durée : le filtre du navigateur parcourt seulement l'écart entre deux seuils
+        edge_data.sort(key=lambda e: e["raw_days"])
+        counts.update(nodes=len(node_data), edges=len(edge_data))
+
+    # 7bis. Communautés : hiérarchie Louvain pour la vue agrégée des grands graphes
+    communities = None
+    if nx is None:
+        print("networkx absent : pas de vue communautés")
+    elif community_min_nodes is not None and len(graph) >= community_min_nodes:
+        with report.stage("communities") as counts:
+            levels = detect_communities(graph, **(community_options or {}))
+            communities = build_community_hierarchy(graph, levels, node_data)
+            counts["levels"] = len(communities["levels"])
+        print("Communautés : " + " > ".join(str(len(level["size"])) for level in communities["levels"]))
+
+    # 7ter. Instantanés temporels : heures par relation et par période, degré et influence cumulés
+    temporal = None
+    if temporal_period:
+        # Mêmes pivots que la centralité 'sampled' ; instantanés exacts pour les autres modes
+        pivots = _sample_pivots(len(graph), **(centrality_options or {})) if centrality_mode == "sampled" else None
+        print(f"Instantanés temporels (période : {temporal_period})...")
+        with report.stage("temporal", period=temporal_period) as counts:
+            temporal = build_temporal_index(graph, state['index'],
+                                            np.array([e["from"] for e in edge_data], dtype=np.int64),
+                                            np.array([e["to"] for e in edge_data], dtype=np.int64),
+                                            state['min_hours'], temporal_period, pivots=pivots)
+            counts.update(periods=len(temporal['labels']), entries=len(temporal['period_edges']))
+        print(f"{len(temporal['labels'])} périodes, instantanés en {temporal['runtime_s']:.2f}s")
+
+    all_facilities_list = sorted(list(facilities))
+    with report.stage("indexes") as counts:
+        filter_index = build_filter_index(node_data, edge_data)
+        search_index = build_search_index(node_data)
+        counts["terms"] = len(search_index["terms"])
+
+    network_data = {
+        "nodes": node_data,
+        "edges": edge_data,
+        "facilities": all_facilities_list,
+        "centrality": centrality_info,
+        "layout": layout_info,
+        "components": components_info,
+        "communities": communities,
+        "temporal": temporal,
+        "index": filter_index,
+        "search": search_index
+    }
+    return graph, network_data
+
+# Styles et script du dashboard : statiques, recopiés dans la page ou servis à part (mode "asset")
+
+DASHBOARD_STYLE = """
+        :root {
+            --text: #212529;
+            --background: #f8f9fa;
+            --primary: #0d6efd; 
+            --secondary: #fd7e14;
+            --accent: #198754; 
+            
+            --panel-bg: rgba(255, 255, 255, 0.95);
+            --shadow: 0 4px 12px rgba(0,0,0,0.15);
+            --border: 1px solid #dee2e6;
+        }
+
+        body { 
+            margin: 0; padding: 0; background-color: var(--background); color: var(--text); 
+            font-family: 'Outfit', sans-serif; overflow: hidden; 
+            background-image: radial-gradient(#adb5bd 1px, transparent 1px);
+            background-size: 30px 30px;
+        }
+        
+        #mynetwork { width: 100vw; height: 100vh; position: absolute; top:0; left:0; z-index: 1; outline: none; }
+
+        .sidebar { 
+            position: absolute; top: 20px; left: 20px; width: 340px; z-index: 10;
+            background: var(--panel-bg); backdrop-filter: blur(10px); -webkit-backdrop-filter: blur(10px);
+            border-radius: 12px; box-shadow: var(--shadow); padding: 25px;
+            max-height: 90vh; overflow-y: auto; border: var(--border);
+        }
+        
+        .sidebar-header {
+            display: flex; align-items: center; gap: 12px; margin-bottom: 25px;
+        }
+        
+        .logo-sidebar {
+            width: 45px; height: 45px; object-fit: contain; border-radius: 8px;
+        }
+
+        h1 { font-weight: 700; font-size: 22px; margin: 0; color: var(--primary); display: flex; align-items: center; gap: 12px; }
+        .section-title { font-size: 11px; font-weight: 700; text-transform: uppercase; color: #6c757d; margin-bottom: 12px; margin-top: 25px; letter-spacing: 1px; display: flex; justify-content: space-between; align-items: center; }
+
+        .input-wrapper { position: relative; margin-bottom:10px; }
+        input[type="text"], select {
+            width: 100%; padding: 12px 15px; padding-left: 40px;
+            background: #fff; border: 1px solid #ced4da;
+            border-radius: 8px; color: var(--text); font-family: 'Outfit', sans-serif;
+            transition: all 0.2s ease; box-sizing: border-box; font-size: 14px;
+        }
+        select { padding-left: 15px; cursor: pointer; }
+        input[type="text"]:focus, select:focus { outline: none; border-color: var(--primary); box-shadow: 0 0 0 3px rgba(13, 110, 253, 0.25); }
+        .search-icon { position: absolute; left: 14px; top: 13px; color: var(--primary); pointer-events: none; }
+
+        .slider-box { padding: 15px; background: #fff; border-radius: 8px; border: 1px solid #ced4da; margin-bottom: 10px; }
+        .slider-header { display: flex; justify_content: space-between; font-size: 13px; color: #495057; margin-bottom: 10px; font-weight: 500; }
+        .slider-value { color: #fff; font-weight: 700; background: var(--primary); padding: 2px 8px; border-radius: 6px; font-size: 11px; }
+        
+        input[type="range"] { width: 100%; cursor: pointer; accent-color: var(--primary); height: 5px; background: #e9ecef; border-radius: 3px; appearance: none; }
+        
+        .info-card {
+            display: none; margin-top: 25px; background: #fff; border-radius: 12px;
+            box-shadow: var(--shadow); padding: 20px; position: relative; overflow: hidden;
+            animation: slideUp 0.4s cubic-bezier(0.16, 1, 0.3, 1); border: 1px solid #dee2e6;
+        }
+        .info-card::before { content: ''; position: absolute; top:0; left:0; width: 6px; height: 100%; background: var(--secondary); }
+        .info-card.active { display: block; }
+        
+        .info-title { font-size: 18px; font-weight: 700; margin-bottom: 15px; color: var(--text); border-bottom: 1px solid #eee; padding-bottom: 10px; }
+        .info-row { display: flex; justify_content: space-between; font-size: 13px; margin-bottom: 8px; }
+        .info-label { color: #6c757d; font-weight: 500; }
+        .info-val { color: var(--text); font-weight: 600; text-align: right; max-width: 60%; }
+
+        .tag-container { display: flex; flex-wrap: wrap; gap: 5px; margin-top: 10px; }
+        .tag { background: #e9ecef; color: #495057; font-size: 10px; padding: 3px 8px; border-radius: 4px; font-weight: 600; }
+
+        .stats-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 12px; margin-bottom: 10px; }
+        .stat-box { background: #fff; padding: 15px; border-radius: 12px; text-align: center; border: 1px solid #ced4da; }
+        .stat-num { font-size: 24px; font-weight: 700; color: var(--primary); display: block; line-height: 1; }
+        .stat-desc { font-size: 10px; color: #6c757d; text-transform: uppercase; font-weight: 600; }
+
+        .top-box { background: #fff; padding: 10px; border-radius: 12px; border: 1px solid #ced4da; margin-bottom: 20px; }
+        .top-item { display: flex; justify_content: space-between; align-items: center; padding: 8px; border-bottom: 1px solid #eee; font-size: 13px; cursor: pointer; transition: 0.2s; }
+        .top-item:last-child { border-bottom: none; }
+        .top-item:hover { background: #f8f9fa; color: var(--primary); }
+        .top-rank { font-weight: 700; color: var(--secondary); margin-right: 10px; width: 15px; }
+        .top-name { flex-grow: 1; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+        .top-score { font-size: 10px; color: #adb5bd; }
+        .influence-mode { font-size: 11px; color: #6c757d; margin: -6px 0 8px; }
+        #metric-select { margin-bottom: 10px; }
+
+        .btn-group { display: flex; gap: 10px; margin-top: 20px; }
+        .btn { flex: 1; padding: 12px; background: var(--primary); color: #fff; border: none; border-radius: 8px; cursor: pointer; font-weight: 600; font-size: 13px; transition: all 0.2s; display: flex; justify-content: center; align-items: center; gap: 8px; }
+        .btn:hover { background: #0b5ed7; transform: translateY(-2px); }
+        .btn-secondary { background: #fff; color: #495057; border: 1px solid #ced4da; }
+        .btn-secondary:hover { background: #f8f9fa; color: #212529; }
+
+        #loading-screen { position: fixed; inset: 0; background: var(--background); z-index: 100; display: flex; flex-direction: column; align-items: center; justify-content: center; transition: opacity 0.5s; }
+        .logo-loading { width: 100px; margin-bottom: 20px; }
+        .spinner { width: 50px; height: 50px; border: 4px solid #dee2e6; border-top: 4px solid var(--primary); border-radius: 50%; animation: spin 0.8s infinite; margin-bottom: 20px; }
+        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
+        @keyframes slideUp { from { opacity: 0; transform: translateY(20px); } to { opacity: 1; transform: translateY(0); } }
+    """
+
+DASHBOARD_SCRIPT = """
+        // --- CHARGEMENT DE L'ASSET BINAIRE (mode "asset") ---
+        // Format : 'PLK1' | longueur en-tête (uint32) | en-tête JSON | bourrage 4 octets
+        //          | from (uint32) | to (uint32) | raw_days (float32) | width (float32)
+        //          | adjacency_indptr (uint32, nœuds + 1) | adjacency (uint32, 2 x arêtes)
+        //          | postings_indptr | postings | trigram_indptr | trigram_terms (uint32, index de recherche)
+        //          [ | period_indptr | period_edges | period_hours (float32) | snapshot_indptr | snapshot_nodes
+        //            | snapshot_degree | snapshot_influence (float32) ]  (mode temporel)
+        async function loadNetworkAsset(url) {
+            const response = await fetch(url);
+            if (!response.ok) throw new Error(`${url} : HTTP ${response.status}`);
+            return decodeNetworkAsset(await response.arrayBuffer());
+        }
+
+        function decodeNetworkAsset(buffer) {
+            const decoder = new TextDecoder();
+            if (decoder.decode(new Uint8Array(buffer, 0, 4)) !== 'PLK1') throw new Error('Format de données inconnu');
+            const headerLength = new DataView(buffer).getUint32(4, true);
+            const header = JSON.parse(decoder.decode(new Uint8Array(buffer, 8, headerLength)));
+            const count = header.edge_count;
+            let offset = Math.ceil((8 + headerLength) / 4) * 4;
+            const column = (Type, length = count) => { const values = new Type(buffer, offset, length); offset += length * 4; return values; };
+            const from = column(Uint32Array), to = column(Uint32Array), rawDays = column(Float32Array), width = column(Float32Array);
+            const index = {
+                adjacency_indptr: column(Uint32Array, header.nodes.label.length + 1),
+                adjacency: column(Uint32Array, 2 * count),
+                facility_nodes: header.facility_nodes
+            };
+            const [postingCount, trigramCount] = header.search_counts;
+            const search = {
+                ...header.search,
+                postings_indptr: column(Uint32Array, header.search.terms.length + 1),
+                postings: column(Uint32Array, postingCount),
+                trigram_indptr: column(Uint32Array, header.search.trigrams.length + 1),
+                trigram_terms: column(Uint32Array, trigramCount)
+            };
+            let temporal = null;
+            if (header.temporal) {
+                const [entryCount, snapshotCount] = header.temporal.counts;
+                const periods = header.temporal.labels.length;
+                temporal = {
+                    ...header.temporal,
+                    period_indptr: column(Uint32Array, periods + 1),
+                    period_edges: column(Uint32Array, entryCount),
+                    period_hours: column(Float32Array, entryCount),
+                    snapshot_indptr: column(Uint32Array, periods + 1),
+                    snapshot_nodes: column(Uint32Array, snapshotCount),
+                    snapshot_degree: column(Uint32Array, snapshotCount),
+                    snapshot_influence: column(Float32Array, snapshotCount)
+                };
+            }
+
+            const estimated = header.centrality && header.centrality.estimated ? ' (estimée)' : '';
+            const cols = header.nodes;
+            const nodes = cols.label.map((label, id) => {
+                const charges = cols.charges[id].map(c => header.charges[c]);
+                const chargesDisplay = charges.slice(0, 3).join(', ') + (charges.length > 3 ? ', ...' : '');
+                return {
+                    id, label,
+                    group: cols.group[id] < 0 ? 'Inconnu' : header.facilities[cols.group[id]],
+                    value: cols.value[id],
+                    influence: cols.influence[id],
+                    pagerank: cols.pagerank[id],
+                    eigenvector: cols.eigenvector[id],
+                    strength: cols.strength[id],
+                    component: cols.component[id],
+                    component_size: cols.component_size[id],
+                    core: cols.core[id],
+                    facilities: cols.facilities[id].map(f => header.facilities[f]),
+                    charges,
+                    ...(cols.x ? { x: cols.x[id], y: cols.y[id] } : {}),
+                    ...(cols.community ? { community: cols.community[id] } : {}),
+                    title: `${label}\nConnexions: ${cols.value[id]}\nInfluence: ${cols.influence[id].toFixed(4)}${estimated}\nCharges: ${chargesDisplay}`
+                };
+            });
+            const edges = new Array(count);
+            for (let i = 0; i < count; i++) {
+                const days = Math.round(rawDays[i] * 100) / 100;
+                edges[i] = { from: from[i], to: to[i], width: width[i], raw_days: days, days_count: days.toFixed(1), title: `${days.toFixed(1)} jours ensemble` };
+            }
+            return { nodes, edges, facilities: header.facilities, centrality: header.centrality, layout: header.layout,
+                      components: header.components, communities: header.communities, temporal, index, search };
+        }
+
+        // --- INDEX DE RECHERCHE ---
+        // Termes triés (préfixe par dichotomie) et trigrammes (sous-chaînes, fautes de frappe),
+        // postings vers les identifiants de nœuds : aucune saisie ne parcourt tous les nœuds
+        function createSearchIndex(index) {
+            const { terms, kinds, trigrams } = index;
+            const lowerBound = (array, key) => {
+                let lo = 0, hi = array.length;
+                while (lo < hi) {
+                    const mid = (lo + hi) >> 1;
+                    if (array[mid] < key) lo = mid + 1; else hi = mid;
+                }
+                return lo;
+            };
+            const grams = q => {
+                const out = new Set();
+                for (let i = 0; i + 3 <= q.length; i++) out.add(q.slice(i, i + 3));
+                return [...out];
+            };
+            const gramTerms = g => {
+                const k = lowerBound(trigrams, g);
+                return trigrams[k] === g ? index.trigram_terms.slice(index.trigram_indptr[k], index.trigram_indptr[k + 1]) : [];
+            };
+            const postings = t => index.postings.slice(index.postings_indptr[t], index.postings_indptr[t + 1]);
+            // Minuscules sans accents, comme search_key côté Python
+            const fold = q => q.normalize('NFKD').replace(/\\p{Mn}/gu, '').toLowerCase();
+
+            // Termes commençant par q puis le contenant ; kind : 0 nom, 1 charge, null les deux
+            function lookup(q, limit = Infinity, kind = null) {
+                q = fold(q);
+                const keep = t => kind === null || kinds[t] === kind;
+                const found = [];
+                for (let t = lowerBound(terms, q); t < terms.length && found.length < limit && terms[t].startsWith(q); t++) {
+                    if (keep(t)) found.push(t);
+                }
+                if (q.length < 3 || found.length >= limit) return found;
+                const lists = grams(q).map(gramTerms).sort((a, b) => a.length - b.length);
+                const seen = new Set(found);
+                for (const t of lists[0]) {
+                    if (found.length >= limit) break;
+                    if (!seen.has(t) && keep(t) && terms[t].includes(q)) found.push(t);
+                }
+                return found;
+            }
+
+            // Terme partageant le plus de trigrammes avec q (saisie approximative), -1 sinon
+            function closest(q, kind = null, minScore = 0.5) {
+                const qGrams = grams(fold(q));
+                const shared = new Map();
+                qGrams.forEach(g => gramTerms(g).forEach(t => shared.set(t, (shared.get(t) || 0) + 1)));
+                let best = -1, bestScore = minScore;
+                shared.forEach((count, t) => {
+                    if (kind !== null && kinds[t] !== kind) return;
+                    const score = count / Math.max(qGrams.length, terms[t].length - 2);
+                    if (score > bestScore || (best < 0 && score === bestScore)) { best = t; bestScore = score; }
+                });
+                return best;
+            }
+
+            return { terms, kinds, display: index.display, postings, fold, lookup, closest };
+        }
+
+        // --- CHARGEMENT À LA DEMANDE (criminal.py serve) ---
+        // Réseau personnel demandé au serveur ; sans ?name=, celui de la personne la plus influente
+        async function fetchJson(url) {
+            const response = await fetch(url);
+            const body = await response.json();
+            if (!response.ok) throw new Error(body.error || `${url} : HTTP ${response.status}`);
+            return body;
+        }
+
+        async function loadEgoNetwork(params) {
+            if (!params.get('name')) {
+                const top = await fetchJson('api/top?n=1');
+                if (!top.people.length) throw new Error('Graphe vide');
+                params.set('name', top.people[0].label);
+            }
+            return fetchJson('api/ego?' + params);
+        }
+
+        function initDashboard(rawData) {
+        
+            const theme = {
+                primary: '#0d6efd',   // Bleu Franc
+                secondary: '#fd7e14', // Orange Franc
+                accent: '#198754',    // Vert Franc
+                text: '#212529'
+            };
+
+            // DataSets
+            const allEdges = rawData.edges;
+            const allNodes = rawData.nodes;
+            allEdges.forEach((e, i) => { e.id = i; });
+
+            // Index de filtrage (positions dans allNodes / allEdges)
+            const nodeIndex = new Map(allNodes.map((n, i) => [n.id, i]));
+            const edgeFrom = Uint32Array.from(allEdges, e => nodeIndex.get(e.from));
+            const edgeTo = Uint32Array.from(allEdges, e => nodeIndex.get(e.to));
+            const adjPtr = rawData.index.adjacency_indptr;
+            const adjacency = rawData.index.adjacency;
+            const facilityNodes = rawData.index.facility_nodes;
+            const search = createSearchIndex(rawData.search);
+            // Sous-graphe servi par 'criminal.py serve' : les autres personnes sont chargées à la demande
+            const egoView = rawData.server || null;
+            const nodes = new vis.DataSet(allNodes);
+            const edges = new vis.DataSet(allEdges);
+            const container = document.getElementById('mynetwork');
+        
+            // --- COULEURS PAR ETABLISSEMENT (SIMPLE & VISIBLE) ---
+            const groupsConfig = {
+                'King County Correctional Facility': { 
+                    color: { background: theme.primary, border: '#0a58ca', highlight: { background: '#0b5ed7', border: '#0a58ca' } },
+                    font: { color: '#fff' }
+                },
+                'Maleng Regional Justice Center': { 
+                    color: { background: theme.accent, border: '#146c43', highlight: { background: '#157347', border: '#146c43' } },
+                    font: { color: '#fff' }
+                },
+                'Electronic Home Detention': { 
+                    color: { background: theme.secondary, border: '#e65c00', highlight: { background: '#e65c00', border: '#e65c00' } },
+                    font: { color: '#fff' }
+                },
+                'Inconnu': {
+                    color: { background: '#6c757d', border: '#495057' },
+                    font: { color: '#fff' }
+                },
+                'default': {
+                    color: { background: '#adb5bd', border: '#6c757d' }
+                }
+            };
+
+            // Positions déjà calculées par le générateur : pas de stabilisation au chargement
+            const precomputedLayout = !!(rawData.layout && rawData.layout.mode === 'server');
+
+            const options = {
+                groups: groupsConfig,
+                nodes: {
+                    shape: 'dot', size: 14, borderWidth: 2,
+                    font: { size: 14, color: theme.text, face: 'Outfit', strokeWidth: 3, strokeColor: '#ffffff' },
+                    shadow: { enabled: true, color: 'rgba(0,0,0,0.2)', size: 10, x: 0, y: 5 }
+                },
+                edges: {
+                    smooth: { type: 'continuous', roundness: 0.5 },
+                    color: { color: 'rgba(100, 100, 100, 0.2)', highlight: theme.primary, hover: theme.primary },
+                    width: 1
+                },
+                physics: {
+                    enabled: !precomputedLayout,
+                    forceAtlas2Based: { gravitationalConstant: -60, centralGravity: 0.008, springLength: 120, springConstant: 0.06, damping: 0.9, avoidOverlap: 0.5 },
+                    maxVelocity: 5, minVelocity: 0.1, timestep: 0.2, adaptiveTimestep: true,
+                    solver: 'forceAtlas2Based', stabilization: { enabled: true, iterations: 1000 }
+                },
+                interaction: { hover: true, tooltipDelay: 200, hideEdgesOnDrag: true, zoomView: true }
+            };
+
+            const network = new vis.Network(container, {nodes, edges}, options);
+
+            function hideLoadingScreen() {
+                document.getElementById('loading-screen').style.opacity = '0';
+                setTimeout(() => { document.getElementById('loading-screen').style.display = 'none'; }, 500);
+            }
+            network.on("stabilizationIterationsDone", hideLoadingScreen);
+            if (precomputedLayout) hideLoadingScreen();
+
+            // --- GLOBAL STATE ---
+            let currentFocusId = null;
+
+            // DOM
+            const daysSlider = document.getElementById('daysFilter');
+            const degreeSlider = document.getElementById('degreeFilter');
+            const coreSlider = document.getElementById('coreFilter');
+            const giantOnly = document.getElementById('giantOnly');
+            const facSelect = document.getElementById('facility-select');
+            const statEdges = document.getElementById('stat-edges');
+            const statNodes = document.getElementById('stat-nodes');
+            const topList = document.getElementById('top-list');
+
+            // Init Stats
+            statNodes.innerText = allNodes.length;
+            statEdges.innerText = allEdges.length;
+
+            // --- POPULATE TOP 5 INFLUENCEURS ---
+            const centralityInfo = rawData.centrality || { estimated: false };
+            document.getElementById('influence-mode').innerText = centralityInfo.estimated
+                ? `Scores estimés (${centralityInfo.mode}, ${centralityInfo.samples} échantillons)`
+                : 'Scores exacts';
+
+            // Mesure du classement et de la taille des nœuds (toutes précalculées dans les nœuds).
+            // Le filtre d'importance lit nodeDegree : la propriété value sert à la taille.
+            // Connexions par défaut : la plupart des intermédiarités sont nulles et tous
+            // les nœuds auraient la taille minimale.
+            const METRICS = {
+                degree: { label: 'Connexions', format: v => v, get: n => nodeDegree[nodeIndex.get(n.id)] },
+                influence: { label: 'Influence', format: v => (v * 100).toFixed(1) },
+                pagerank: { label: 'PageRank', format: v => (v * 100).toFixed(2) },
+                eigenvector: { label: 'Vecteur propre', format: v => (v * 100).toFixed(1) },
+                strength: { label: 'Jours cumulés', format: v => Math.round(v) + 'j' }
+            };
+            const nodeDegree = Int32Array.from(allNodes, n => n.value);
+            // Composante (0 = la plus grande) et k-cœur de chaque nœud, pour les filtres structurels
+            const nodeComponent = Int32Array.from(allNodes, n => n.component || 0);
+            const nodeCore = Int32Array.from(allNodes, n => n.core || 0);
+            coreSlider.max = rawData.components ? rawData.components.max_core : 0;
+            const metricSelect = document.getElementById('metric-select');
+            Object.entries(METRICS).forEach(([key, m]) => {
+                const opt = document.createElement('option');
+                opt.value = key; opt.innerText = '📊 ' + m.label; metricSelect.appendChild(opt);
+            });
+            let metric = 'degree';
+            const metricOf = (n, key) => (METRICS[key].get ? METRICS[key].get(n) : n[key]) || 0;
+
+            function topBy(key, k) {
+                const best = [];
+                allNodes.forEach(n => {
+                    const v = metricOf(n, key);
+                    if (best.length === k && v <= metricOf(best[k - 1], key)) return;
+                    let pos = best.length;
+                    while (pos > 0 && metricOf(best[pos - 1], key) < v) pos--;
+                    best.splice(pos, 0, n);
+                    if (best.length > k) best.pop();
+                });
+                return best;
+            }
+
+            function applyMetric(key) {
+                metric = key;
+                topList.replaceChildren(...topBy(key, 5).map((n, index) => {
+                    const div = document.createElement('div');
+                    div.className = 'top-item';
+                    div.innerHTML = `<span class="top-rank">#${index+1}</span> <span class="top-name">${n.label}</span> <span class="top-score">${METRICS[key].format(metricOf(n, key))}</span>`;
+                    div.onclick = () => focusNode(n.id);
+                    return div;
+                }));
+                nodes.update(allNodes.map(n => ({ id: n.id, value: metricOf(n, key) })));
+            }
+            metricSelect.addEventListener('change', () => applyMetric(metricSelect.value));
+            applyMetric(metric);
+
+            // Populate Lists (suggestions de l'index de recherche, à chaque frappe)
+            const searchInput = document.getElementById('search-input');
+            const dataList = document.getElementById('names');
+            searchInput.addEventListener('input', function() {
+                const q = this.value.toLowerCase().trim();
+                dataList.replaceChildren(...(q ? search.lookup(q, 20) : []).map(t => {
+                    const opt = document.createElement('option');
+                    opt.value = search.display[t];
+                    if (search.kinds[t]) opt.innerText = "Charge: " + search.display[t];
+                    return opt;
+                }));
+            });
+
+            if (rawData.facilities) {
+                rawData.facilities.forEach(fac => {
+                    const opt = document.createElement('option');
+                    opt.value = fac; opt.innerText = "🏢 " + fac; facSelect.appendChild(opt);
+                });
+            }
+
+            // --- FENÊTRE TEMPORELLE (INSTANTANÉS) ---
+            // Heures par relation et par période (CSR par période) : déplacer une borne n'ajoute
+            // ou ne retire que les périodes qui entrent ou sortent de la fenêtre. Degré et influence
+            // sont ceux de l'instantané cumulé à la fin de la fenêtre (deltas rejoués).
+            const temporal = rawData.temporal || null;
+            const periodCount = temporal ? temporal.labels.length : 0;
+            const windowHours = new Float64Array(allEdges.length);
+            const snapDegree = new Int32Array(allNodes.length);
+            const snapInfluence = new Float64Array(allNodes.length);
+            let windowFrom = 0, windowTo = -1, snapshotAt = -1;
+            let windowDirty = [];
+
+            function shiftPeriod(p, sign) {
+                for (let k = temporal.period_indptr[p]; k < temporal.period_indptr[p + 1]; k++) {
+                    const e = temporal.period_edges[k];
+                    windowHours[e] += sign * temporal.period_hours[k];
+                    windowDirty.push(e);
+                }
+            }
+
+            function moveSnapshot(k) {
+                if (k < snapshotAt) {
+                    snapDegree.fill(0); snapInfluence.fill(0); snapshotAt = -1;
+                }
+                for (let s = snapshotAt + 1; s <= k; s++) {
+                    for (let j = temporal.snapshot_indptr[s]; j < temporal.snapshot_indptr[s + 1]; j++) {
+                        snapDegree[temporal.snapshot_nodes[j]] = temporal.snapshot_degree[j];
+                        snapInfluence[temporal.snapshot_nodes[j]] = temporal.snapshot_influence[j];
+                    }
+                }
+                snapshotAt = k;
+            }
+
+            function setWindow(from, to) {
+                for (let p = windowFrom; p <= windowTo; p++) if (p < from || p > to) shiftPeriod(p, -1);
+                for (let p = from; p <= to; p++) if (p < windowFrom || p > windowTo) shiftPeriod(p, +1);
+                windowFrom = from; windowTo = to;
+                moveSnapshot(to);
+                const labels = temporal.labels;
+                document.getElementById('time-display').innerText = from === to ? labels[from] : `${labels[from]} → ${labels[to]}`;
+            }
+
+            const timeFrom = document.getElementById('timeFrom');
+            const timeTo = document.getElementById('timeTo');
+            if (temporal && periodCount > 0) {
+                document.getElementById('time-box').style.display = '';
+                [timeFrom, timeTo].forEach(slider => { slider.max = periodCount - 1; });
+                timeTo.value = periodCount - 1;
+                setWindow(0, periodCount - 1);
+                windowDirty = [];
+            }
+            const fullWindow = () => !temporal || (windowFrom === 0 && windowTo === periodCount - 1);
+
+            // --- CŒUR DU SYSTÈME : VISIBILITÉ INCRÉMENTALE ---
+            // Les arêtes arrivent triées par raw_days : un seuil de jours devient une position
+            // (edgeCut) et seules les arêtes entre l'ancienne et la nouvelle position, ou
+            // touchant un nœud qui change d'état, sont ajoutées/retirées du DataSet.
+            // Fenêtre de temps partielle : une relation compte ses heures dans la fenêtre, et seules
+            // celles dont ces heures ont changé sont revues (toutes si le seuil de jours bouge).
+            const nodeVisible = new Uint8Array(allNodes.length).fill(1);
+            const edgeShown = new Uint8Array(allEdges.length).fill(1);
+            let visibleCount = allNodes.length, shownCount = allEdges.length, edgeCut = 0;
+            let lastMinDays = 1, lastFull = true;
+
+            function firstEdgeFrom(minDays) {
+                let lo = 0, hi = allEdges.length;
+                while (lo < hi) {
+                    const mid = (lo + hi) >> 1;
+                    if (allEdges[mid].raw_days < minDays) lo = mid + 1; else hi = mid;
+                }
+                return lo;
+            }
+
+            function updateVisibility() {
+                if (communityView) showCommunityView(false);
+                const minDays = parseInt(daysSlider.value);
+                const minDegree = parseInt(degreeSlider.value);
+                const minCore = parseInt(coreSlider.value);
+                const giant = giantOnly.checked;
+                const selectedFac = facSelect.value;
+            
+                document.getElementById('days-display').innerText = minDays + "j";
+                document.getElementById('degree-display').innerText = minDegree + "+";
+                document.getElementById('core-display').innerText = minCore + "+";
+
+                const cut = firstEdgeFrom(minDays);
+                const full = fullWindow();
+                const eligible = full ? (e => e >= cut) : (e => windowHours[e] >= minDays * 24 - 1e-6);
+
+                // 1. Candidats : voisinage du focus, nœuds de l'établissement ou tous
+                let candidates = null;
+                if (currentFocusId !== null) {
+                    const f = nodeIndex.get(currentFocusId);
+                    candidates = [f];
+                    for (let k = adjPtr[f]; k < adjPtr[f + 1]; k++) {
+                        const e = adjacency[k];
+                        if (eligible(e)) candidates.push(edgeFrom[e] === f ? edgeTo[e] : edgeFrom[e]);
+                    }
+                } else if (selectedFac !== 'all') {
+                    candidates = facilityNodes[selectedFac] || [];
+                }
+
+                const nextVisible = new Uint8Array(allNodes.length);
+                const mark = (i) => {
+                    const n = allNodes[i];
+                    const matchFac = (selectedFac === 'all') || (n.facilities && n.facilities.includes(selectedFac));
+                    const degree = temporal ? snapDegree[i] : nodeDegree[i];
+                    const inStructure = nodeCore[i] >= minCore && (!giant || nodeComponent[i] === 0);
+                    if (matchFac && degree >= minDegree && inStructure) nextVisible[i] = 1;
+                };
+                if (candidates === null) for (let i = 0; i < allNodes.length; i++) mark(i);
+                else candidates.forEach(mark);
+
+                // 2. Nœuds qui changent d'état
+                const nodesUpdates = [];
+                const changedNodes = [];
+                for (let i = 0; i < allNodes.length; i++) {
+                    if (nextVisible[i] === nodeVisible[i]) continue;
+                    nodeVisible[i] = nextVisible[i];
+                    visibleCount += nextVisible[i] ? 1 : -1;
+                    changedNodes.push(i);
+                    nodesUpdates.push({ id: allNodes[i].id, hidden: !nextVisible[i] });
+                }
+
+                // 3. Arêtes : écart entre les deux seuils + arêtes des nœuds modifiés
+                const toAdd = [], toRemove = [];
+                const consider = (e) => {
+                    const want = (eligible(e) && nodeVisible[edgeFrom[e]] && nodeVisible[edgeTo[e]]) ? 1 : 0;
+                    if (want === edgeShown[e]) return;
+                    edgeShown[e] = want;
+                    if (want) toAdd.push(allEdges[e]); else toRemove.push(e);
+                };
+                if (full !== lastFull || (!full && minDays !== lastMinDays)) {
+                    for (let e = 0; e < allEdges.length; e++) consider(e);
+                } else if (full) {
+                    for (let e = Math.min(cut, edgeCut); e < Math.max(cut, edgeCut); e++) consider(e);
+                } else {
+                    windowDirty.forEach(consider);
+                }
+                windowDirty = [];
+                lastFull = full;
+                lastMinDays = minDays;
+                changedNodes.forEach(i => {
+                    for (let k = adjPtr[i]; k < adjPtr[i + 1]; k++) consider(adjacency[k]);
+                });
+                edgeCut = cut;
+                shownCount += toAdd.length - toRemove.length;
+
+                nodes.update(nodesUpdates);
+                if (toRemove.length) edges.remove(toRemove);
+                if (toAdd.length) edges.add(toAdd);
+
+                statNodes.innerText = visibleCount;
+                statEdges.innerText = shownCount;
+            }
+
+            // Regroupe les événements des sliders : au plus un recalcul par frame
+            let visibilityFrame = null;
+            function scheduleVisibility() {
+                if (visibilityFrame !== null) return;
+                visibilityFrame = requestAnimationFrame(() => {
+                    visibilityFrame = null;
+                    updateVisibility();
+                });
+            }
+
+            daysSlider.addEventListener('input', scheduleVisibility);
+            degreeSlider.addEventListener('input', scheduleVisibility);
+            coreSlider.addEventListener('input', scheduleVisibility);
+            giantOnly.addEventListener('change', scheduleVisibility);
+            [timeFrom, timeTo].forEach(slider => slider.addEventListener('input', function() {
+                // Les deux bornes ne se croisent pas : la borne déplacée pousse l'autre
+                if (this === timeFrom && +timeFrom.value > +timeTo.value) timeTo.value = timeFrom.value;
+                if (this === timeTo && +timeTo.value < +timeFrom.value) timeFrom.value = timeTo.value;
+                setWindow(+timeFrom.value, +timeTo.value);
+                scheduleVisibility();
+            }));
+            facSelect.addEventListener('change', updateVisibility);
+
+            // --- VUE COMMUNAUTÉS (NIVEAUX DE DÉTAIL) ---
+            // Départ au niveau Louvain le plus grossier : chaque communauté est un supernœud
+            // (arêtes agrégées). Un clic la remplace par ses sous-communautés puis ses membres,
+            // un clic droit referme. Seuls les éléments affichés sont dans les DataSets.
+            const hierarchy = rawData.communities && rawData.communities.levels.length ? rawData.communities.levels : null;
+            const topLevel = hierarchy ? hierarchy.length - 1 : -1;
+            const lodNodes = new vis.DataSet();
+            const lodEdges = new vis.DataSet();
+            const expanded = new Set();
+            let communityView = false;
+
+            const communityKey = (level, c) => `c${level}:${c}`;
+            const clusterOf = new Map();
+            const children = [];
+            const personCommunity = [];
+            if (hierarchy) {
+                hierarchy.forEach((h, level) => {
+                    children.push(h.size.map(() => []));
+                    h.size.forEach((_, c) => clusterOf.set(communityKey(level, c), [level, c]));
+                });
+                personCommunity.push(Int32Array.from(allNodes, n => n.community));
+                allNodes.forEach((n, i) => children[0][n.community].push(i));
+                for (let level = 1; level <= topLevel; level++) {
+                    const parent = hierarchy[level - 1].parent;
+                    parent.forEach((p, c) => children[level][p].push(c));
+                    personCommunity.push(personCommunity[level - 1].map(c => parent[c]));
+                }
+            }
+
+            function supernode(level, c) {
+                const h = hierarchy[level];
+                return {
+                    id: communityKey(level, c), cluster: [level, c],
+                    label: `${h.label[c]} +${h.size[c] - 1}`, group: h.group[c], value: h.size[c], shape: 'hexagon',
+                    title: `Communauté de ${h.size[c]} personnes (niveau ${level + 1}/${topLevel + 1})\nClic : ouvrir`,
+                    ...(h.x ? { x: h.x[c], y: h.y[c] } : {})
+                };
+            }
+
+            // Élément affiché pour la personne i : elle-même ou sa communauté fermée la plus haute
+            function representative(i) {
+                for (let level = topLevel; level >= 0; level--) {
+                    const key = communityKey(level, personCommunity[level][i]);
+                    if (!expanded.has(key)) return key;
+                }
+                return allNodes[i].id;
+            }
+
+            function syncDataSet(dataSet, items) {
+                const stale = dataSet.getIds().filter(id => !items.has(id));
+                if (stale.length) dataSet.remove(stale);
+                dataSet.update([...items.values()]);
+            }
+
+            function renderCommunityView() {
+                const items = new Map();
+                const visit = (level, c) => {
+                    const key = communityKey(level, c);
+                    if (!expanded.has(key)) { items.set(key, supernode(level, c)); return; }
+                    children[level][c].forEach(child => {
+                        if (level > 0) visit(level - 1, child);
+                        else items.set(allNodes[child].id, { ...allNodes[child], hidden: false });
+                    });
+                };
+                hierarchy[topLevel].size.forEach((_, c) => visit(topLevel, c));
+
+                const links = new Map();
+                const link = (a, b, days, relations, edge) => {
+                    const id = String(a) < String(b) ? `${a}|${b}` : `${b}|${a}`;
+                    const current = links.get(id);
+                    if (current) { current.raw_days += days; current.relations += relations; }
+                    else links.set(id, { id, from: a, to: b, raw_days: days, relations, edge });
+                };
+                if (expanded.size === 0) {
+                    hierarchy[topLevel].edges.forEach(([a, b, days, relations]) =>
+                        link(communityKey(topLevel, a), communityKey(topLevel, b), days, relations, null));
+                } else {
+                    allEdges.forEach((e, k) => {
+                        const a = representative(edgeFrom[k]), b = representative(edgeTo[k]);
+                        if (a !== b) link(a, b, e.raw_days, 1, e);
+                    });
+                }
+                links.forEach(l => {
+                    if (l.relations === 1 && l.edge && !clusterOf.has(l.from) && !clusterOf.has(l.to)) {
+                        Object.assign(l, { ...l.edge, id: l.id });
+                    } else {
+                        const days = l.raw_days;
+                        Object.assign(l, { width: 1 + Math.log1p(l.relations), days_count: days.toFixed(1),
+                                           title: `${l.relations} relations, ${days.toFixed(1)} jours cumulés` });
+                    }
+                    delete l.edge; delete l.relations;
+                });
+
+                syncDataSet(lodNodes, items);
+                syncDataSet(lodEdges, links);
+                statNodes.innerText = items.size;
+                statEdges.innerText = links.size;
+            }
+
+            function collapseCommunity(key) {
+                const [level, c] = clusterOf.get(key);
+                [...expanded].forEach(k => {
+                    let [l, x] = clusterOf.get(k);
+                    while (l < level) x = hierarchy[l++].parent[x];
+                    if (l === level && x === c) expanded.delete(k);
+                });
+                renderCommunityView();
+            }
+
+            function showCommunityView(on) {
+                communityView = on && hierarchy !== null;
+                network.setData(communityView ? { nodes: lodNodes, edges: lodEdges } : { nodes, edges });
+                if (communityView) renderCommunityView();
+                document.getElementById('btn-view').innerHTML = communityView
+                    ? '<i class="fas fa-user"></i> Vue individus' : '<i class="fas fa-project-diagram"></i> Vue communautés';
+                document.getElementById('view-hint').innerText = communityView ? 'Clic : ouvrir une communauté, clic droit : refermer' : '';
+            }
+
+            function toggleCommunityView() {
+                showCommunityView(!communityView);
+                if (!communityView) updateVisibility();
+            }
+
+            function communityClick(params) {
+                if (params.nodes.length > 0) {
+                    const item = lodNodes.get(params.nodes[0]);
+                    if (item.cluster) {
+                        // Ouvre aussi les communautés restées indivisibles au niveau inférieur
+                        let [level, c] = item.cluster;
+                        expanded.add(item.id);
+                        while (level > 0 && children[level][c].length === 1) {
+                            c = children[level--][c][0];
+                            expanded.add(communityKey(level, c));
+                        }
+                        renderCommunityView();
+                        return;
+                    }
+                    let facDisplay = item.facilities && item.facilities.length ? item.facilities[0] : "-";
+                    if (item.facilities && item.facilities.length > 1) facDisplay += " (+)";
+                    showInfo(item, facDisplay, nodeDegree[nodeIndex.get(item.id)], null);
+                } else if (params.edges.length > 0) {
+                    showInfo(null, null, null, lodEdges.get(params.edges[0]).days_count + " jours");
+                } else {
+                    document.getElementById('info-card').classList.remove('active');
+                }
+            }
+
+            network.on("oncontext", function(params) {
+                if (!communityView) return;
+                params.event.preventDefault();
+                const id = network.getNodeAt(params.pointer.DOM);
+                if (id === undefined) return;
+                let [level, c] = clusterOf.has(id) ? clusterOf.get(id) : [-1, allNodes[nodeIndex.get(id)].community];
+                if (level === topLevel) return;
+                if (level >= 0) c = hierarchy[level].parent[c];
+                level++;
+                while (level < topLevel && children[level + 1][hierarchy[level].parent[c]].length === 1) {
+                    c = hierarchy[level++].parent[c];
+                }
+                collapseCommunity(communityKey(level, c));
+            });
+
+            // --- ACTIONS ---
+            function focusNode(id) {
+                currentFocusId = id; 
+                updateVisibility();
+                network.focus(id, { scale: 1.0, animation: { duration: 800, easingFunction: 'easeInOutQuad' } });
+                network.selectNodes([id]);
+                const node = nodes.get(id);
+                const connectedCount = network.getConnectedNodes(id).length;
+                let facDisplay = node.facilities && node.facilities.length ? node.facilities[0] : "-";
+                if (node.facilities && node.facilities.length > 1) facDisplay += " (+)";
+                showInfo(node, facDisplay, connectedCount, null);
+            }
+
+            function resetView() {
+                currentFocusId = null;
+                if (communityView) {
+                    expanded.clear();
+                    renderCommunityView();
+                } else {
+                    updateVisibility();
+                }
+                network.fit({ animation: { duration: 1000 } });
+                searchInput.value = '';
+                document.getElementById('info-card').classList.remove('active');
+            }
+
+            async function loadEgo(query) {
+                const found = await fetchJson('api/search?limit=1&q=' + encodeURIComponent(query));
+                if (!found.people.length) return;
+                location.search = '?' + new URLSearchParams({ name: found.people[0].label, hops: egoView.hops, min_days: egoView.min_days });
+            }
+
+            // --- EXPORT PHOTO ---
+            function exportCanvas() {
+                const canvas = document.querySelector('canvas');
+                const link = document.createElement('a');
+                link.download = 'prison_network_evidence.png';
+                link.href = canvas.toDataURL();
+                link.click();
+            }
+
+            // --- RECHERCHE ---
+            searchInput.addEventListener('change', function() {
+                const val = this.value.toLowerCase();
+                if (!val.trim()) return;
+                const [name] = search.lookup(val, 1, 0);
+                if (name !== undefined && search.terms[name] === search.fold(val)) {
+                    focusNode(search.postings(name)[0]);
+                    return;
+                }
+                // Charge : premier nœud (ordre du graphe) portant une charge qui contient la saisie
+                let first = Infinity;
+                search.lookup(val, Infinity, 1).forEach(t => {
+                    for (const id of search.postings(t)) if (nodeIndex.get(id) < first) first = nodeIndex.get(id);
+                });
+                if (first < Infinity) {
+                    focusNode(allNodes[first].id);
+                } else if (egoView) {
+                    loadEgo(this.value);
+                } else {
+                    const near = search.closest(val, 0);
+                    if (near >= 0) focusNode(search.postings(near)[0]);
+                }
+            });
+
+            network.on("click", function(params) {
+                if (communityView) {
+                    communityClick(params);
+                } else if (params.nodes.length > 0) {
+                    focusNode(params.nodes[0]);
+                } else if (params.edges.length > 0) {
+                    const edge = edges.get(params.edges[0]);
+                    showInfo(null, null, null, fullWindow() ? edge.days_count + " jours"
+                        : (windowHours[edge.id] / 24).toFixed(1) + " jours sur la période");
+                } else {
+                    document.getElementById('info-card').classList.remove('active');
+                }
+            });
+
+            function showInfo(data, fac, conns, duration) {
+                const card = document.getElementById('info-card');
+                const chargesContainer = document.getElementById('charges-container');
+                const chargesTags = document.getElementById('charges-tags');
+            
+                if(duration) {
+                    document.getElementById('info-title').innerText = "Relation";
+                    document.getElementById('info-fac').innerText = "-";
+                    document.getElementById('info-conns').innerText = "-";
+                    document.getElementById('info-score').innerText = "-";
+                    document.getElementById('row-network').style.display = 'none';
+                    document.getElementById('row-duration').style.display = 'flex';
+                    document.getElementById('info-duration').innerText = duration;
+                    chargesContainer.style.display = 'none';
+                } else {
+                    document.getElementById('info-title').innerText = data.label;
+                    document.getElementById('info-fac').innerText = fac;
+                    document.getElementById('info-conns').innerText = conns;
+                    const score = temporal && metric === 'influence' ? snapInfluence[nodeIndex.get(data.id)] : metricOf(data, metric);
+                    document.getElementById('info-score-label').innerText = METRICS[metric].label;
+                    document.getElementById('info-score').innerText = METRICS[metric].format(score || 0);
+                    document.getElementById('row-network').style.display = 'flex';
+                    document.getElementById('info-network').innerText = data.core === undefined ? "-"
+                        : `Comp. ${data.component + 1} (${data.component_size}) · ${data.core}-cœur`;
+                    document.getElementById('row-duration').style.display = 'none';
+                
+                    chargesTags.innerHTML = '';
+                    if(data.charges && data.charges.length > 0) {
+                        chargesContainer.style.display = 'block';
+                        data.charges.forEach(c => {
+                            const tag = document.createElement('div');
+                            tag.className = 'tag'; tag.innerText = c; chargesTags.appendChild(tag);
+                        });
+                    } else { chargesContainer.style.display = 'none'; }
+                }
+                card.classList.add('active');
+            }
+
+            let physicsOn = !precomputedLayout;
+            function renderPhysicsButton() {
+                const btn = document.getElementById('btn-physics');
+                btn.innerHTML = physicsOn ? '<i class="fas fa-pause"></i> Pause' : '<i class="fas fa-play"></i> Play';
+            }
+            renderPhysicsButton();
+            function togglePhysics() {
+                physicsOn = !physicsOn;
+                network.setOptions({physics: physicsOn});
+                renderPhysicsButton();
+            }
+        
+            updateVisibility();
+            if (hierarchy) {
+                document.getElementById('btn-view').style.display = '';
+                showCommunityView(true);
+            }
+            if (egoView) {
+                document.getElementById('view-hint').innerText = `Réseau de ${egoView.name} (${egoView.hops} sauts`
+                    + (egoView.truncated ? ', tronqué' : '') + ') : double-clic pour recentrer';
+                network.on("doubleClick", function(params) {
+                    if (params.nodes.length > 0) loadEgo(nodes.get(params.nodes[0]).label);
+                });
+            }
+
+            // Fonctions appelées par les boutons (onclick)
+            Object.assign(window, { exportCanvas, togglePhysics, resetView, toggleCommunityView });
+        }
+"""
+
+def render_dashboard(data_loader, static=False):
+    """Page du dashboard ; data_loader est le script qui obtient les données et appelle initDashboard
+
+    Avec `static`, styles et script (identiques d'une génération à l'autre) sont liés
+    depuis DASHBOARD_STYLE_FILE et DASHBOARD_SCRIPT_FILE, que le navigateur garde en
+    cache, au lieu d'être recopiés dans la page.
+    """
+    if static:
+        style = f'<link rel="stylesheet" href="{DASHBOARD_STYLE_FILE}">'
+        script = f'<script src="{DASHBOARD_SCRIPT_FILE}"></script>\n    <script>'
+    else:
+        style = f"<style>{DASHBOARD_STYLE}</style>"
+        script = f"<script>{DASHBOARD_SCRIPT}"
+    return f"""
+<!DOCTYPE html>
+<html lang="fr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Analyse Réseau - Dashboard</title>
+    
+    <!-- Favicon -->
+    <link rel="icon" type="image/png" href="{LOGO_URL}">
+    
+    <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
+    <link href="https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
+    
+    {style}
+</head>
+<body>
+
+    <div id="loading-screen">
+        <img src="{LOGO_URL}" class="logo-loading" alt="Logo">
+        <div class="spinner"></div>
+        <div id="loading-text" style="font-size: 14px; font-weight: 600; color: var(--primary); letter-spacing: 2px;">CHARGEMENT DU SYSTÈME</div>
+    </div>
+
+    <div id="mynetwork"></div>
+
+    <div class="sidebar">
+        <div class="sidebar-header">
+            <img src="{LOGO_URL}" alt="Logo" class="logo-sidebar">
+            <h1>Network Intel.</h1>
+        </div>
+        
+        <div class="stats-grid">
+            <div class="stat-box">
+                <span class="stat-num" id="stat-nodes">0</span>
+                <span class="stat-desc">Détenus</span>
+            </div>
+            <div class="stat-box">
+                <span class="stat-num" id="stat-edges">0</span>
+                <span class="stat-desc">Connexions</span>
+            </div>
+        </div>
+
+        <div class="section-title"><span>Top Influenceurs</span> <i class="fas fa-crown" style="color:var(--secondary)"></i></div>
+        <div class="influence-mode" id="influence-mode"></div>
+        <select id="metric-select" title="Classement et taille des nœuds"></select>
+        <div class="top-box" id="top-list">
+            <!-- Rempli par JS -->
+        </div>
+        
+        <div class="section-title"><span>Filtres Globaux</span> <i class="fas fa-sliders-h"></i></div>
+        
+        <div class="input-wrapper">
+             <select id="facility-select">
+                <option value="all">🏢 Tous les établissements</option>
+             </select>
+        </div>
+
+        <div class="slider-box">
+            <div class="slider-header"><span><i class="fas fa-clock"></i> Durée min.</span><span class="slider-value" id="days-display">1j</span></div>
+            <input type="range" id="daysFilter" min="1" max="100" value="1" step="1">
+        </div>
+
+        <div class="slider-box">
+            <div class="slider-header"><span><i class="fas fa-users"></i> Importance</span><span class="slider-value" id="degree-display">0+</span></div>
+            <input type="range" id="degreeFilter" min="0" max="20" value="0" step="1">
+        </div>
+
+        <div class="slider-box">
+            <div class="slider-header"><span><i class="fas fa-bullseye"></i> k-cœur min.</span><span class="slider-value" id="core-display">0+</span></div>
+            <input type="range" id="coreFilter" min="0" max="0" value="0" step="1">
+            <label class="slider-header" style="margin-top:8px; cursor:pointer;"><span><input type="checkbox" id="giantOnly"> Plus grande composante</span></label>
+        </div>
+
+        <div class="slider-box" id="time-box" style="display:none">
+            <div class="slider-header"><span><i class="fas fa-calendar-alt"></i> Période</span><span class="slider-value" id="time-display">-</span></div>
+            <input type="range" id="timeFrom" min="0" max="0" value="0" step="1">
+            <input type="range" id="timeTo" min="0" max="0" value="0" step="1">
+        </div>
+        
+        <div class="section-title"><span>Recherche</span> <i class="fas fa-search"></i></div>
+        <div class="input-wrapper">
+            <i class="fas fa-search search-icon"></i>
+            <input type="text" id="search-input" list="names" placeholder="Nom ou Charge...">
+            <datalist id="names"></datalist>
+        </div>
+
+        <div id="info-card" class="info-card">
+            <div class="info-title" id="info-title">Nom</div>
+            <div class="info-row"><span class="info-label">Etablissement</span> <span class="info-val" id="info-fac">-</span></div>
+            <div class="info-row"><span class="info-label">Connexions</span> <span class="info-val" id="info-conns">-</span></div>
+            <div class="info-row"><span class="info-label" id="info-score-label">Influence</span> <span class="info-val" id="info-score">-</span></div>
+            <div class="info-row" id="row-network"><span class="info-label">Réseau</span> <span class="info-val" id="info-network">-</span></div>
+            <div class="info-row" id="row-duration" style="display:none"><span class="info-label">Durée</span> <span class="info-val" id="info-duration">-</span></div>
+            <div id="charges-container" style="display:none; margin-top:10px; border-top:1px solid #dee2e6; padding-top:10px;">
+                <span class="info-label" style="font-size:11px;">CHARGES</span>
+                <div class="tag-container" id="charges-tags"></div>
+            </div>
+        </div>
+
+        <div class="btn-group">
+            <button class="btn" onclick="exportCanvas()"><i class="fas fa-camera"></i> Photo</button>
+            <button class="btn btn-secondary" onclick="togglePhysics()" id="btn-physics"><i class="fas fa-pause"></i> Pause</button>
+        </div>
+        
+        <div style="margin-top: 15px; text-align:center;">
+             <button class="btn btn-secondary" style="width:100%" onclick="resetView()"><i class="fas fa-sync-alt"></i> Reset Vue</button>
+        </div>
+
+        <div style="margin-top: 10px; text-align:center;">
+             <button class="btn btn-secondary" style="width:100%; display:none" onclick="toggleCommunityView()" id="btn-view"><i class="fas fa-project-diagram"></i> Vue communautés</button>
+             <div class="influence-mode" id="view-hint" style="margin-top: 6px;"></div>
+        </div>
+        
+        <div style="margin-top: 20px; font-size: 11px; text-align: center;">
+            <a href="index.html" style="color: var(--primary); text-decoration: none;">Retour Accueil</a>
+        </div>
+    </div>
+
+    {script}
+        {data_loader}
+    </script>
+</body>
+</html>
+    """
+
+def generate_dashboard(csv_path=DATA_FILE, edge_backend=EDGE_BACKEND, edge_options=None,
+                       incremental=False, state_file=STATE_FILE,
+                       centrality_mode=CENTRALITY_MODE, centrality_options=None, cache_dir=CACHE_DIR,
+                       chunk_rows=STREAM_CHUNK_ROWS, output_mode=OUTPUT_MODE, precompress=(),
+                       layout_mode=LAYOUT_MODE, layout_options=None,
+                       community_min_nodes=COMMUNITY_MIN_NODES, community_options=None,
+                       sparsify_mode=SPARSIFY_MODE, sparsify_options=None, temporal_period=TEMPORAL_PERIOD,
+                       min_component_size=MIN_COMPONENT_SIZE, report_file=REPORT_FILE, profile_dir=None):
+    """Pipeline complet ; renvoie le PipelineReport (report.failed est renseigné en cas d'échec)"""
+    report = PipelineReport(profile_dir)
+    print(f"Chargement des données... (Base: > {MIN_DURATION_FILTER}h ensemble)")
+    try:
+        # 1 à 4. Chargement, charges, séjours et paires (repris de l'état en mode incrémental)
+        state = load_state(state_file, csv_path, MIN_DURATION_FILTER) if incremental else None
+        if state is None:
+            state = build_network_state(csv_path, MIN_DURATION_FILTER, edge_backend, edge_options,
+                                        cache_dir=cache_dir, chunk_rows=chunk_rows, report=report)
+        else:
+            with report.stage("incremental") as counts:
+                update_network_state(state, csv_path)
+                counts.update(stays=len(state['index']), pairs=len(state['edges_ns']))
+        if incremental:
+            save_state(state, state_file)
+
+        # 5 à 7bis. Graphe compact, influence, disposition, communautés
+        _, network_data = build_network_data(state, centrality_mode, centrality_options,
+                                             layout_mode, layout_options,
+                                             community_min_nodes, community_options,
+                                             sparsify_mode, sparsify_options, temporal_period,
+                                             min_component_size, report=report)
+
+        with report.stage("export", mode=output_mode) as counts:
+            # --- EXPORT JSON ---
+            if output_mode == "asset":
+                written = write_network_asset(ASSET_FILE, network_data, precompress=precompress)
+                print(f"Données du graphe : {', '.join(written)}")
+                for path, content in ((DASHBOARD_STYLE_FILE, DASHBOARD_STYLE), (DASHBOARD_SCRIPT_FILE, DASHBOARD_SCRIPT)):
+                    with open(path, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                data_loader = (f"loadNetworkAsset('{os.path.basename(ASSET_FILE)}').then(initDashboard).catch(err => {{\n"
+                               f"            document.getElementById('loading-text').innerText = 'ERREUR : ' + err.message;\n"
+                               f"        }});")
+            else:
+                with open('network_data.json', 'w', encoding='utf-8') as f:
+                    json.dump(network_data, f, ensure_ascii=False, indent=4)
+                data_loader = f"initDashboard({json.dumps(network_data)});"
+
+            # 8. HTML & CSS
+            html_content = render_dashboard(data_loader, static=output_mode == "asset")
+
+            output_file = "prison_dashboard.html"
+            with open(output_file, "w", encoding='utf-8') as f:
+                f.write(html_content)
+            counts["html_bytes"] = len(html_content.encode('utf-8'))
+        print(f"Interface Moderne générée : '{output_file}'")
+
+    except Exception as e:
+        report.fail(e)
+        stage = report.failed["stage"]
+        print(f"Erreur critique{f' (étape {stage})' if stage else ''} : {type(e).__name__}: {e}")
+        traceback.print_exc()
+
+    report.print_table()
+    if report_file:
+        report.save(report_file)
+        print(f"Mesures par étape : '{report_file}'")
+    if profile_dir:
+        print(f"Profils cProfile et tracemalloc par étape : '{profile_dir}'")
+
+    generate_landing_page()
+    return report
+
+# --- SERVEUR DE REQUÊTES (MODE serve) ---
+
+SERVE_STATIC = {"/index.html": ("index.html", "text/html; charset=utf-8"),
+                "/" + LOGO_URL: (LOGO_URL, "image/png")}
+
+class NetworkService:
+    """Graphe construit une seule fois et gardé en mémoire ; requêtes JSON mises en cache
+
+    Chaque route appelle une méthode publique avec des paramètres convertis selon
+    ROUTES (méthode, types, paramètres obligatoires) ; le cache LRU porte sur ces
+    paramètres typés et garde la réponse encodée.
+    """
+
+    ROUTES = {
+        "/api/info": ("info", {}, ()),
+        "/api/ego": ("ego", {"name": str, "hops": int, "min_days": float, "max_nodes": int}, ("name",)),
+        "/api/path": ("path", {"source": str, "target": str}, ("source", "target")),
+        "/api/top": ("top", {"facility": str, "n": int, "metric": str}, ()),
+        "/api/search": ("search", {"q": str, "limit": int}, ("q",)),
+    }
+
+    def __init__(self, graph, network_data, cache_size=SERVE_CACHE_SIZE):
+        self.graph = graph
+        self.data = network_data
+        self.nodes = network_data["nodes"]
+        self.adjacency = graph.adjacency_lists()
+        # Longueur 1/heures pour les chemins : plus deux personnes ont passé de temps ensemble, plus elles sont proches
+        self.closeness = (self.adjacency[0], self.adjacency[1], [1.0 / w for w in self.adjacency[2]])
+        self.max_duration = float(graph.weights.max()) if len(graph.weights) else 1.0
+        self.search_index = network_data["search"]
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._encode)
+
+    def _id(self, name):
+        try:
+            return self.graph.ids[name]
+        except KeyError:
+            raise LookupError(f"Personne inconnue : {name}") from None
+
+    def _summary(self, i):
+        node = self.nodes[i]
+        return {"id": i, "label": node["label"], "group": node["group"], "value": node["value"],
+                **{metric: node[metric] for metric in INFLUENCE_METRICS}}
+
+    def info(self):
+        return {"nodes": len(self.graph), "edges": self.graph.number_of_edges(),
+                "facilities": self.data["facilities"], "centrality": self.data["centrality"]}
+
+    def ego(self, name, hops=SERVE_EGO_HOPS, min_days=1.0, max_nodes=SERVE_MAX_NODES):
+        """Réseau à k sauts d'une personne (relations >= min_days jours), au format du dashboard
+
+        Parcours en largeur sur l'adjacence CSR ; si un niveau dépasse max_nodes, seuls
+        ses liens les plus longs sont gardés et la réponse est marquée tronquée.
+        """
+        if hops < 0 or max_nodes < 1:
+            raise ValueError("hops >= 0 et max_nodes >= 1 attendus")
+        indptr, indices, weights = self.adjacency
+        threshold = min_days * 24
+        members = {self._id(name): 0}
+        frontier = list(members)
+        truncated = False
+        for depth in range(1, hops + 1):
+            reached = {}
+            for v in frontier:
+                for k in range(indptr[v], indptr[v + 1]):
+                    w = indices[k]
+                    if w not in members and weights[k] >= threshold and weights[k] > reached.get(w, -1.0):
+                        reached[w] = weights[k]
+            room = max_nodes - len(members)
+            if len(reached) > room:
+                reached = dict(sorted(reached.items(), key=lambda item: item[1], reverse=True)[:room])
+                truncated = True
+            members.update(dict.fromkeys(reached, depth))
+            frontier = list(reached)
+            if truncated or not frontier:
+                break
+
+        ids = sorted(members)
+        edge_data = [edge_record(v, indices[k], weights[k], self.max_duration)
+                     for v in ids for k in range(indptr[v], indptr[v + 1])
+                     if v < indices[k] and indices[k] in members and weights[k] >= threshold]
+        edge_data.sort(key=lambda e: e["raw_days"])
+        node_data = [self.nodes[i] for i in ids]
+        return {
+            "nodes": node_data,
+            "edges": edge_data,
+            "facilities": self.data["facilities"],
+            "centrality": self.data["centrality"],
+            "layout": self.data["layout"],
+            "communities": None,
+            "index": build_filter_index(node_data, edge_data),
+            "search": build_search_index(node_data),
+            "server": {"name": name, "hops": hops, "min_days": min_days, "truncated": truncated},
+        }
+
+    def path(self, source, target):
+        """Chaîne de relations la plus forte entre deux personnes
+
+        Chaque relation a pour longueur 1/heures passées ensemble : le chemin suit les liens
+        longs plutôt que les rencontres brèves ("metric" de la réponse). "hours" donne la
+        durée de chaque relation du chemin, "cost" la somme des 1/heures.
+        """
+        s, t = self._id(source), self._id(target)
+        _, P, _, D = _dijkstra_paths(self.closeness, s)
+        if t not in D:
+            return {"source": source, "target": target, "found": False, "metric": "inverse_hours", "path": []}
+        route = [t]
+        while route[-1] != s:
+            route.append(P[route[-1]][0])
+        route.reverse()
+        indptr, indices, weights = self.adjacency
+        hours = [next(weights[k] for k in range(indptr[a], indptr[a + 1]) if indices[k] == b)
+                 for a, b in zip(route, route[1:])]
+        return {"source": source, "target": target, "found": True, "metric": "inverse_hours", "cost": D[t],
+                "hours": hours, "path": [self._summary(i) for i in route]}
+
+    def top(self, facility=None, n=10, metric="influence"):
+        """Personnes les plus influentes selon `metric`, pour un établissement ou l'ensemble"""
+        if n < 1:
+            raise ValueError("n >= 1 attendu")
+        if metric not in INFLUENCE_METRICS:
+            raise ValueError(f"Mesure inconnue : {metric} ({', '.join(INFLUENCE_METRICS)})")
+        if facility is None:
+            members = range(len(self.nodes))
+        elif facility in self.data["index"]["facility_nodes"]:
+            members = self.data["index"]["facility_nodes"][facility]
+        else:
+            raise LookupError(f"Établissement inconnu : {facility}")
+        best = heapq.nlargest(n, members, key=lambda i: self.nodes[i][metric])
+        return {"facility": facility, "metric": metric, "people": [self._summary(i) for i in best]}
+
+    def search(self, q, limit=20):
+        """Noms contenant q (nom exact puis préfixes en tête) et charges correspondantes"""
+        needle = search_key(q.strip())
+        if not needle:
+            raise ValueError("Paramètre 'q' vide")
+        if limit < 1:
+            raise ValueError("limit >= 1 attendu")
+        index = self.search_index
+        indptr, postings = index["postings_indptr"], index["postings"]
+        people = [postings[indptr[t]] for t in search_index_lookup(index, needle, limit, kind=0)]
+        charges = search_index_lookup(index, needle, kind=1)
+        ranked = sorted(charges, key=lambda t: indptr[t + 1] - indptr[t], reverse=True)[:limit]
+        return {"q": q, "people": [self._summary(i) for i in people],
+                "charges": [{"charge": index["display"][t], "count": indptr[t + 1] - indptr[t],
+                             "ids": postings[indptr[t]:indptr[t + 1]][:limit]} for t in ranked]}
+
+    def _encode(self, method, params):
+        return json.dumps(getattr(self, method)(**dict(params)), ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _params(query, spec, required):
+        """Paramètres typés de la requête ; ValueError au message lisible si l'un manque ou est invalide"""
+        missing = [key for key in required if key not in query]
+        if missing:
+            raise ValueError(f"Paramètre manquant : {', '.join(missing)}")
+        params = []
+        for key, values in query.items():
+            if key not in spec:
+                continue
+            try:
+                params.append((key, spec[key](values[-1])))
+            except ValueError:
+                raise ValueError(f"Paramètre invalide : {key}={values[-1]!r} ({spec[key].__name__} attendu)") from None
+        return tuple(sorted(params))
+
+    def respond(self, target):
+        """(statut HTTP, corps JSON) d'une requête GET sur /api/..."""
+        url = urllib.parse.urlsplit(target)
+        if url.path not in self.ROUTES:
+            return 404, _json_error(f"Route inconnue : {url.path}")
+        method, spec, required = self.ROUTES[url.path]
+        query = urllib.parse.parse_qs(url.query)
+        try:
+            params = self._params(query, spec, required)
+            return 200, self._cached(method, params)
+        except (ValueError, TypeError) as e:
+            return 400, _json_error(str(e))
+        except LookupError as e:
+            return 404, _json_error(str(e))
+
+def _json_error(message):
+    return json.dumps({"error": message}, ensure_ascii=False).encode('utf-8')
+
+async def _serve_connection(service, page, reader, writer):
+    """Une requête HTTP/1.1 par connexion : page du dashboard, fichiers statiques ou /api/..."""
+    try:
+        request = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        started = time.perf_counter()
+        parts = request.decode('latin-1').split()
+        content_type = "application/json; charset=utf-8"
+        if len(parts) != 3 or parts[0] != "GET":
+            status, body = 405, _json_error("Seules les requêtes GET sont acceptées")
+        else:
+            path = urllib.parse.urlsplit(parts[1]).path
+            if path in ("/", "/prison_dashboard.html"):
+                status, body, content_type = 200, page, "text/html; charset=utf-8"
+            elif path in SERVE_STATIC and os.path.exists(SERVE_STATIC[path][0]):
+                file_name, content_type = SERVE_STATIC[path]
+                with open(file_name, 'rb') as f:
+                    status, body = 200, f.read()
+            else:
+                # Calcul hors de la boucle : les autres connexions restent servies
+                status, body = await asyncio.to_thread(service.respond, parts[1])
+            print(f"GET {parts[1]} -> {status} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+        writer.write((f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      f"Access-Control-Allow-Origin: *\r\n"
+                      f"Connection: close\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+def serve_network(csv_path=DATA_FILE, host=SERVE_HOST, port=SERVE_PORT, cache_size=SERVE_CACHE_SIZE,
+                  edge_backend=EDGE_BACKEND, edge_options=None,
+                  centrality_mode=CENTRALITY_MODE, centrality_options=None, cache_dir=CACHE_DIR,
+                  chunk_rows=STREAM_CHUNK_ROWS, layout_mode=LAYOUT_MODE, layout_options=None,
+                  sparsify_mode=SPARSIFY_MODE, sparsify_options=None, min_component_size=MIN_COMPONENT_SIZE):
+    """Mode serve : étapes 1 à 7 une seule fois, puis serveur HTTP asyncio sur le graphe en mémoire
+
+    Le dashboard servi sur / charge des réseaux personnels à la demande (/api/ego)
+    au lieu du graphe complet.
+    """
+    state = build_network_state(csv_path, MIN_DURATION_FILTER, edge_backend, edge_options,
+                                cache_dir=cache_dir, chunk_rows=chunk_rows)
+    graph, network_data = build_network_data(state, centrality_mode, centrality_options,
+                                             layout_mode, layout_options, community_min_nodes=None,
+                                             sparsify_mode=sparsify_mode, sparsify_options=sparsify_options,
+                                             min_component_size=min_component_size)
+    service = NetworkService(graph, network_data, cache_size=cache_size)
+    page = render_dashboard("loadEgoNetwork(new URLSearchParams(location.search)).then(initDashboard).catch(err => {\n"
+                            "            document.getElementById('loading-text').innerText = 'ERREUR : ' + err.message;\n"
+                            "        });").encode('utf-8')
+
+    async def main():
+        server = await asyncio.start_server(functools.partial(_serve_connection, service, page), host, port)
+        print(f"PrisonLink en écoute sur http://{host}:{port}/ (Ctrl+C pour arrêter)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Serveur arrêté.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PrisonLink - génération du réseau de co-incarcération")
+    parser.add_argument("--csv", default=DATA_FILE, help="Export CSV des réservations")
+    parser.add_argument("--edge-backend", default=EDGE_BACKEND, choices=EDGE_MODES,
+                        help="Moteur de calcul des chevauchements")
+    parser.add_argument("--block-size", type=int, default=OVERLAP_BLOCK_SIZE,
+                        help="Taille des tuiles du moteur 'numpy' (borne la mémoire)")
+    parser.add_argument("--bucket-hours", type=float, default=SPARSE_BUCKET_HOURS,
+                        help="Granularité des cases de temps du moteur 'sparse' (heures)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="N'intègre que les lignes ajoutées depuis la dernière exécution")
+    parser.add_argument("--state-file", default=STATE_FILE, help="État conservé par --incremental")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Cache colonnaire des séjours consolidés")
+    parser.add_argument("--no-cache", action="store_true", help="Relit et reconsolide toujours le CSV")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_ROWS,
+                        help="Lit l'export par blocs de N lignes (exports plus grands que la mémoire)")
+    parser.add_argument("--output-mode", default=OUTPUT_MODE, choices=["inline", "asset"],
+                        help="inline : données dans le HTML ; asset : fichier binaire compact chargé à la demande")
+    parser.add_argument("--precompress", nargs="*", default=[], choices=["gzip", "br"],
+                        help="Copies précompressées de l'asset (.gz, .br) pour le serveur web")
+    parser.add_argument("--centrality", default=CENTRALITY_MODE, choices=sorted(CENTRALITY_MODES),
+                        help="Calcul de l'influence : intermédiarité exacte, parallèle, échantillonnée (k pivots) ou "
+                             "adaptative (erreur bornée), ou pagerank / eigenvector (quasi linéaires)")
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS,
+                        help="Processus des modes 'parallel' (moteur d'arêtes et centralité)")
+    parser.add_argument("--centrality-samples", type=int, default=CENTRALITY_SAMPLES,
+                        help="Nombre de pivots du mode 'sampled'")
+    parser.add_argument("--centrality-seed", type=int, default=CENTRALITY_SEED, help="Graine des modes estimés")
+    parser.add_argument("--centrality-epsilon", type=float, default=CENTRALITY_EPSILON,
+                        help="Erreur absolue maximale du mode 'adaptive'")
+    parser.add_argument("--layout", default=LAYOUT_MODE, choices=["server", "browser"],
+                        help="server : positions ForceAtlas2 calculées ici ; browser : stabilisation au chargement")
+    parser.add_argument("--layout-iterations", type=int, default=LAYOUT_ITERATIONS,
+                        help="Itérations maximales de la disposition 'server'")
+    parser.add_argument("--layout-seed", type=int, default=LAYOUT_SEED, help="Graine du placement initial")
+    parser.add_argument("--layout-file", default=LAYOUT_FILE,
+                        help="Positions reprises d'une exécution à l'autre ('' : départ à froid, rien n'est conservé)")
+    parser.add_argument("--community-min-nodes", type=int, default=COMMUNITY_MIN_NODES,
+                        help="Vue communautés (Louvain, niveaux de détail) à partir de N personnes")
+    parser.add_argument("--no-communities", action="store_true", help="Affiche toujours chaque personne")
+    parser.add_argument("--community-resolution", type=float, default=COMMUNITY_RESOLUTION,
+                        help="Résolution de Louvain (> 1 : communautés plus petites)")
+    parser.add_argument("--sparsify", default=SPARSIFY_MODE or "none", choices=["none", *SPARSIFY_MODES],
+                        help="Squelette du graphe avant la centralité : disparité, k plus longues par personne ou budget global")
+    parser.add_argument("--sparsify-alpha", type=float, default=SPARSIFY_ALPHA,
+                        help="Seuil de significativité du mode 'disparity'")
+    parser.add_argument("--sparsify-k", type=int, default=SPARSIFY_TOP_K, help="Relations par personne du mode 'topk'")
+    parser.add_argument("--sparsify-budget", type=int, default=SPARSIFY_BUDGET, help="Relations au total du mode 'budget'")
+    parser.add_argument("--min-component-size", type=int, default=MIN_COMPONENT_SIZE,
+                        help="Écarte les personnes des composantes de moins de N personnes avant la centralité")
+    parser.add_argument("--temporal", default=TEMPORAL_PERIOD or "none", choices=["none", "week", "month"],
+                        help="Instantanés par semaine ou par mois : fenêtre de temps dans le dashboard")
+    parser.add_argument("--report-file", default=REPORT_FILE,
+                        help="Mesures par étape en JSON : temps, CPU, mémoire, volumes ('' : non écrites)")
+    parser.add_argument("--profile", metavar="DOSSIER",
+                        help="Profil cProfile (.prof) et allocations tracemalloc de chaque étape (plus lent)")
+    parser.add_argument("--verify-edges", action="store_true",
+                        help="Compare les moteurs au calcul de référence O(n²) puis quitte")
+
+    commands = parser.add_subparsers(dest="command")
+    query = commands.add_parser("query", help="Interroge l'index d'occupation sans regénérer le dashboard")
+    query.add_argument("person", nargs="?", help="Nom complet : liste ses codétenus")
+    query.add_argument("--facility", help="Établissement : liste les séjours présents sur la période")
+    query.add_argument("--start", help="Début de la période (ex: '2024-12-01')")
+    query.add_argument("--end", help="Fin de la période")
+    query.add_argument("--min-hours", type=float, default=MIN_DURATION_FILTER,
+                       help="Chevauchement minimum par séjour pour compter un codétenu")
+    serve = commands.add_parser("serve", help="Garde le graphe en mémoire et répond aux requêtes JSON (HTTP)")
+    serve.add_argument("--host", default=SERVE_HOST, help="Adresse d'écoute")
+    serve.add_argument("--port", type=int, default=SERVE_PORT, help="Port HTTP")
+    serve.add_argument("--cache-size", type=int, default=SERVE_CACHE_SIZE,
+                       help="Réponses conservées en mémoire (LRU)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    generate_dashboard()
+    args = parse_args()
+    if args.command == "query":
+        query_occupancy(args.csv, person=args.person, facility=args.facility, start=args.start, end=args.end,
+                        min_hours=args.min_hours, cache_dir=None if args.no_cache else args.cache_dir)
+        raise SystemExit(0)
+    if args.verify_edges:
+        # Mêmes séjours que le dashboard : variantes de nom déjà rattachées à leur personne
+        stays, _ = load_stays(args.csv, cache_dir=None if args.no_cache else args.cache_dir, chunk_rows=args.chunk_size)
+        raise SystemExit(0 if verify_edge_backends(stays, MIN_DURATION_FILTER) else 1)
+    edge_options = {
+        "numpy": {"block_size": args.block_size},
+        "sparse": {"bucket_hours": args.bucket_hours},
+        "parallel": {"workers": args.workers},
+    }.get(args.edge_backend, {})
+    centrality_options = {
+        "exact": {},
+        "parallel": {"workers": args.workers},
+        "sampled": {"k": args.centrality_samples, "seed": args.centrality_seed},
+        "adaptive": {"epsilon": args.centrality_epsilon, "seed": args.centrality_seed},
+    }.get(args.centrality, {})
+    layout_options = {"iterations": args.layout_iterations, "seed": args.layout_seed,
+                      "layout_file": args.layout_file or None}
+    sparsify_options = {
+        "disparity": {"alpha": args.sparsify_alpha},
+        "topk": {"k": args.sparsify_k},
+        "budget": {"budget": args.sparsify_budget},
+    }.get(args.sparsify, {})
+    sparsify_mode = None if args.sparsify == "none" else args.sparsify
+    if args.command == "serve":
+        serve_network(args.csv, host=args.host, port=args.port, cache_size=args.cache_size,
+                      edge_backend=args.edge_backend, edge_options=edge_options,
+                      centrality_mode=args.centrality, centrality_options=centrality_options,
+                      cache_dir=None if args.no_cache else args.cache_dir, chunk_rows=args.chunk_size,
+                      layout_mode=args.layout, layout_options=layout_options,
+                      sparsify_mode=sparsify_mode, sparsify_options=sparsify_options,
+                      min_component_size=args.min_component_size)
+        raise SystemExit(0)
+    report = generate_dashboard(csv_path=args.csv, edge_backend=args.edge_backend, edge_options=edge_options,
+                                incremental=args.incremental, state_file=args.state_file,
+                                centrality_mode=args.centrality, centrality_options=centrality_options,
+                                cache_dir=None if args.no_cache else args.cache_dir, chunk_rows=args.chunk_size,
+                                output_mode=args.output_mode, precompress=args.precompress,
+                                layout_mode=args.layout, layout_options=layout_options,
+                                community_min_nodes=None if args.no_communities else args.community_min_nodes,
+                                community_options={"resolution": args.community_resolution},
+                                sparsify_mode=sparsify_mode, sparsify_options=sparsify_options,
+                                temporal_period=None if args.temporal == "none" else args.temporal,
+                                min_component_size=args.min_component_size,
+                                report_file=args.report_file, profile_dir=args.profile)
+    raise SystemExit(1 if report.failed else 0)
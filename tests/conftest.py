@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import criminal  # noqa: E402
+
+ORIGIN = pd.Timestamp("2024-12-01")
+
+def stays_frame(records):
+    """Séjours consolidés à partir de (personne, établissement, entrée, sortie) en heures depuis ORIGIN"""
+    return pd.DataFrame({
+        'Book of Arrest Number': [f"B{i}" for i in range(len(records))],
+        'Full Name': [r[0] for r in records],
+        'Current Facility': [r[1] for r in records],
+        'Booking Date Time': [ORIGIN + pd.Timedelta(hours=r[2]) for r in records],
+        'Release Date Time': [ORIGIN + pd.Timedelta(hours=r[3]) for r in records],
+    })
+
+def booking_rows(records):
+    """Lignes d'export (séparateur ';', DATE_FORMAT) : (écrou, nom, prénom, milieu, suffixe, établissement, entrée, sortie, charge)"""
+    return pd.DataFrame({
+        'Book of Arrest Number': [r[0] for r in records],
+        'Last Name': [r[1] for r in records],
+        'First Name': [r[2] for r in records],
+        'Middle Name': [r[3] for r in records],
+        'JrSr': [r[4] for r in records],
+        'Booking Date Time': [(ORIGIN + pd.Timedelta(hours=r[6])).strftime(criminal.DATE_FORMAT) for r in records],
+        'Release Date Time': [(ORIGIN + pd.Timedelta(hours=r[7])).strftime(criminal.DATE_FORMAT) for r in records],
+        'Current Facility': [r[5] for r in records],
+        'Charge': [r[8] for r in records],
+    })
+
+def _letters(code, width=3):
+    return "".join(chr(ord("A") + (code // 26 ** i) % 26) for i in range(width))
+
+def random_bookings(bookings, seed, persons=None, facilities=4, span_hours=2000):
+    """Réservations aléatoires au format de booking_rows, une ligne (et un écrou) par charge
+
+    Noms distincts par personne ; la sortie d'une réservation est coupée à l'entrée
+    suivante de la même personne, comme dans l'export réel.
+    """
+    rng = np.random.default_rng(seed)
+    persons = persons or max(1, bookings // 3)
+    person = rng.integers(0, persons, size=bookings)
+    facility = rng.integers(0, facilities, size=bookings)
+    starts = rng.integers(0, span_hours, size=bookings)
+    ends = starts + np.minimum(rng.lognormal(np.log(150), 1.0, size=bookings).astype(int), span_hours)
+    order = np.lexsort((starts, person))
+    follows = person[order][1:] == person[order][:-1]
+    ends[order[:-1][follows]] = np.minimum(ends[order[:-1][follows]], starts[order[1:][follows]])
+
+    records = []
+    for b in range(bookings):
+        p = int(person[b])
+        middle = _letters(p + 5000) if p % 2 else ""
+        suffix = "JR" if p % 17 == 0 else ""
+        for c in range(1 + int(rng.integers(0, 3))):
+            records.append((f"2024-{len(records):06d}", _letters(p), _letters(p + 9000), middle, suffix,
+                            f"Facility {facility[b]}", int(starts[b]), int(ends[b]), f"Charge {rng.integers(0, 12)}"))
+    return records
+
+@pytest.fixture
+def write_bookings(tmp_path):
+    """Écrit un export au format de DATA_FILE et renvoie son chemin"""
+    def write(records, name="bookings.csv"):
+        path = tmp_path / name
+        booking_rows(records).to_csv(path, sep=';', index=False, encoding='utf-8')
+        return str(path)
+    return write
@@ -0,0 +1,114 @@
+import gzip
+import json
+import struct
+
+import numpy as np
+import pytest
+
+import criminal
+from conftest import booking_rows, random_bookings
+
+@pytest.fixture(scope="module")
+def network_data(tmp_path_factory):
+    path = tmp_path_factory.mktemp("asset") / "bookings.csv"
+    booking_rows(random_bookings(400, seed=13, persons=120)).to_csv(path, sep=';', index=False, encoding='utf-8')
+    state = criminal.build_network_state(str(path), criminal.MIN_DURATION_FILTER, cache_dir=None)
+    _, data = criminal.build_network_data(state, layout_options={"iterations": 20, "layout_file": None},
+                                          community_min_nodes=None, temporal_period="month")
+    return data
+
+def decode(payload):
+    """Lecture de l'asset PLK1 dans le même ordre que decodeNetworkAsset (dashboard)"""
+    assert payload[:4] == criminal.ASSET_MAGIC
+    (length,) = struct.unpack('<I', payload[4:8])
+    header = json.loads(payload[8:8 + length].decode('utf-8'))
+    offset = -(-(8 + length) // 4) * 4
+
+    def column(dtype, count):
+        nonlocal offset
+        values = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+        offset += 4 * count
+        return values
+
+    count = header["edge_count"]
+    columns = {name: column(dtype, count) for name, dtype in
+               (("from", '<u4'), ("to", '<u4'), ("raw_days", '<f4'), ("width", '<f4'))}
+    columns["adjacency_indptr"] = column('<u4', len(header["nodes"]["label"]) + 1)
+    columns["adjacency"] = column('<u4', 2 * count)
+    postings, trigram_terms = header["search_counts"]
+    columns["postings_indptr"] = column('<u4', len(header["search"]["terms"]) + 1)
+    columns["postings"] = column('<u4', postings)
+    columns["trigram_indptr"] = column('<u4', len(header["search"]["trigrams"]) + 1)
+    columns["trigram_terms"] = column('<u4', trigram_terms)
+    if "temporal" in header:
+        entries, snapshots = header["temporal"]["counts"]
+        periods = len(header["temporal"]["labels"])
+        for name, dtype, size in (("period_indptr", '<u4', periods + 1), ("period_edges", '<u4', entries),
+                                  ("period_hours", '<f4', entries), ("snapshot_indptr", '<u4', periods + 1),
+                                  ("snapshot_nodes", '<u4', snapshots), ("snapshot_degree", '<u4', snapshots),
+                                  ("snapshot_influence", '<f4', snapshots)):
+            columns[name] = column(dtype, size)
+    assert offset == len(payload)
+    return header, columns
+
+def test_asset_round_trip(network_data, tmp_path):
+    path = str(tmp_path / "network.bin")
+    assert criminal.write_network_asset(path, network_data) == [path]
+    with open(path, 'rb') as f:
+        header, columns = decode(f.read())
+
+    nodes, edges = network_data["nodes"], network_data["edges"]
+    cols = header["nodes"]
+    assert cols["label"] == [node["label"] for node in nodes]
+    assert [header["facilities"][g] for g in cols["group"]] == [node["group"] for node in nodes]
+    for key in ("value", "influence", "pagerank", "eigenvector", "strength", "component", "component_size",
+                "core", "x", "y"):
+        assert cols[key] == [node[key] for node in nodes], key
+    assert [[header["facilities"][f] for f in fs] for fs in cols["facilities"]] == [node["facilities"] for node in nodes]
+    assert [[header["charges"][c] for c in cs] for cs in cols["charges"]] == [node["charges"] for node in nodes]
+    for key in ("centrality", "layout", "components"):
+        assert header[key] == json.loads(json.dumps(network_data[key]))
+
+    ids = {node["id"]: i for i, node in enumerate(nodes)}
+    assert columns["from"].tolist() == [ids[e["from"]] for e in edges]
+    assert columns["to"].tolist() == [ids[e["to"]] for e in edges]
+    np.testing.assert_allclose(columns["raw_days"], [e["raw_days"] for e in edges], rtol=1e-6)
+    np.testing.assert_allclose(columns["width"], [e["width"] for e in edges], rtol=1e-6)
+
+    index, search, temporal = network_data["index"], network_data["search"], network_data["temporal"]
+    assert header["facility_nodes"] == index["facility_nodes"]
+    for key in ("adjacency_indptr", "adjacency"):
+        assert columns[key].tolist() == index[key]
+    for key in ("terms", "display", "kinds", "trigrams"):
+        assert header["search"][key] == search[key]
+    for key in ("postings_indptr", "postings", "trigram_indptr", "trigram_terms"):
+        assert columns[key].tolist() == search[key]
+    assert header["temporal"]["labels"] == temporal["labels"]
+    for key in ("period_indptr", "period_edges", "snapshot_indptr", "snapshot_nodes", "snapshot_degree"):
+        assert columns[key].tolist() == temporal[key]
+    np.testing.assert_allclose(columns["period_hours"], temporal["period_hours"], rtol=1e-6)
+    np.testing.assert_allclose(columns["snapshot_influence"], temporal["snapshot_influence"], rtol=1e-6, atol=1e-12)
+
+def test_precompressed_copies_hold_the_same_bytes(network_data, tmp_path):
+    path = str(tmp_path / "network.bin")
+    assert criminal.write_network_asset(path, network_data, precompress=("gzip",)) == [path, path + ".gz"]
+    with open(path, 'rb') as f:
+        payload = f.read()
+    with open(path + ".gz", 'rb') as f:
+        assert gzip.decompress(f.read()) == payload
+
+def test_brotli_copy_holds_the_same_bytes(network_data, tmp_path):
+    brotli = pytest.importorskip("brotli")
+    path = str(tmp_path / "network.bin")
+    assert criminal.write_network_asset(path, network_data, precompress=("br",)) == [path, path + ".br"]
+    with open(path, 'rb') as f, open(path + ".br", 'rb') as compressed:
+        assert brotli.decompress(compressed.read()) == f.read()
+
+def test_asset_page_links_the_static_files():
+    inline = criminal.render_dashboard("initDashboard(data);")
+    assert criminal.DASHBOARD_SCRIPT in inline and criminal.DASHBOARD_STYLE in inline
+    page = criminal.render_dashboard("initDashboard(data);", static=True)
+    assert criminal.DASHBOARD_SCRIPT not in page and criminal.DASHBOARD_STYLE not in page
+    assert f'<script src="{criminal.DASHBOARD_SCRIPT_FILE}"></script>' in page
+    assert f'href="{criminal.DASHBOARD_STYLE_FILE}"' in page
+    assert page.index(criminal.DASHBOARD_SCRIPT_FILE) < page.index("initDashboard(data);")
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import criminal
+from conftest import booking_rows, random_bookings
+
+pytest.importorskip("networkx")
+
+@pytest.fixture(scope="module")
+def graph(tmp_path_factory):
+    path = tmp_path_factory.mktemp("communities") / "bookings.csv"
+    booking_rows(random_bookings(900, seed=14, persons=300, facilities=6)).to_csv(
+        path, sep=';', index=False, encoding='utf-8')
+    state = criminal.build_network_state(str(path), criminal.MIN_DURATION_FILTER, cache_dir=None)
+    return criminal.PersonGraph.from_edges_ns(state['edges_ns'])
+
+@pytest.mark.parametrize("max_size", [10, 25, criminal.COMMUNITY_MAX_SIZE])
+def test_levels_partition_every_node_once(graph, max_size):
+    levels = criminal.detect_communities(graph, max_size=max_size)
+    assert len(levels) >= 2
+    for membership in levels:
+        # Un numéro par identifiant, numéros consécutifs, communautés par taille décroissante
+        assert membership.shape == (len(graph),)
+        sizes = np.bincount(membership)
+        assert sizes.min() > 0 and sizes.sum() == len(graph)
+        assert (np.diff(sizes) <= 0).all()
+    for finer, coarser in zip(levels, levels[1:]):
+        # Chaque communauté est entièrement contenue dans une communauté du niveau supérieur
+        parents = {}
+        for child, parent in zip(finer.tolist(), coarser.tolist()):
+            assert parents.setdefault(child, parent) == parent
+        assert len(parents) >= coarser.max() + 1
+
+@pytest.mark.parametrize("max_size", [10, 25, criminal.COMMUNITY_MAX_SIZE])
+def test_finest_communities_respect_max_size(graph, max_size):
+    finest = criminal.detect_communities(graph, max_size=max_size)[0]
+    assert np.bincount(finest).max() <= max_size
+    assert np.bincount(criminal.detect_communities(graph, max_size=len(graph))[0]).max() > max_size
+
+def test_indivisible_communities_are_cut_into_blocks():
+    # Une clique : Louvain n'y trouve qu'une communauté
+    src, dst = (np.array(column, dtype=np.int32) for column in zip(*[(a, b) for a in range(15) for b in range(a + 1, 15)]))
+    clique = criminal.PersonGraph.from_edges([f"P{i:02d}" for i in range(15)], src, dst, np.ones(len(src)))
+    levels = criminal.detect_communities(clique, max_size=4)
+    assert np.bincount(levels[0]).tolist() == [4, 4, 4, 3]
+    assert (levels[-1] == 0).all()
+
+def test_same_seed_gives_the_same_hierarchy(graph):
+    first = criminal.detect_communities(graph, seed=3, max_size=20)
+    second = criminal.detect_communities(graph, seed=3, max_size=20)
+    assert len(first) == len(second)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+def test_hierarchy_sizes_and_parents(graph):
+    levels = criminal.detect_communities(graph, max_size=20)
+    node_data = [{"label": name, "group": "F1", "influence": 0.0, "value": int(degree)}
+                 for name, degree in zip(graph.names, graph.degree().tolist())]
+    hierarchy = criminal.build_community_hierarchy(graph, levels, node_data)["levels"]
+    assert [node["community"] for node in node_data] == levels[0].tolist()
+    for k, (level, membership) in enumerate(zip(hierarchy, levels)):
+        assert level["size"] == np.bincount(membership).tolist()
+        if k + 1 < len(levels):
+            assert [level["parent"][cid] for cid in membership.tolist()] == levels[k + 1].tolist()
+        else:
+            assert set(level["parent"]) == {-1}
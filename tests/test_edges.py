@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import criminal
+from conftest import stays_frame
+
+def edges(stays, min_hours, backend, **options):
+    if backend == "parallel" and not options:
+        # Fenêtres minuscules : le moteur parallèle découpe aussi les petits établissements
+        options = {"workers": 1, "window_stays": 2}
+    return criminal.compute_edges(stays, min_hours, backend=backend, **options)
+
+@pytest.fixture(params=criminal.EDGE_MODES)
+def backend(request):
+    return request.param
+
+def test_same_person_never_paired_with_itself(backend):
+    stays = stays_frame([("A", "F", 0, 100), ("A", "F", 50, 150), ("B", "F", 0, 200)])
+    assert edges(stays, 24, backend) == {("A", "B"): 200.0}
+
+def test_overlap_exactly_at_threshold_is_kept(backend):
+    stays = stays_frame([("A", "F", 0, 24), ("B", "F", 0, 24), ("C", "F", 1, 48)])
+    assert edges(stays, 24, backend) == {("A", "B"): 24.0}
+
+@pytest.mark.parametrize("min_hours", [0, 24])
+def test_zero_length_and_touching_stays_do_not_overlap(backend, min_hours):
+    stays = stays_frame([("A", "F", 0, 48), ("B", "F", 48, 96), ("Z", "F", 10, 10), ("Y", "F", 48, 48)])
+    assert edges(stays, min_hours, backend) == {}
+
+def test_overlaps_are_summed_across_facilities(backend):
+    stays = stays_frame([("A", "F", 0, 30), ("B", "F", 0, 30), ("A", "G", 100, 140), ("B", "G", 90, 200),
+                         ("C", "G", 0, 1000)])
+    assert edges(stays, 24, backend) == {("A", "B"): 70.0, ("A", "C"): 40.0, ("B", "C"): 110.0}
+
+def random_stays(seed, count=400, persons=60, facilities=3):
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, 2000, size=count)
+    # Durées entières autour du seuil, y compris nulles
+    lengths = np.where(rng.random(count) < 0.1, 0, rng.integers(1, 200, size=count))
+    return stays_frame([(f"P{p}", f"F{f}", int(s), int(s + d)) for p, f, s, d in zip(
+        rng.integers(0, persons, size=count), rng.integers(0, facilities, size=count), starts, lengths)])
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("min_hours", [0, 24, 72])
+def test_backends_match_pairwise_loop(backend, seed, min_hours):
+    stays = random_stays(seed)
+    assert edges(stays, min_hours, backend) == edges(stays, min_hours, "loop")
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 64])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("min_hours", [0, 24, 72])
+def test_numpy_tiles_match_pairwise_loop(block_size, seed, min_hours):
+    # Tuiles plus petites que chaque établissement : bords de tuiles et fenêtres à cheval
+    stays = random_stays(seed)
+    assert edges(stays, min_hours, "numpy", block_size=block_size) == edges(stays, min_hours, "loop")
+
+def test_parallel_pool_matches_loop():
+    stays = random_stays(4)
+    assert edges(stays, 24, "parallel", workers=2, window_stays=50) == edges(stays, 24, "loop")
+
+def test_verify_edge_backends_reports_agreement(capsys):
+    assert criminal.verify_edge_backends(random_stays(5), 24)
+    assert "ÉCART" not in capsys.readouterr().out
+
+def test_unsorted_input_and_datetime_dtype():
+    stays = random_stays(6).sample(frac=1, random_state=0).reset_index(drop=True)
+    stays['Booking Date Time'] = pd.to_datetime(stays['Booking Date Time']).astype('datetime64[us]')
+    assert edges(stays, 24, "sweep") == edges(stays, 24, "loop")
@@ -0,0 +1,180 @@
+import numpy as np
+import pytest
+
+import criminal
+from conftest import random_bookings
+
+nx = pytest.importorskip("networkx")
+
+def random_graph(seed, n=60, m=120, max_weight=4):
+    """PersonGraph et son équivalent networkx ; poids entiers pour multiplier les plus courts chemins ex aequo"""
+    G = nx.gnm_random_graph(n, m, seed=seed)
+    rng = np.random.default_rng(seed)
+    src, dst = (np.array(column, dtype=np.int32) for column in zip(*G.edges()))
+    weights = rng.integers(1, max_weight + 1, size=len(src)).astype(float)
+    for a, b, w in zip(src.tolist(), dst.tolist(), weights.tolist()):
+        G[a][b]['weight'] = w
+    graph = criminal.PersonGraph.from_edges([f"P{i:03d}" for i in range(n)], src, dst, weights)
+    return graph, G
+
+def test_graph_from_named_pairs():
+    hour = criminal.HOUR_NS
+    graph = criminal.PersonGraph.from_edges_ns({("B", "C"): 30 * hour, ("A", "B"): 24 * hour})
+    assert graph.names == ["A", "B", "C"]
+    assert graph.degree().tolist() == [1, 2, 1]
+    assert graph.number_of_edges() == 2
+    assert sorted(zip(*(column.tolist() for column in graph.edges()))) == [(0, 1, 24.0), (1, 2, 30.0)]
+    assert graph.to_networkx()[1][2]['weight'] == 30.0
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_components_match_networkx(seed):
+    graph, G = random_graph(seed, n=200, m=150)
+    labels = graph.components()
+    partition = {frozenset(np.flatnonzero(labels == label).tolist()) for label in np.unique(labels)}
+    assert partition == {frozenset(c) for c in nx.connected_components(G)}
+    sizes = np.bincount(labels)
+    assert (np.diff(sizes) <= 0).all()
+
+def test_union_find_accumulates_batches():
+    graph, G = random_graph(7, n=200, m=150)
+    src, dst, _ = graph.edges()
+    forest = criminal.UnionFind(len(graph))
+    for lo in range(0, len(src), 17):
+        forest.add(src[lo:lo + 17], dst[lo:lo + 17])
+    assert (forest.labels() == graph.components()).all()
+
+def test_union_find_labels_a_subset_of_nodes():
+    forest = criminal.UnionFind(8)
+    forest.add([0, 2, 5], [1, 3, 6])
+    forest.add([3], [4])
+    assert forest.labels().tolist() == [1, 1, 0, 0, 0, 2, 2, 3]
+    # Tailles et numéros ne comptent que les nœuds demandés
+    assert forest.labels([6, 1, 2, 5, 0]).tolist() == [0, 1, 2, 0, 1]
+    forest.grow(10)
+    forest.add([9], [7])
+    assert forest.labels([7, 8, 9]).tolist() == [0, 1, 0]
+
+def test_components_and_cores_ignore_the_backbone(tmp_path, write_bookings):
+    path = write_bookings(random_bookings(600, seed=9, persons=300, facilities=12))
+    state = criminal.build_network_state(path, criminal.MIN_DURATION_FILTER, cache_dir=None)
+    options = dict(layout_mode="browser", community_min_nodes=None)
+    full, full_data = criminal.build_network_data(state, **options)
+    sparse, data = criminal.build_network_data(state, sparsify_mode="budget", sparsify_options={"budget": 20}, **options)
+    assert sparse.number_of_edges() == 20 < full.number_of_edges()
+    expected = full.components()
+    assert [node["component"] for node in data["nodes"]] == expected.tolist()
+    assert [node["core"] for node in data["nodes"]] == criminal.core_numbers(full).tolist()
+    assert data["components"] == full_data["components"]
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_core_numbers_match_networkx(seed):
+    graph, G = random_graph(seed, n=100, m=400)
+    expected = nx.core_number(G)
+    assert criminal.core_numbers(graph).tolist() == [expected[i] for i in range(len(graph))]
+
+def test_core_numbers_of_empty_graph():
+    graph = criminal.PersonGraph.from_edges([], np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0))
+    assert criminal.core_numbers(graph).tolist() == []
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_exact_betweenness_matches_networkx(seed):
+    graph, G = random_graph(seed)
+    scores, info = criminal.compute_centrality(graph, "exact")
+    expected = nx.betweenness_centrality(G, weight='weight')
+    np.testing.assert_allclose(scores, [expected[i] for i in range(len(graph))], atol=1e-12)
+    assert not info["estimated"]
+
+def test_sampled_betweenness_with_every_pivot_is_exact():
+    graph, _ = random_graph(5)
+    exact, _ = criminal.compute_centrality(graph, "exact")
+    sampled, info = criminal.compute_centrality(graph, "sampled", k=len(graph))
+    np.testing.assert_allclose(sampled, exact, atol=1e-12)
+    assert not info["estimated"]
+
+def test_sampled_betweenness_is_reproducible():
+    graph, _ = random_graph(6, n=200, m=600)
+    first, info = criminal.compute_centrality(graph, "sampled", k=50, seed=3)
+    second, _ = criminal.compute_centrality(graph, "sampled", k=50, seed=3)
+    np.testing.assert_array_equal(first, second)
+    assert info["estimated"] and info["samples"] == 50
+
+def test_adaptive_betweenness_stays_within_epsilon():
+    graph, _ = random_graph(7, n=600, m=1800)
+    exact, _ = criminal.compute_centrality(graph, "exact")
+    adaptive, info = criminal.compute_centrality(graph, "adaptive", epsilon=0.3, delta=0.1, seed=1)
+    assert info["estimated"] and info["samples"] < len(graph)
+    assert np.abs(adaptive - exact).max() <= 0.3
+
+def test_adaptive_betweenness_goes_exact_when_the_bound_exceeds_n(monkeypatch):
+    graph, _ = random_graph(9)
+    exact, _ = criminal.compute_centrality(graph, "exact")
+
+    def no_sampling(*args):
+        raise AssertionError("aucun chemin ne doit être échantillonné")
+    monkeypatch.setattr(criminal, "_sample_shortest_path", no_sampling)
+    adaptive, info = criminal.compute_centrality(graph, "adaptive", epsilon=0.01)
+    np.testing.assert_allclose(adaptive, exact, atol=1e-12)
+    assert not info["estimated"] and info["max_samples"] >= len(graph)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_betweenness_matches_exact(workers):
+    graph, _ = random_graph(4, n=80, m=200)
+    exact, _ = criminal.compute_centrality(graph, "exact")
+    parallel, info = criminal.compute_centrality(graph, "parallel", workers=workers)
+    np.testing.assert_allclose(parallel, exact, atol=1e-12)
+    assert not info["estimated"]
+
+def test_pagerank_matches_networkx():
+    graph, G = random_graph(6)
+    scores, _ = criminal.compute_centrality(graph, "pagerank")
+    expected = nx.pagerank(G, weight='weight', tol=1e-12)
+    np.testing.assert_allclose(scores, [expected[i] for i in range(len(graph))], atol=1e-8)
+
+def test_eigenvector_and_strength_match_networkx():
+    graph, G = random_graph(8, n=40, m=200)
+    metrics, info = criminal.compute_influence_metrics(graph)
+    assert info["eigenvector"]["converged"]
+    expected = nx.eigenvector_centrality(G, weight='weight', tol=1e-12, max_iter=1000)
+    np.testing.assert_allclose(metrics["eigenvector"], [expected[i] for i in range(len(graph))], atol=1e-6)
+    np.testing.assert_allclose(metrics["strength"], [G.degree(i, weight='weight') / 24 for i in range(len(graph))])
+
+def graph_of(n, weighted_edges):
+    src, dst, weights = zip(*weighted_edges)
+    return criminal.PersonGraph.from_edges([f"P{i}" for i in range(n)], np.array(src, dtype=np.int32),
+                                           np.array(dst, dtype=np.int32), np.array(weights, dtype=float))
+
+def kept_edges(graph):
+    return sorted(zip(*(column.tolist() for column in graph.edges()[:2])))
+
+def test_disparity_keeps_the_significant_edge():
+    # K4 : (0, 1) concentre la force de 0 et de 1, les relations de 2 et 3 sont uniformes
+    graph = graph_of(4, [(0, 1, 100), (0, 2, 1), (0, 3, 1), (1, 2, 1), (1, 3, 1), (2, 3, 1)])
+    backbone, info = criminal.sparsify_graph(graph, "disparity", alpha=0.05)
+    assert kept_edges(backbone) == [(0, 1)]
+    assert (info["kept"], info["dropped"], info["isolated"]) == (1, 5, 2)
+    # p-valeur de 2 et 3 : (1 - 1/3)^2 = 0.44
+    backbone, _ = criminal.sparsify_graph(graph, "disparity", alpha=0.5)
+    assert backbone.number_of_edges() == 6
+
+def test_disparity_keeps_the_only_edge_of_a_leaf():
+    graph = graph_of(3, [(0, 1, 100), (0, 2, 1)])
+    backbone, info = criminal.sparsify_graph(graph, "disparity", alpha=0.05)
+    assert kept_edges(backbone) == [(0, 1), (0, 2)]
+    assert info["isolated"] == 0
+
+def test_top_k_keeps_the_union_over_both_ends():
+    graph = graph_of(5, [(0, 1, 5), (0, 2, 4), (0, 3, 3), (0, 4, 2), (1, 2, 1)])
+    backbone, info = criminal.sparsify_graph(graph, "topk", k=1)
+    # 0 ne garde que (0, 1), mais 2, 3 et 4 gardent chacun leur relation avec 0
+    assert kept_edges(backbone) == [(0, 1), (0, 2), (0, 3), (0, 4)]
+    assert (info["kept"], info["dropped"], info["isolated"]) == (4, 1, 0)
+    backbone, _ = criminal.sparsify_graph(graph, "topk", k=2)
+    assert backbone.number_of_edges() == 5
+
+def test_budget_keeps_the_heaviest_edges():
+    graph = graph_of(5, [(0, 1, 5), (0, 2, 4), (0, 3, 3), (0, 4, 2), (1, 2, 1)])
+    backbone, info = criminal.sparsify_graph(graph, "budget", budget=2)
+    assert kept_edges(backbone) == [(0, 1), (0, 2)]
+    assert backbone.edges()[2].tolist() == [5.0, 4.0]
+    assert (info["kept"], info["dropped"], info["isolated"]) == (2, 3, 2)
+    assert backbone.names == graph.names
@@ -0,0 +1,181 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import criminal
+from conftest import ORIGIN
+
+def variants(*names):
+    """{variante: composantes} à partir de (prénom, deuxième prénom, nom, suffixe) bruts, comme collect_names"""
+    found = {}
+    for first, middle, last, suffix in names:
+        full = " ".join(part for part in (first, middle, last, suffix) if part)
+        suffix = criminal.normalize_name(suffix).replace(" ", "")
+        found[full] = (criminal.normalize_name(last), criminal.normalize_name(first), criminal.normalize_name(middle),
+                       criminal.NAME_SUFFIXES.get(suffix, suffix))
+    return found
+
+def groups(mapping):
+    persons = {}
+    for name, person in mapping.items():
+        persons.setdefault(person, set()).add(name)
+    return sorted(map(sorted, persons.values()))
+
+def resolve(names, events=None):
+    return groups(criminal.IdentityResolver().resolve(names, events))
+
+def test_middle_initial_and_missing_middle_merge():
+    names = variants(("JOHN", "QUINCY", "DOE", ""), ("JOHN", "Q", "DOE", ""), ("JOHN", "", "DOE", ""))
+    assert resolve(names) == [["JOHN DOE", "JOHN Q DOE", "JOHN QUINCY DOE"]]
+
+def test_accents_and_case_are_ignored():
+    assert resolve(variants(("José", "", "Müller", ""), ("JOSE", "", "MULLER", ""))) == [["JOSE MULLER", "José Müller"]]
+
+def test_suffix_spellings_are_normalized():
+    assert resolve(variants(("JOHN", "", "DOE", "JR"), ("JOHN", "", "DOE", "Jr."))) == [["JOHN DOE JR", "JOHN DOE Jr."]]
+
+def test_conflicting_middle_names_or_suffixes_split():
+    assert resolve(variants(("JOHN", "ADAM", "DOE", ""), ("JOHN", "BRUCE", "DOE", ""))) == [["JOHN ADAM DOE"], ["JOHN BRUCE DOE"]]
+    assert resolve(variants(("JOHN", "", "DOE", "JR"), ("JOHN", "", "DOE", "SR"))) == [["JOHN DOE JR"], ["JOHN DOE SR"]]
+
+def test_ambiguous_partial_name_stays_apart():
+    names = variants(("JOHN", "ADAM", "DOE", ""), ("JOHN", "BRUCE", "DOE", ""), ("JOHN", "", "DOE", ""))
+    assert resolve(names) == [["JOHN ADAM DOE"], ["JOHN BRUCE DOE"], ["JOHN DOE"]]
+
+def test_shared_booking_merges_a_diminutive():
+    names = variants(("JON", "", "DOE", ""), ("JONATHAN", "", "DOE", ""))
+    assert resolve(names) == [["JON DOE"], ["JONATHAN DOE"]]
+    events = {"JON DOE": {("F", 1): 5}, "JONATHAN DOE": {("F", 1): 5, ("G", 9): 12}}
+    assert resolve(names, events) == [["JON DOE", "JONATHAN DOE"]]
+
+def test_different_people_stay_apart():
+    names = variants(("JOHN", "", "DOE", ""), ("JANE", "", "DOE", ""), ("JOHN", "", "SMITH", ""))
+    assert resolve(names) == [["JANE DOE"], ["JOHN DOE"], ["JOHN SMITH"]]
+
+def test_result_does_not_depend_on_row_order():
+    names = variants(("JOHN", "QUINCY", "DOE", ""), ("JOHN", "Q", "DOE", ""), ("JOHN", "", "DOE", ""),
+                     ("JOHN", "ADAM", "DOE", ""), ("JANE", "", "DOE", "JR"), ("JANE", "", "DOE", ""))
+    expected = resolve(names)
+    for order in itertools.permutations(names):
+        assert resolve({name: names[name] for name in order}) == expected
+
+def test_new_variants_keep_known_identifiers():
+    resolver = criminal.IdentityResolver()
+    first = resolver.resolve(variants(("JOHN", "QUINCY", "DOE", "")))
+    later = resolver.resolve(variants(("JOHN", "Q", "DOE", ""), ("JANE", "", "ROE", "")))
+    assert later == {"JOHN Q DOE": first["JOHN QUINCY DOE"], "JANE ROE": "JANE ROE"}
+    assert len(resolver) == 2
+
+def test_large_blocks_only_compare_same_name_or_booking():
+    resolver = criminal.IdentityResolver(block_scan=2)
+    names = variants(*[("JOHN", "", f"DOE{suffix}", "") for suffix in ("", "E", "Y", "EY")], ("JOHN", "Q", "DOE", ""))
+    assert groups(resolver.resolve(names)) == [["JOHN DOE", "JOHN Q DOE"], ["JOHN DOEE"], ["JOHN DOEEY"], ["JOHN DOEY"]]
+    assert len(resolver.blocks[("D000", "J")]) == 4
+
+def test_loaded_variants_are_merged_into_one_person(write_bookings):
+    path = write_bookings([
+        ("1", "DOE", "JOHN", "QUINCY", "", "F", 0, 48, "Vol"),
+        ("1", "DOE", "JOHN", "Q", "", "F", 0, 72, "Fraude"),
+        ("2", "DOE", "JOHN", "", "", "F", 100, 200, "Vol"),
+        ("3", "ROE", "JANE", "", "", "F", 0, 200, "Vol"),
+    ])
+    stays, charges = criminal.load_stays(path, cache_dir=None)
+    assert charges == {"JOHN QUINCY DOE": ["Vol", "Fraude"], "JANE ROE": ["Vol"]}
+    assert sorted(stays['Full Name']) == ["JANE ROE", "JOHN QUINCY DOE", "JOHN QUINCY DOE"]
+    merged = stays[stays['Book of Arrest Number'].astype(str) == "1"]
+    assert len(merged) == 1
+    assert merged['Release Date Time'].iloc[0] == ORIGIN + pd.Timedelta(hours=72)
+
+def test_incremental_variants_join_their_person(write_bookings):
+    records = [
+        ("1", "DOE", "JOHN", "QUINCY", "", "F", 0, 100, "Vol"),
+        ("2", "ROE", "JANE", "", "", "F", 0, 300, "Vol"),
+    ]
+    later = [("3", "DOE", "JOHN", "Q", "", "F", 200, 260, "Fraude")]
+    path = write_bookings(records)
+    state = criminal.build_network_state(path, criminal.MIN_DURATION_FILTER, cache_dir=None)
+    appended = write_bookings(records + later, name="appended.csv")
+    with open(appended, 'rb') as f:
+        tail = f.read()[state['offset']:]
+    with open(path, 'ab') as f:
+        f.write(tail)
+    state = criminal.update_network_state(state, path)
+
+    full = criminal.build_network_state(path, criminal.MIN_DURATION_FILTER, cache_dir=None)
+    assert state['edges_ns'] == full['edges_ns'] == {("JANE ROE", "JOHN QUINCY DOE"): 160 * criminal.HOUR_NS}
+    assert state['person_charges']["JOHN QUINCY DOE"] == ["Vol", "Fraude"]
+
+def test_simultaneous_stays_block_a_merge():
+    names = variants(("JOHN", "Q", "DOE", ""), ("JOHN", "", "DOE", ""))
+    events = {"JOHN Q DOE": {("F", 0): 100 * criminal.HOUR_NS}, "JOHN DOE": {("G", 0): 100 * criminal.HOUR_NS}}
+    assert resolve(names, events) == [["JOHN DOE"], ["JOHN Q DOE"]]
+    # Même établissement, ou transfert de moins de RESOLUTION_CONFLICT_HOURS : une seule personne
+    events["JOHN DOE"] = {("F", 50 * criminal.HOUR_NS): 200 * criminal.HOUR_NS}
+    assert resolve(names, events) == [["JOHN DOE", "JOHN Q DOE"]]
+    events["JOHN DOE"] = {("G", 90 * criminal.HOUR_NS): 200 * criminal.HOUR_NS}
+    assert resolve(names, events) == [["JOHN DOE", "JOHN Q DOE"]]
+
+def test_conflict_leaves_the_only_compatible_person():
+    names = variants(("JOHN", "ADAM", "DOE", ""), ("JOHN", "ALLEN", "DOE", ""), ("JOHN", "A", "DOE", ""))
+    day = 24 * criminal.HOUR_NS
+    events = {"JOHN ADAM DOE": {("F", 0): 10 * day}, "JOHN ALLEN DOE": {("G", 0): 10 * day},
+              "JOHN A DOE": {("F", day): 5 * day}}
+    assert resolve(names) == [["JOHN A DOE"], ["JOHN ADAM DOE"], ["JOHN ALLEN DOE"]]
+    assert resolve(names, events) == [["JOHN A DOE", "JOHN ADAM DOE"], ["JOHN ALLEN DOE"]]
+
+def test_identical_names_in_two_places_at_once_are_split(write_bookings):
+    path = write_bookings([
+        ("1", "DOE", "JOHN", "", "", "F", 0, 100, "Vol"),
+        ("2", "DOE", "JOHN", "", "", "G", 10, 90, "Fraude"),
+        ("3", "DOE", "JOHN", "", "", "G", 200, 300, "Vol"),
+        ("4", "DOE", "JOHN", "", "", "F", 250, 280, "Vol"),
+        ("5", "DOE", "JOHN", "", "", "G", 100, 110, "Vol"),
+    ])
+    stays, charges = criminal.load_stays(path, cache_dir=None)
+    owner = dict(zip(stays['Book of Arrest Number'].astype(str), stays['Full Name']))
+    assert owner == {"1": "JOHN DOE", "2": "JOHN DOE #2", "3": "JOHN DOE", "4": "JOHN DOE #2", "5": "JOHN DOE"}
+    assert sorted(charges) == ["JOHN DOE", "JOHN DOE #2"]
+
+def test_split_homonyms_are_kept_across_incremental_runs(write_bookings):
+    records = [
+        ("1", "DOE", "JOHN", "", "", "F", 0, 100, "Vol"),
+        ("2", "DOE", "JOHN", "", "", "G", 10, 90, "Fraude"),
+        ("3", "ROE", "JANE", "", "", "G", 0, 100, "Vol"),
+    ]
+    later = [
+        ("4", "DOE", "JOHN", "", "", "F", 200, 300, "Vol"),
+        ("5", "DOE", "JOHN", "", "", "G", 220, 260, "Vol"),
+        ("2", "DOE", "JOHN", "", "", "G", 10, 150, "Fraude"),
+    ]
+    path = write_bookings(records)
+    state = criminal.build_network_state(path, criminal.MIN_DURATION_FILTER, cache_dir=None)
+    appended = write_bookings(records + later, name="appended.csv")
+    with open(appended, 'rb') as f:
+        tail = f.read()[state['offset']:]
+    with open(path, 'ab') as f:
+        f.write(tail)
+    state = criminal.update_network_state(state, path)
+
+    full = criminal.build_network_state(path, criminal.MIN_DURATION_FILTER, cache_dir=None)
+    assert state['edges_ns'] == full['edges_ns']
+    assert state['person_facilities'] == full['person_facilities']
+    assert state['edges_ns'] == {("JANE ROE", "JOHN DOE #2"): 90 * criminal.HOUR_NS}
+    assert len(state['index'].stays_of("JOHN DOE #2")) == 2
+
+def test_simultaneous_stays_match_all_pairs():
+    rng = np.random.default_rng(25)
+    hour = criminal.HOUR_NS
+
+    def stays(count):
+        starts = rng.integers(0, 500, size=count)
+        return {(f"F{f}", int(s) * hour): int(s + d) * hour for f, s, d in
+                zip(rng.integers(0, 3, size=count), starts, rng.integers(0, 80, size=count))}
+
+    for _ in range(300):
+        events, other = stays(int(rng.integers(0, 12))), stays(int(rng.integers(0, 12)))
+        min_ns = int(rng.choice([0, 1, 24, 48])) * hour
+        expected = any(f != g and min(e, e2) - max(s, s2) >= min_ns
+                       for (f, s), e in events.items() for (g, s2), e2 in other.items())
+        assert criminal.simultaneous_stays(events, other, min_ns) == expected
+        assert criminal.simultaneous_stays(other, events, min_ns) == expected
@@ -0,0 +1,68 @@
+import criminal
+from conftest import booking_rows, random_bookings
+
+def append_lines(source, target, fractions):
+    """Recopie `source` dans `target` par morceaux (fractions cumulées des lignes), `target` rendu après chacun"""
+    with open(source, 'rb') as f:
+        header, *lines = f.readlines()
+    with open(target, 'wb') as f:
+        f.write(header)
+    done = 0
+    for fraction in fractions:
+        upto = int(len(lines) * fraction)
+        with open(target, 'ab') as f:
+            f.writelines(lines[done:upto])
+        done = upto
+        yield target
+
+def build(path):
+    return criminal.build_network_state(path, criminal.MIN_DURATION_FILTER, cache_dir=None)
+
+def intervals(index):
+    """Chevauchements de pair_intervals par noms, indépendants de la numérotation des lignes"""
+    a, b, start, end = index.pair_intervals(criminal.MIN_DURATION_FILTER)
+    return sorted((*sorted((index.names[x], index.names[y])), s, e)
+                  for x, y, s, e in zip(a.tolist(), b.tolist(), start.tolist(), end.tolist()))
+
+def assert_same_network(state, full):
+    assert state['edges_ns'] == full['edges_ns']
+    assert state['person_charges'] == full['person_charges']
+    assert state['person_facilities'] == full['person_facilities']
+    index, reference = state['index'], full['index']
+    for name in list(full['person_charges'])[:50]:
+        assert index.co_detainees(name) == reference.co_detainees(name)
+    assert intervals(index) == intervals(reference)
+    persons = sorted({name for pair in full['edges_ns'] for name in pair})
+    components = state['forest'].labels(index.person_ids(persons))
+    assert components.tolist() == full['forest'].labels(reference.person_ids(persons)).tolist()
+
+def test_appends_match_full_rebuild(tmp_path, write_bookings):
+    source = write_bookings(random_bookings(1200, seed=7), name="full.csv")
+    chunks = append_lines(source, str(tmp_path / "export.csv"), [0.5, 0.6, 0.61, 0.9, 1.0])
+    state = build(next(chunks))
+    for path in chunks:
+        state = criminal.update_network_state(state, path)
+    assert_same_network(state, build(source))
+
+def test_release_updates_extend_known_stays(write_bookings):
+    records = random_bookings(800, seed=8)
+    # Mise à jour de sortie : même écrou, sortie de la dernière réservation de chaque personne repoussée de 30 jours
+    last = {}
+    for record in records:
+        if record[6] >= last.get(record[1], record)[6]:
+            last[record[1]] = record
+    updates = [(*record[:7], record[7] + 720, record[8]) for record in list(last.values())[::10]]
+
+    path = write_bookings(records)
+    state = build(path)
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        booking_rows(updates).to_csv(f, sep=';', index=False, header=False)
+    state = criminal.update_network_state(state, path)
+    assert_same_network(state, build(path))
+
+def test_rereading_nothing_is_a_no_op(write_bookings):
+    path = write_bookings(random_bookings(300, seed=9))
+    state = build(path)
+    before = dict(state['edges_ns'])
+    state = criminal.update_network_state(state, path)
+    assert state['edges_ns'] == before
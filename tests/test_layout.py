@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+
+import criminal
+
+def clustered_graph(seed, n=80, m=200, groups=4):
+    """PersonGraph aléatoire (arêtes surtout internes aux groupes) et groupe de chaque identifiant"""
+    rng = np.random.default_rng(seed)
+    group = rng.integers(0, groups, size=n)
+    pairs = set()
+    while len(pairs) < m:
+        a, b = rng.integers(0, n, size=2).tolist()
+        if a != b and (group[a] == group[b] or rng.random() < 0.2):
+            pairs.add((min(a, b), max(a, b)))
+    src, dst = (np.array(column, dtype=np.int32) for column in zip(*sorted(pairs)))
+    weights = rng.integers(1, 500, size=len(src)).astype(float)
+    graph = criminal.PersonGraph.from_edges([f"P{i:03d}" for i in range(n)], src, dst, weights)
+    return graph, [f"F{g}" for g in group.tolist()]
+
+def raw_positions(path, names):
+    with open(path, encoding='utf-8') as f:
+        saved = json.load(f)
+    return np.array([saved[name] for name in names])
+
+def test_same_seed_gives_the_same_layout():
+    graph, groups = clustered_graph(1)
+    first, info = criminal.compute_layout(graph, groups, iterations=60, seed=7, layout_file=None)
+    second, _ = criminal.compute_layout(graph, groups, iterations=60, seed=7, layout_file=None)
+    other, _ = criminal.compute_layout(graph, groups, iterations=60, seed=8, layout_file=None)
+    assert first.shape == (len(graph), 2) and info["warm_start"] == 0
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+def test_warm_start_reuses_saved_positions(tmp_path):
+    graph, groups = clustered_graph(2)
+    path = str(tmp_path / criminal.LAYOUT_FILE)
+    _, info = criminal.compute_layout(graph, groups, iterations=60, layout_file=path)
+    assert info["warm_start"] == 0
+    saved = raw_positions(path, graph.names)
+
+    # Sans itération, le démarrage à chaud rend exactement les positions enregistrées
+    _, info = criminal.compute_layout(graph, groups, iterations=0, layout_file=path)
+    assert info["warm_start"] == len(graph)
+    np.testing.assert_allclose(raw_positions(path, graph.names), saved, atol=1e-4)
+
+    # Une reprise converge depuis la carte enregistrée : les nœuds bougent peu
+    _, info = criminal.compute_layout(graph, groups, iterations=20, layout_file=path)
+    moved = np.sqrt(((raw_positions(path, graph.names) - saved) ** 2).sum(axis=1))
+    extent = np.sqrt((saved ** 2).sum(axis=1)).max()
+    assert info["warm_start"] == len(graph) and np.median(moved) < 0.1 * extent
+
+def test_new_nodes_start_next_to_their_placed_neighbors(tmp_path):
+    graph, groups = clustered_graph(3)
+    path = str(tmp_path / criminal.LAYOUT_FILE)
+    criminal.compute_layout(graph, groups, iterations=60, layout_file=path)
+    saved = raw_positions(path, graph.names)
+    newcomer = int(np.argmax(graph.degree()))
+    with open(path, encoding='utf-8') as f:
+        previous = json.load(f)
+    del previous[graph.names[newcomer]]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(previous, f)
+
+    _, info = criminal.compute_layout(graph, groups, iterations=0, layout_file=path)
+    assert info["warm_start"] == len(graph) - 1
+    placed = raw_positions(path, graph.names)
+    others = np.arange(len(graph)) != newcomer
+    np.testing.assert_allclose(placed[others], saved[others], atol=1e-4)
+    anchor = saved[graph.neighbors(newcomer)].mean(axis=0)
+    assert np.sqrt(((placed[newcomer] - anchor) ** 2).sum()) < 5.0
+
+@pytest.mark.parametrize("n", [0, 1])
+def test_tiny_graphs(n):
+    graph = criminal.PersonGraph.from_edges([f"P{i}" for i in range(n)], np.empty(0, np.int32),
+                                            np.empty(0, np.int32), np.empty(0))
+    pos, info = criminal.compute_layout(graph, ["F"] * n, layout_file=None)
+    assert pos.shape == (n, 2) and info["warm_start"] == 0
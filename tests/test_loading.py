@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+import criminal
+from conftest import random_bookings
+
+@pytest.fixture
+def export(write_bookings):
+    return write_bookings(random_bookings(500, seed=11))
+
+def sorted_stays(stays):
+    stays = stays.copy()
+    for column in ('Booking Date Time', 'Release Date Time'):
+        stays[column] = stays[column].to_numpy(dtype='datetime64[ns]')
+    stays['Current Facility'] = stays['Current Facility'].astype(str)
+    return stays.sort_values(criminal.STAY_KEYS).reset_index(drop=True)
+
+def test_charges_are_unique_per_person_in_order_of_appearance():
+    df = pd.DataFrame({'Full Name': ["A", "B", "A", "A", "B", "C", "A"],
+                       'Charge': ["Vol", None, " Fraude ", "Vol", "", float("nan"), "Fraude"]})
+    assert criminal.collect_charges(df) == {"A": ["Vol", "Fraude"], "B": [], "C": []}
+
+def test_missing_charges_are_dropped_before_text_conversion():
+    # Colonne objet : selon la version de pandas, astype(str) rend None tel quel ou 'None'
+    df = pd.DataFrame({'Full Name': ["A", "A", "B", "B"], 'Charge': pd.Series([None, "None", pd.NA, " nan "], dtype=object)})
+    assert criminal.collect_charges(df) == {"A": ["None"], "B": []}
+
+def test_charges_extend_known_people():
+    known = {"A": ["Vol"]}
+    df = pd.DataFrame({'Full Name': ["A", "A", "D"], 'Charge': ["Fraude", "Vol", "Vol"]})
+    assert criminal.collect_charges(df, known) is known
+    assert known == {"A": ["Vol", "Fraude"], "D": ["Vol"]}
+
+@pytest.fixture(params=["npy", "feather"])
+def cache_format(request, monkeypatch):
+    if request.param == "feather":
+        pytest.importorskip("pyarrow.feather")
+    else:
+        monkeypatch.setattr(criminal, "feather", None)
+    return request.param
+
+def test_cache_round_trip(export, tmp_path, cache_format, capsys):
+    cache_dir = str(tmp_path / "cache")
+    stays, charges = criminal.load_stays(export, cache_dir=None)
+    first = criminal.load_stays(export, cache_dir=cache_dir)
+    second = criminal.load_stays(export, cache_dir=cache_dir)
+    assert capsys.readouterr().out.count("relus depuis le cache") == 1
+    for cached_stays, cached_charges in (first, second):
+        pd.testing.assert_frame_equal(sorted_stays(cached_stays), sorted_stays(stays))
+        assert cached_charges == charges
+
+def test_cache_keeps_names_and_empty_charges(tmp_path, cache_format):
+    names = {"JOHN Q DOE": ("DOE", "JOHN", "Q", ""), "JANE DOE JR": ("DOE", "JANE", "", "JR")}
+    charges = {"JOHN Q DOE": ["Vol", "Fraude"], "JANE DOE JR": []}
+    stays = pd.DataFrame({'Book of Arrest Number': ["1"], 'Full Name': ["JOHN Q DOE"], 'Current Facility': ["F"],
+                          'Booking Date Time': pd.to_datetime(["2024-12-01"]),
+                          'Release Date Time': pd.to_datetime(["2024-12-03"])})
+    criminal.save_stays_cache(str(tmp_path), {"k": 1}, stays, charges, names)
+    cached_stays, cached_charges, cached_names = criminal.load_stays_cache(str(tmp_path), {"k": 1})
+    pd.testing.assert_frame_equal(sorted_stays(cached_stays), sorted_stays(stays))
+    assert cached_charges == charges
+    assert cached_names == names
+
+def test_stale_or_interrupted_cache_is_ignored(tmp_path, export):
+    cache_dir = tmp_path / "cache"
+    criminal.load_stays(export, cache_dir=str(cache_dir))
+    key = criminal._cache_key(export)
+    assert criminal.load_stays_cache(str(cache_dir), key) is not None
+    assert criminal.load_stays_cache(str(cache_dir), {**key, "sha256": "autre"}) is None
+    (cache_dir / "meta.json").unlink()
+    assert criminal.load_stays_cache(str(cache_dir), key) is None
+
+@pytest.mark.parametrize("chunk_rows", [13, 100, 10000])
+def test_streaming_matches_whole_file(export, chunk_rows):
+    stays, charges = criminal.load_stays(export, cache_dir=None)
+    streamed, streamed_charges = criminal.load_stays(export, cache_dir=None, chunk_rows=chunk_rows)
+    pd.testing.assert_frame_equal(sorted_stays(streamed), sorted_stays(stays))
+    assert streamed_charges == charges
+
+def test_streaming_falls_back_to_latin1(tmp_path, write_bookings):
+    path = write_bookings([("1", "MÜLLER", "JOSÉ", "", "", "F", 0, 48, "Vol"),
+                           ("2", "DOE", "JOHN", "", "", "F", 0, 48, "Délit")])
+    latin = tmp_path / "latin.csv"
+    latin.write_bytes(open(path, encoding='utf-8').read().encode('latin-1'))
+    stays, charges = criminal.load_stays(str(latin), cache_dir=None, chunk_rows=1)
+    assert sorted(charges) == ["JOHN DOE", "JOSÉ MÜLLER"]
+    assert charges["JOHN DOE"] == ["Délit"]
+
+def test_report_records_each_stage(export, tmp_path, cache_format):
+    cache_dir = str(tmp_path / "cache")
+    report = criminal.PipelineReport()
+    criminal.load_stays(export, cache_dir=cache_dir, report=report)
+    criminal.load_stays(export, cache_dir=cache_dir, report=report)
+    hits = [record["counts"]["hit"] for record in report.stages if record["stage"] == "cache"]
+    assert hits == [False, True]
+    assert [record["stage"] for record in report.stages].count("load") == 1
+    assert all(record["wall_s"] >= 0 and "error" not in record for record in report.stages)
+
+def test_report_keeps_the_failing_stage():
+    report = criminal.PipelineReport()
+    with pytest.raises(ValueError):
+        with report.stage("pairs"):
+            raise ValueError("boom")
+    assert report.failed["stage"] == "pairs" and "boom" in report.failed["error"]
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import criminal
+from conftest import ORIGIN, random_bookings, stays_frame
+
+HOURS = criminal.HOUR_NS
+
+def random_stays(seed, count=400):
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, 2000, size=count)
+    # Quelques séjours très longs : ils ne doivent pas élargir la recherche des autres
+    lengths = np.where(rng.random(count) < 0.05, 1500, rng.integers(0, 200, size=count))
+    return stays_frame([(f"P{p}", f"F{f}", int(s), int(s + d)) for p, f, s, d in zip(
+        rng.integers(0, 60, size=count), rng.integers(0, 3, size=count), starts, lengths)])
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_overlapping_matches_a_scan(seed):
+    stays = random_stays(seed)
+    index = criminal.OccupancyIndex.from_stays(stays)
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        facility = f"F{rng.integers(0, 3)}"
+        start = int(rng.integers(-100, 2100)) * HOURS
+        end = start + int(rng.integers(0, 300)) * HOURS
+        expected = np.flatnonzero((stays['Current Facility'] == facility).to_numpy()
+                                  & (index.starts < end) & (index.ends > start))
+        assert sorted(index.overlapping(facility, start, end).tolist()) == expected.tolist()
+    assert len(index.overlapping("absent", 0, 10 * HOURS)) == 0
+
+def test_overlapping_accepts_timestamps():
+    index = criminal.OccupancyIndex.from_stays(stays_frame([("A", "F", 0, 48), ("B", "F", 100, 148)]))
+    rows = index.overlapping("F", ORIGIN + pd.Timedelta(hours=10), ORIGIN + pd.Timedelta(hours=20))
+    assert rows.tolist() == [0]
+
+@pytest.mark.parametrize("min_hours", [0, 24])
+def test_co_detainees_match_the_graph(min_hours):
+    stays = random_stays(3)
+    index = criminal.OccupancyIndex.from_stays(stays)
+    edges = criminal.compute_edges(stays, min_hours, backend="loop")
+    for name in stays['Full Name'].unique():
+        expected = {b if a == name else a: hours for (a, b), hours in edges.items() if name in (a, b)}
+        found = index.co_detainees(name, min_hours)
+        assert found.keys() == expected.keys()
+        assert all(found[other] == pytest.approx(hours) for other, hours in expected.items())
+    assert index.co_detainees("absent") == {}
+
+def test_saved_index_answers_the_same(tmp_path):
+    stays = random_stays(4)
+    index = criminal.OccupancyIndex.from_stays(stays, source="clé")
+    index.save(str(tmp_path / "occupancy.npz"))
+    loaded = criminal.OccupancyIndex.load(str(tmp_path / "occupancy.npz"))
+    assert loaded.source == "clé"
+    for name in ("P1", "P2", "P3"):
+        assert loaded.co_detainees(name) == index.co_detainees(name)
+    assert loaded.overlapping("F1", 0, 500 * HOURS).tolist() == index.overlapping("F1", 0, 500 * HOURS).tolist()
+
+def test_cached_index_is_reused_for_the_same_export(tmp_path, write_bookings):
+    path = write_bookings(random_bookings(300, seed=5))
+    cache_dir = str(tmp_path / "cache")
+    stays, _ = criminal.load_stays(path, cache_dir=cache_dir)
+    index = criminal.load_occupancy_index(stays, cache_dir)
+    assert (tmp_path / "cache" / "occupancy.npz").exists()
+    again = criminal.load_occupancy_index(stays, cache_dir)
+    assert again.source == index.source
+    assert again.starts.tolist() == index.starts.tolist()
+
+def test_cached_index_is_rebuilt_for_other_stays(tmp_path, write_bookings):
+    path = write_bookings(random_bookings(300, seed=5))
+    cache_dir = str(tmp_path / "cache")
+    stays, _ = criminal.load_stays(path, cache_dir=cache_dir)
+    index = criminal.load_occupancy_index(stays, cache_dir)
+
+    shifted = stays.copy()
+    shifted['Release Date Time'] = shifted['Release Date Time'] + pd.Timedelta(hours=1)
+    rebuilt = criminal.load_occupancy_index(shifted, cache_dir)
+    assert rebuilt.source != index.source
+    assert rebuilt.ends.tolist() == shifted['Release Date Time'].to_numpy(dtype='datetime64[ns]').view('int64').tolist()
+
+def test_cached_index_is_rebuilt_for_reordered_stays(tmp_path, write_bookings):
+    path = write_bookings(random_bookings(300, seed=5))
+    cache_dir = str(tmp_path / "cache")
+    stays, _ = criminal.load_stays(path, cache_dir=cache_dir)
+    index = criminal.load_occupancy_index(stays, cache_dir)
+
+    # Mêmes séjours dans un autre ordre : les positions rendues par l'index ne valent plus
+    reordered = stays.iloc[::-1].reset_index(drop=True)
+    rebuilt = criminal.load_occupancy_index(reordered, cache_dir)
+    assert rebuilt.source != index.source
+    facility = reordered['Current Facility'].iloc[0]
+    rows = rebuilt.overlapping(facility, int(rebuilt.starts.min()), int(rebuilt.ends.max()) + 1)
+    assert sorted(rows.tolist()) == np.flatnonzero((reordered['Current Facility'] == facility).to_numpy()).tolist()
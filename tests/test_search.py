@@ -0,0 +1,50 @@
+import pytest
+
+import criminal
+
+NODES = [
+    {"id": 10, "label": "José Müller", "charges": ["Vol aggravé"]},
+    {"id": 11, "label": "JOHN DOE", "charges": ["Vol"]},
+    {"id": 12, "label": "JANE DOE", "charges": ["Fraude", "Vol"]},
+    {"id": 13, "label": "JOHNNY ROE", "charges": []},
+    {"id": 14, "label": "ANNA SMITH", "charges": []},
+    {"id": 15, "label": "JOANNA SMITH", "charges": []},
+]
+
+@pytest.fixture(scope="module")
+def index():
+    return criminal.build_search_index(NODES)
+
+def lookup(index, query, **options):
+    return [index["display"][t] for t in criminal.search_index_lookup(index, query, **options)]
+
+def test_terms_are_folded_and_sorted(index):
+    assert index["terms"] == sorted(index["terms"])
+    assert "jose muller" in index["terms"] and "vol aggrave" in index["terms"]
+    t = index["terms"].index("vol")
+    assert index["postings"][index["postings_indptr"][t]:index["postings_indptr"][t + 1]] == [11, 12]
+
+def test_prefix_matches_come_first(index):
+    assert lookup(index, "jo") == ["JOANNA SMITH", "JOHN DOE", "JOHNNY ROE", "José Müller"]
+    assert lookup(index, "ann") == ["ANNA SMITH", "JOANNA SMITH"]
+
+def test_infix_matches_use_trigrams(index):
+    assert lookup(index, "doe") == ["JANE DOE", "JOHN DOE"]
+    assert lookup(index, "a smi") == ["ANNA SMITH", "JOANNA SMITH"]
+    assert lookup(index, "xyz") == []
+
+def test_accents_and_case_are_ignored(index):
+    assert lookup(index, "MÜLLER") == ["José Müller"]
+    assert lookup(index, "jose") == lookup(index, "JOSÉ") == ["José Müller"]
+    assert lookup(index, "aggrave") == ["Vol aggravé"]
+
+def test_short_queries_only_match_prefixes(index):
+    assert lookup(index, "oe") == []
+    assert lookup(index, "ja") == ["JANE DOE"]
+    assert lookup(index, "") == [index["display"][t] for t in range(len(index["terms"]))]
+
+def test_kind_and_limit(index):
+    assert lookup(index, "vol", kind=1) == ["Vol", "Vol aggravé"]
+    assert lookup(index, "vol", kind=0) == []
+    assert lookup(index, "jo", limit=2) == ["JOANNA SMITH", "JOHN DOE"]
+    assert lookup(index, "smith", kind=0, limit=1) == ["ANNA SMITH"]
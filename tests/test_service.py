@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import criminal
+from conftest import booking_rows
+
+# A-B et B-D : 1000 h chacune ; A-D : 30 h seulement ; C rencontre B et D 100 h ; E-F à part
+RECORDS = [
+    ("1", "ADAMS", "ALAN", "", "", "F1", 0, 1000, "Vol"),
+    ("2", "BAKER", "BRUCE", "", "", "F1", 0, 1000, "Vol"),
+    ("3", "BAKER", "BRUCE", "", "", "F2", 2000, 3000, "Fraude"),
+    ("4", "DAVIS", "DORA", "", "", "F2", 2000, 3000, "Fraude"),
+    ("5", "CLARK", "CARL", "", "", "F2", 2500, 2600, "Recel"),
+    ("6", "ADAMS", "ALAN", "", "", "F3", 4000, 4030, "Vol"),
+    ("7", "DAVIS", "DORA", "", "", "F3", 4000, 4030, "Vol"),
+    ("8", "EVANS", "ERIC", "", "", "F4", 0, 100, "Vol"),
+    ("9", "FOX", "FAYE", "", "", "F4", 0, 100, "Vol"),
+]
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory):
+    path = tmp_path_factory.mktemp("service") / "bookings.csv"
+    booking_rows(RECORDS).to_csv(path, sep=';', index=False, encoding='utf-8')
+    state = criminal.build_network_state(str(path), criminal.MIN_DURATION_FILTER, cache_dir=None)
+    graph, data = criminal.build_network_data(state, layout_mode="browser", community_min_nodes=None)
+    return criminal.NetworkService(graph, data)
+
+def get(service, target):
+    status, body = service.respond(target)
+    return status, json.loads(body)
+
+@pytest.mark.parametrize("target", [
+    "/api/ego?name=ALAN+ADAMS&hops=abc",
+    "/api/ego?name=ALAN+ADAMS&hops=-1",
+    "/api/ego?name=ALAN+ADAMS&max_nodes=0",
+    "/api/ego?hops=1",
+    "/api/top?n=0",
+    "/api/top?n=-1",
+    "/api/top?metric=taille",
+    "/api/search?q=+",
+    "/api/search?q=vol&limit=0",
+])
+def test_bad_parameters_are_rejected(service, target):
+    status, body = get(service, target)
+    assert status == 400 and body["error"]
+
+@pytest.mark.parametrize("target", ["/api/ego?name=NOBODY", "/api/top?facility=F9", "/api/inconnue"])
+def test_unknown_names_and_routes_are_not_found(service, target):
+    assert get(service, target)[0] == 404
+
+def labels(nodes):
+    return sorted(node["label"] for node in nodes)
+
+def test_ego_network(service):
+    status, body = get(service, "/api/ego?name=ALAN+ADAMS&hops=1")
+    assert status == 200
+    assert labels(body["nodes"]) == ["ALAN ADAMS", "BRUCE BAKER", "DORA DAVIS"]
+    assert len(body["edges"]) == 3 and not body["server"]["truncated"]
+
+    _, body = get(service, "/api/ego?name=ALAN+ADAMS&hops=2")
+    assert labels(body["nodes"]) == ["ALAN ADAMS", "BRUCE BAKER", "CARL CLARK", "DORA DAVIS"]
+    # Relations d'au moins 2 jours : A-D (30 h) disparaît
+    _, body = get(service, "/api/ego?name=ALAN+ADAMS&hops=1&min_days=2")
+    assert labels(body["nodes"]) == ["ALAN ADAMS", "BRUCE BAKER"]
+    # Niveau trop large : seuls les liens les plus longs sont gardés
+    _, body = get(service, "/api/ego?name=ALAN+ADAMS&hops=2&max_nodes=2")
+    assert labels(body["nodes"]) == ["ALAN ADAMS", "BRUCE BAKER"] and body["server"]["truncated"]
+
+def test_path_follows_the_strongest_ties(service):
+    status, body = get(service, "/api/path?source=ALAN+ADAMS&target=DORA+DAVIS")
+    assert status == 200 and body["found"] and body["metric"] == "inverse_hours"
+    assert [node["label"] for node in body["path"]] == ["ALAN ADAMS", "BRUCE BAKER", "DORA DAVIS"]
+    assert body["hours"] == [1000.0, 1000.0]
+    assert body["cost"] == pytest.approx(2 / 1000)
+
+    _, body = get(service, "/api/path?source=ALAN+ADAMS&target=ERIC+EVANS")
+    assert not body["found"] and body["path"] == []
+
+def test_top_is_bounded_and_sorted(service):
+    _, body = get(service, "/api/top?n=2&metric=strength")
+    assert [person["label"] for person in body["people"]] == ["BRUCE BAKER", "DORA DAVIS"]
+    _, body = get(service, "/api/top?facility=F4&n=10")
+    assert labels(body["people"]) == ["ERIC EVANS", "FAYE FOX"]
+
+def test_search(service):
+    _, body = get(service, "/api/search?q=bak")
+    assert [person["label"] for person in body["people"]] == ["BRUCE BAKER"]
+    _, body = get(service, "/api/search?q=fraude")
+    assert body["charges"][0]["count"] == 2
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import criminal
+from conftest import booking_rows, random_bookings
+
+@pytest.fixture(scope="module")
+def network(tmp_path_factory):
+    path = tmp_path_factory.mktemp("temporal") / "bookings.csv"
+    booking_rows(random_bookings(300, seed=12, persons=90, facilities=3)).to_csv(
+        path, sep=';', index=False, encoding='utf-8')
+    state = criminal.build_network_state(str(path), criminal.MIN_DURATION_FILTER, cache_dir=None)
+    return state, criminal.PersonGraph.from_edges_ns(state['edges_ns'])
+
+def temporal(state, graph, pivots=None):
+    src, dst, _ = graph.edges()
+    return criminal.build_temporal_index(graph, state['index'], src.astype(np.int64), dst.astype(np.int64),
+                                         state['min_hours'], "week", pivots=pivots)
+
+def snapshots(result, n):
+    """Degré et influence de chaque instantané, reconstitués à partir des seuls changements"""
+    degree, influence = np.zeros(n, dtype=np.int64), np.zeros(n)
+    indptr = result["snapshot_indptr"]
+    for k in range(len(result["labels"])):
+        nodes = result["snapshot_nodes"][indptr[k]:indptr[k + 1]]
+        degree[nodes] = result["snapshot_degree"][indptr[k]:indptr[k + 1]]
+        influence[nodes] = result["snapshot_influence"][indptr[k]:indptr[k + 1]]
+        yield k, degree.copy(), influence.copy()
+
+def graph_until(state, graph, end):
+    """Graphe des chevauchements de séjours (paires du graphe complet) coupés à `end` (ns)"""
+    index = state['index']
+    a, b, lo, hi = index.pair_intervals(state['min_hours'])
+    ns = np.minimum(hi, end) - lo
+    keep = ns > 0
+    totals = {}
+    for x, y, d in zip(a[keep].tolist(), b[keep].tolist(), ns[keep].tolist()):
+        pair = tuple(sorted((graph.ids[index.names[x]], graph.ids[index.names[y]])))
+        totals[pair] = totals.get(pair, 0) + d
+    src, dst = (np.array(column, dtype=np.int32) for column in zip(*totals)) if totals else \
+        (np.empty(0, np.int32), np.empty(0, np.int32))
+    hours = criminal._overlap_hours(np.fromiter(totals.values(), dtype=np.int64, count=len(totals)))
+    return criminal.PersonGraph.from_edges(graph.names, src, dst, hours)
+
+@pytest.mark.parametrize("reuse", [True, False])
+@pytest.mark.parametrize("sampled", [False, True])
+def test_snapshots_match_a_recomputation(network, monkeypatch, reuse, sampled):
+    state, graph = network
+    monkeypatch.setattr(criminal, "TEMPORAL_REUSE_CELLS", 10 ** 9 if reuse else 0)
+    pivots = criminal._sample_pivots(len(graph), k=20, seed=5) if sampled else None
+    result = temporal(state, graph, pivots)
+    assert len(result["labels"]) > 5
+
+    for k, degree, influence in snapshots(result, len(graph)):
+        end = (pd.Timestamp(result["labels"][k]) + pd.Timedelta(days=7)).value
+        expected = graph_until(state, graph, end)
+        if sampled:
+            scores, _ = criminal.compute_centrality(expected, "sampled", k=20, seed=5)
+        else:
+            scores, _ = criminal._betweenness_exact(expected)
+        assert degree.tolist() == expected.degree().tolist()
+        np.testing.assert_allclose(influence, scores, atol=1e-12)
+
+def test_last_snapshot_hours_are_the_graph_weights(network):
+    state, graph = network
+    result = temporal(state, graph)
+    src, _, weights = graph.edges()
+    hours = np.bincount(result["period_edges"], weights=result["period_hours"], minlength=len(src))
+    np.testing.assert_allclose(hours, weights, atol=1e-6)
+    *_, (_, degree, influence) = snapshots(result, len(graph))
+    assert degree.tolist() == graph.degree().tolist()
+    np.testing.assert_allclose(influence, criminal.compute_centrality(graph, "exact")[0], atol=1e-12)